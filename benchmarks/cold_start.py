@@ -0,0 +1,307 @@
+"""
+Cold-start benchmark for the Lambda handlers
+
+Imports each handler module in a fresh interpreter with `-X importtime`
+and reports:
+- Total import time of the handler module
+- The slowest imports it pulls in (cumulative, like `-X importtime`)
+- Heavy modules (boto3/botocore) that were loaded eagerly
+- For handlers with an early-exit path, the time to run it and whether it
+  loaded the heavy modules
+
+The run fails (exit code 1) when a handler's import time exceeds the
+threshold or a heavy module is loaded before first use, so deferred
+imports stay deferred.
+
+Usage:
+    python benchmarks/cold_start.py [--threshold-ms 50] [--repeat 5]
+                                    [--top 10] [--json results.json]
+
+Author: AWS Lambda Automation Project
+Date: January 2026
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda_functions')
+
+HANDLERS = [
+    'assignment1_ec2_auto_management',
+    'assignment2_s3_cleanup',
+    'assignment3_monitor_unencrypted_s3',
+    'assignment4_ebs_snapshot_manager',
+    'assignment5_auto_tag_ec2'
+]
+
+# Events that make a handler return before it needs an AWS client
+EARLY_EXIT_EVENTS = {
+    'assignment5_auto_tag_ec2': {}
+}
+
+# Modules that must only be imported on first use
+HEAVY_MODULES = ['boto3', 'botocore']
+
+DEFAULT_THRESHOLD_MS = 50
+
+# Runs inside the fresh interpreter; prints a JSON result line on stdout
+PROBE = '''
+import sys
+heavy = {heavy!r}
+import {module} as handler
+import contextlib, io, json, time
+result = {{'eager_heavy': [m for m in heavy if m in sys.modules]}}
+event = {event!r}
+if event is not None:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        handler.lambda_handler(event, None)
+    result['early_exit_ms'] = (time.perf_counter() - start) * 1000
+    result['early_exit_heavy'] = [m for m in heavy if m in sys.modules]
+print(json.dumps(result))
+'''
+
+
+def run_probe(module):
+    """
+    Import a handler in a fresh interpreter with -X importtime
+
+    Args:
+        module: Handler module name
+
+    Returns:
+        tuple: (list of import records, probe result dict)
+    """
+    code = PROBE.format(
+        heavy=HEAVY_MODULES,
+        module=module,
+        event=EARLY_EXIT_EVENTS.get(module)
+    )
+
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=LAMBDA_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    # Buffered log lines are flushed at exit, after the result
+    result = next(line for line in reversed(completed.stdout.splitlines()) if '"eager_heavy"' in line)
+
+    return parse_importtime(completed.stderr), json.loads(result)
+
+
+def parse_importtime(output):
+    """
+    Parse `-X importtime` output
+
+    Args:
+        output: stderr of an interpreter run with -X importtime
+
+    Returns:
+        list: Dicts with 'module', 'indent', 'self_us' and 'cumulative_us',
+              in the order the imports completed
+    """
+    records = []
+
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        records.append({
+            'module': name.strip(),
+            'indent': len(name) - len(name.lstrip()),
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us)
+        })
+
+    return records
+
+
+def handler_imports(records, handler_index):
+    """
+    Select the imports triggered by a handler module
+
+    A module's own imports complete just before it and are indented
+    deeper, so they form the contiguous run of records preceding it.
+
+    Args:
+        records: Records from parse_importtime
+        handler_index: Index of the handler module's record
+
+    Returns:
+        list: Records of the modules the handler imported
+    """
+    handler_indent = records[handler_index]['indent']
+    start = handler_index
+
+    while start > 0 and records[start - 1]['indent'] > handler_indent:
+        start -= 1
+
+    return records[start:handler_index]
+
+
+def benchmark_handler(module, repeat, top):
+    """
+    Measure the cold-start import profile of one handler
+
+    Args:
+        module: Handler module name
+        repeat: Number of fresh interpreters to sample
+        top: Number of slowest imports to report
+
+    Returns:
+        dict: Benchmark result for the handler
+    """
+    import_ms = []
+    early_exit_ms = []
+    profile = None
+    probe = None
+
+    for _ in range(repeat):
+        records, probe = run_probe(module)
+        handler_index = next(i for i, r in enumerate(records) if r['module'] == module)
+        import_ms.append(records[handler_index]['cumulative_us'] / 1000)
+
+        if 'early_exit_ms' in probe:
+            early_exit_ms.append(probe['early_exit_ms'])
+
+        # Report the import breakdown of the first run
+        if profile is None:
+            profile = handler_imports(records, handler_index)
+
+    slowest = sorted(
+        profile,
+        key=lambda r: r['cumulative_us'],
+        reverse=True
+    )[:top]
+
+    result = {
+        'handler': module,
+        'import_ms': statistics.median(import_ms),
+        'slowest_imports': [
+            {
+                'module': r['module'],
+                'cumulative_ms': r['cumulative_us'] / 1000,
+                'self_ms': r['self_us'] / 1000
+            }
+            for r in slowest
+        ],
+        'eager_heavy_modules': probe['eager_heavy']
+    }
+
+    if early_exit_ms:
+        result['early_exit_ms'] = statistics.median(early_exit_ms)
+        result['early_exit_heavy_modules'] = probe['early_exit_heavy']
+
+    return result
+
+
+def check_regressions(result, threshold_ms):
+    """
+    List the regressions in a handler's benchmark result
+
+    Args:
+        result: Result from benchmark_handler
+        threshold_ms: Maximum allowed import time in milliseconds
+
+    Returns:
+        list: Human-readable regression messages
+    """
+    regressions = []
+
+    if result['import_ms'] > threshold_ms:
+        regressions.append(
+            f"{result['handler']}: import took {result['import_ms']:.1f} ms "
+            f"(threshold {threshold_ms} ms)"
+        )
+
+    if result['eager_heavy_modules']:
+        regressions.append(
+            f"{result['handler']}: imports {', '.join(result['eager_heavy_modules'])} at module load"
+        )
+
+    if result.get('early_exit_heavy_modules'):
+        regressions.append(
+            f"{result['handler']}: early-exit path loads "
+            f"{', '.join(result['early_exit_heavy_modules'])}"
+        )
+
+    return regressions
+
+
+def print_report(results):
+    """
+    Print a per-handler import time breakdown
+
+    Args:
+        results: List of benchmark_handler results
+    """
+    for result in results:
+        print(f"\n{result['handler']}: {result['import_ms']:.1f} ms import")
+        if 'early_exit_ms' in result:
+            print(f"  early-exit invocation: {result['early_exit_ms']:.1f} ms")
+        if result['eager_heavy_modules']:
+            print(f"  eager heavy modules: {', '.join(result['eager_heavy_modules'])}")
+
+        print(f"  {'cumulative ms':>14} {'self ms':>9}  module")
+        for entry in result['slowest_imports']:
+            print(f"  {entry['cumulative_ms']:>14.2f} {entry['self_ms']:>9.2f}  {entry['module']}")
+
+
+def main(argv=None):
+    """
+    Run the cold-start benchmark
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv)
+
+    Returns:
+        int: Process exit code, 1 when a regression was found
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threshold-ms', type=float, default=DEFAULT_THRESHOLD_MS,
+                        help='maximum import time per handler')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='fresh interpreters per handler (median is reported)')
+    parser.add_argument('--top', type=int, default=10,
+                        help='number of slowest imports to list')
+    parser.add_argument('--json', dest='json_path',
+                        help='write machine-readable results to this file')
+    parser.add_argument('handlers', nargs='*', default=HANDLERS,
+                        help='handler modules to benchmark (default: all)')
+    args = parser.parse_args(argv)
+
+    results = [benchmark_handler(module, args.repeat, args.top) for module in args.handlers]
+    print_report(results)
+
+    regressions = []
+    for result in results:
+        regressions.extend(check_regressions(result, args.threshold_ms))
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({
+                'threshold_ms': args.threshold_ms,
+                'results': results,
+                'regressions': regressions
+            }, f, indent=2)
+
+    if regressions:
+        print("\nCold-start regressions:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+
+    print(f"\nAll handlers within {args.threshold_ms} ms and no eager heavy imports")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,953 @@
+"""
+In-process AWS stand-ins for benchmarking the Lambda handlers
+
+Implements the EC2 and S3 operations the handlers use against synthetic,
+seeded fleets, with configurable per-call latency and throttling:
+- FakeEC2: instances, volumes and snapshots (describe/start/stop/tag/...)
+- FakeS3: buckets whose objects are generated lazily from their index, so
+  a 5M-key bucket costs a few megabytes instead of gigabytes, plus stored
+  objects (e.g. inventory reports) served by get_object
+- FakeSTS: the caller identity of the fake account
+- FakeCloudWatch: the daily NumberOfObjects metric of the fake buckets
+- FakeSSM: String parameters
+- CallStats: API calls, retries and throttles per operation
+
+Throttled calls are retried with exponential backoff the way botocore's
+retry handler would, so handlers see the extra latency but not the error
+unless every attempt is throttled. Clients emit botocore's before-call,
+needs-retry and after-call events so instrumentation hooks work unchanged.
+
+Author: AWS Lambda Automation Project
+Date: January 2026
+"""
+
+import io
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+ACCOUNT_ID = '123456789012'
+
+
+class ClientError(Exception):
+    """
+    Error raised by the fake clients, shaped like botocore's ClientError
+    """
+
+    def __init__(self, code, message, operation_name, status_code=400):
+        super().__init__(f"An error occurred ({code}) when calling the "
+                         f"{operation_name} operation: {message}")
+        self.response = {
+            'Error': {'Code': code, 'Message': message},
+            'ResponseMetadata': {'HTTPStatusCode': status_code}
+        }
+        self.operation_name = operation_name
+
+
+class CallStats:
+    """
+    API call counters shared by every fake client of a run
+    """
+
+    def __init__(self):
+        self.calls = Counter()
+        self.retries = Counter()
+        self.throttles = Counter()
+        self.in_flight = Counter()
+        self.lock = threading.Lock()
+
+    def as_dict(self):
+        """
+        Summarize the counters
+
+        Returns:
+            dict: Calls, retries and throttles by operation name
+        """
+        return {
+            'total_calls': sum(self.calls.values()),
+            'calls': dict(self.calls.most_common()),
+            'retries': dict(self.retries.most_common()),
+            'throttles': dict(self.throttles.most_common())
+        }
+
+
+class FakeConfig:
+    """
+    Latency and throttling injected into every fake call
+
+    Attempts are throttled at random with probability throttle_rate, and
+    always when more than `capacity` attempts of the same operation are in
+    flight at once (None for unlimited).
+    """
+
+    def __init__(self, latency_ms=0.0, throttle_rate=0.0, max_attempts=3,
+                 retry_base_ms=50.0, seed=42, capacity=None):
+        self.latency = latency_ms / 1000
+        self.throttle_rate = throttle_rate
+        self.capacity = capacity
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base_ms / 1000
+        self.random = random.Random(seed)
+
+
+class FakeEvents:
+    """
+    Minimal stand-in for botocore's hierarchical event emitter
+    """
+
+    def __init__(self):
+        self.handlers = []  # (event name prefix, handler, unique ID)
+
+    def register(self, event_name, handler, unique_id=None, **kwargs):
+        if unique_id and any(existing == unique_id for _, _, existing in self.handlers):
+            return
+        self.handlers.append((event_name, handler, unique_id))
+
+    def emit(self, event_name, **kwargs):
+        responses = []
+        for prefix, handler, _ in self.handlers:
+            if event_name == prefix or event_name.startswith(prefix + '.'):
+                responses.append((handler, handler(event_name=event_name, **kwargs)))
+        return responses
+
+
+def to_operation_name(method_name):
+    """
+    Convert a client method name to its API operation name
+
+    Args:
+        method_name: Client method name (e.g. 'describe_instances')
+
+    Returns:
+        str: Operation name (e.g. 'DescribeInstances')
+    """
+    return ''.join(part.capitalize() for part in method_name.split('_'))
+
+
+class FakeClient:
+    """
+    Base class dispatching client method calls to `op_<method>` handlers
+    """
+
+    service = None
+    throttle_code = 'Throttling'
+    throttle_status = 400
+
+    # method name -> (input token, output token, page size parameter)
+    paginated = {}
+
+    def __init__(self, region, stats, config):
+        self.stats = stats
+        self.config = config
+        self.meta = SimpleNamespace(
+            region_name=region,
+            service_model=SimpleNamespace(service_name=self.service),
+            events=FakeEvents()
+        )
+        self.exceptions = SimpleNamespace(ClientError=ClientError)
+
+    def __getattr__(self, name):
+        handler = getattr(type(self), 'op_' + name, None)
+        if handler is None:
+            raise AttributeError(f"{type(self).__name__} does not implement {name}")
+
+        def call(**params):
+            return self.invoke(name, handler, params)
+
+        return call
+
+    def invoke(self, method_name, handler, params):
+        """
+        Run one API call with injected latency, throttling and retries
+
+        Args:
+            method_name: Client method name
+            handler: Unbound op_ handler implementing the operation
+            params: Call parameters
+
+        Returns:
+            dict: Operation response
+        """
+        operation = to_operation_name(method_name)
+        event_suffix = f"{self.service}.{operation}"
+        model = SimpleNamespace(name=operation, service_model=self.meta.service_model)
+        context = {}
+        events = self.meta.events
+
+        with self.stats.lock:
+            self.stats.calls[operation] += 1
+        events.emit(f"before-call.{event_suffix}", model=model, params=params, context=context)
+
+        for attempt in range(self.config.max_attempts):
+            with self.stats.lock:
+                self.stats.in_flight[operation] += 1
+                over_capacity = (self.config.capacity is not None
+                                 and self.stats.in_flight[operation] > self.config.capacity)
+
+            try:
+                if self.config.latency:
+                    time.sleep(self.config.latency)
+
+                throttled = over_capacity or (
+                    self.config.throttle_rate
+                    and self.config.random.random() < self.config.throttle_rate
+                )
+                if throttled:
+                    with self.stats.lock:
+                        self.stats.throttles[operation] += 1
+                    raise ClientError(self.throttle_code, 'Rate exceeded', operation,
+                                      self.throttle_status)
+                parsed = handler(self, **params)
+                error = None
+            except ClientError as e:
+                parsed = dict(e.response)
+                error = e
+            finally:
+                with self.stats.lock:
+                    self.stats.in_flight[operation] -= 1
+
+            status_code = parsed.get('ResponseMetadata', {}).get('HTTPStatusCode', 200)
+            parsed['ResponseMetadata'] = {'HTTPStatusCode': status_code, 'RetryAttempts': attempt}
+            http_response = SimpleNamespace(status_code=status_code)
+
+            events.emit(f"needs-retry.{event_suffix}", response=(http_response, parsed),
+                        endpoint=None, operation=model, attempts=attempt + 1,
+                        caught_exception=None, request_dict={})
+
+            retryable = error is not None and error.response['Error']['Code'] == self.throttle_code
+            if retryable and attempt + 1 < self.config.max_attempts:
+                with self.stats.lock:
+                    self.stats.retries[operation] += 1
+                time.sleep(self.config.random.random() * self.config.retry_base * 2 ** attempt)
+                continue
+
+            events.emit(f"after-call.{event_suffix}", http_response=http_response,
+                        parsed=parsed, model=model, context=context)
+            if error is not None:
+                raise error
+            return parsed
+
+    def can_paginate(self, method_name):
+        return method_name in self.paginated
+
+    def get_paginator(self, method_name):
+        return FakePaginator(self, method_name, *self.paginated[method_name])
+
+
+class FakePaginator:
+    """
+    Paginator following a fake operation's continuation tokens
+    """
+
+    def __init__(self, client, method_name, input_token, output_token, limit_key):
+        self.client = client
+        self.method_name = method_name
+        self.input_token = input_token
+        self.output_token = output_token
+        self.limit_key = limit_key
+
+    def paginate(self, PaginationConfig=None, **params):
+        page_size = (PaginationConfig or {}).get('PageSize')
+        if page_size:
+            params[self.limit_key] = page_size
+
+        method = getattr(self.client, self.method_name)
+        while True:
+            page = method(**params)
+            yield page
+
+            token = page.get(self.output_token)
+            if not token:
+                break
+            params[self.input_token] = token
+
+
+def tags_to_dict(tags):
+    return {tag['Key']: tag['Value'] for tag in tags or []}
+
+
+def matches_filters(resource, filters, getters):
+    """
+    Check a resource against EC2-style Filters
+
+    Args:
+        resource: Resource in describe format
+        filters: List of {'Name', 'Values'} filters
+        getters: Dictionary of value getters by filter name
+
+    Returns:
+        bool: True if every filter matches
+    """
+    for resource_filter in filters or []:
+        name = resource_filter['Name']
+        values = resource_filter['Values']
+
+        if name.startswith('tag:'):
+            value = tags_to_dict(resource.get('Tags')).get(name[4:])
+        else:
+            value = getters[name](resource)
+
+        if value not in values:
+            return False
+
+    return True
+
+
+def paginate_list(items, params, key, next_token='NextToken', limit='MaxResults'):
+    """
+    Slice a list into an EC2-style page
+
+    Args:
+        items: Full list of results
+        params: Call parameters (NextToken/MaxResults)
+        key: Response key for the items
+
+    Returns:
+        dict: Response page
+    """
+    start = int(params.get(next_token) or 0)
+    page_size = params.get(limit)
+
+    if not page_size:
+        return {key: items[start:]}
+
+    response = {key: items[start:start + page_size]}
+    if start + page_size < len(items):
+        response[next_token] = str(start + page_size)
+    return response
+
+
+INSTANCE_FILTERS = {
+    'instance-state-name': lambda instance: instance['State']['Name'],
+    'instance-id': lambda instance: instance['InstanceId']
+}
+
+SNAPSHOT_FILTERS = {
+    'volume-id': lambda snapshot: snapshot['VolumeId'],
+    'status': lambda snapshot: snapshot['State']
+}
+
+
+class FakeEC2(FakeClient):
+    """
+    EC2 stand-in holding instances, volumes, network interfaces and
+    snapshots of one region
+    """
+
+    service = 'ec2'
+    throttle_code = 'RequestLimitExceeded'
+    paginated = {
+        'describe_instances': ('NextToken', 'NextToken', 'MaxResults'),
+        'describe_snapshots': ('NextToken', 'NextToken', 'MaxResults'),
+        'describe_volumes': ('NextToken', 'NextToken', 'MaxResults'),
+        'describe_network_interfaces': ('NextToken', 'NextToken', 'MaxResults')
+    }
+
+    def __init__(self, region, stats, config, regions=None):
+        super().__init__(region, stats, config)
+        self.instances = {}
+        self.volumes = {}
+        self.network_interfaces = {}
+        self.snapshots = {}
+        self.other_tags = {}  # tags on resources without a model
+        self.regions = regions or [region]
+        self.next_id = 0
+
+    def new_id(self, prefix):
+        with self.stats.lock:
+            self.next_id += 1
+            next_id = self.next_id
+        return f"{prefix}-{self.meta.region_name.replace('-', '')}{next_id:010x}"
+
+    # Seeding
+
+    def add_instances(self, count, tag_sets=None, states=None, seed=1):
+        """
+        Seed a synthetic instance fleet with one volume and ENI each
+
+        Args:
+            count: Number of instances
+            tag_sets: Optional list of tag dicts, assigned round-robin
+            states: Optional list of states, assigned round-robin
+            seed: Random seed for launch times and types
+
+        Returns:
+            list: IDs of the new instances
+        """
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc)
+        types = ['t3.micro', 't3.small', 'm5.large', 'c5.xlarge']
+        instance_ids = []
+
+        for n in range(count):
+            instance_id = self.new_id('i')
+            volume_id = self.new_id('vol')
+            interface_id = self.new_id('eni')
+            tags = (tag_sets[n % len(tag_sets)] if tag_sets else {})
+            state = states[n % len(states)] if states else 'running'
+
+            self.instances[instance_id] = {
+                'InstanceId': instance_id,
+                'InstanceType': rng.choice(types),
+                'State': {'Name': state},
+                'LaunchTime': now - timedelta(seconds=rng.randrange(90 * 86400)),
+                'Placement': {'AvailabilityZone': self.meta.region_name + 'a'},
+                'PrivateIpAddress': f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}",
+                'SubnetId': f"subnet-{n % 8:08x}",
+                'KeyName': f"key-{n % 3}",
+                'Tags': [{'Key': k, 'Value': v} for k, v in tags.items()],
+                'BlockDeviceMappings': [
+                    {'DeviceName': '/dev/xvda', 'Ebs': {'VolumeId': volume_id}}
+                ],
+                'NetworkInterfaces': [{'NetworkInterfaceId': interface_id}]
+            }
+            self.volumes[volume_id] = {
+                'VolumeId': volume_id,
+                'Size': 8,
+                'State': 'in-use',
+                'AvailabilityZone': self.meta.region_name + 'a',
+                'Attachments': [{'InstanceId': instance_id}],
+                'Tags': []
+            }
+            self.network_interfaces[interface_id] = {
+                'NetworkInterfaceId': interface_id,
+                'Status': 'in-use',
+                'Attachment': {'InstanceId': instance_id},
+                'TagSet': []
+            }
+            instance_ids.append(instance_id)
+
+        return instance_ids
+
+    def add_volumes(self, count):
+        volume_ids = []
+        for _ in range(count):
+            volume_id = self.new_id('vol')
+            self.volumes[volume_id] = {
+                'VolumeId': volume_id, 'Size': 8, 'State': 'available',
+                'AvailabilityZone': self.meta.region_name + 'a',
+                'Attachments': [], 'Tags': []
+            }
+            volume_ids.append(volume_id)
+        return volume_ids
+
+    def add_snapshots(self, volume_ids, per_volume, max_age_days, description_prefix,
+                      seed=2):
+        """
+        Seed completed automated snapshots spread over max_age_days
+
+        Args:
+            volume_ids: Volumes to create snapshots for
+            per_volume: Number of snapshots per volume
+            max_age_days: Oldest snapshot age
+            description_prefix: Description prefix of automated backups
+            seed: Random seed for start times
+        """
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc)
+
+        for volume_id in volume_ids:
+            for _ in range(per_volume):
+                start_time = now - timedelta(seconds=rng.randrange(max_age_days * 86400))
+                snapshot_id = self.new_id('snap')
+                self.snapshots[snapshot_id] = {
+                    'SnapshotId': snapshot_id,
+                    'VolumeId': volume_id,
+                    'StartTime': start_time,
+                    'State': 'completed',
+                    'VolumeSize': 8,
+                    'Description': f"{description_prefix}-{volume_id}-{start_time:%Y-%m-%d-%H-%M-%S}",
+                    'OwnerId': ACCOUNT_ID,
+                    'Tags': [
+                        {'Key': 'VolumeId', 'Value': volume_id},
+                        {'Key': 'CreatedBy', 'Value': 'Lambda-Automation'}
+                    ]
+                }
+
+    # Instances
+
+    def op_describe_instances(self, InstanceIds=None, Filters=None, **params):
+        if InstanceIds:
+            missing = [i for i in InstanceIds if i not in self.instances]
+            if missing:
+                raise ClientError('InvalidInstanceID.NotFound',
+                                  f"The instance IDs '{', '.join(missing)}' do not exist",
+                                  'DescribeInstances')
+            instances = [self.instances[i] for i in InstanceIds]
+        else:
+            instances = list(self.instances.values())
+
+        instances = [i for i in instances if matches_filters(i, Filters, INSTANCE_FILTERS)]
+        page = paginate_list(instances, params, 'Instances')
+        reservations = [{'Instances': [instance]} for instance in page.pop('Instances')]
+        page['Reservations'] = reservations
+        return page
+
+    def change_state(self, instance_ids, new_state, operation, key):
+        changes = []
+        for instance_id in instance_ids:
+            if instance_id not in self.instances:
+                raise ClientError('InvalidInstanceID.NotFound',
+                                  f"The instance ID '{instance_id}' does not exist", operation)
+            instance = self.instances[instance_id]
+            previous = instance['State']['Name']
+            instance['State'] = {'Name': new_state}
+            changes.append({
+                'InstanceId': instance_id,
+                'PreviousState': {'Name': previous},
+                'CurrentState': {'Name': new_state}
+            })
+        return {key: changes}
+
+    def op_stop_instances(self, InstanceIds):
+        return self.change_state(InstanceIds, 'stopped', 'StopInstances', 'StoppingInstances')
+
+    def op_start_instances(self, InstanceIds):
+        return self.change_state(InstanceIds, 'running', 'StartInstances', 'StartingInstances')
+
+    def op_describe_regions(self, **params):
+        return {'Regions': [{'RegionName': region} for region in self.regions]}
+
+    # Tags
+
+    def tag_target(self, resource_id):
+        for store in (self.instances, self.volumes, self.snapshots):
+            if resource_id in store:
+                return store[resource_id].setdefault('Tags', [])
+        if resource_id in self.network_interfaces:
+            return self.network_interfaces[resource_id]['TagSet']
+        return self.other_tags.setdefault(resource_id, [])
+
+    def op_create_tags(self, Resources, Tags):
+        if len(Resources) > 1000:
+            raise ClientError('InvalidParameterValue', 'Too many resources', 'CreateTags')
+
+        for resource_id in Resources:
+            tags = tags_to_dict(self.tag_target(resource_id))
+            tags.update(tags_to_dict(Tags))
+            self.tag_target(resource_id)[:] = [{'Key': k, 'Value': v} for k, v in tags.items()]
+        return {}
+
+    def op_delete_tags(self, Resources, Tags=None):
+        for resource_id in Resources:
+            target = self.tag_target(resource_id)
+            target[:] = [
+                tag for tag in target
+                if Tags is not None and not any(
+                    tag['Key'] == spec['Key'] and spec.get('Value') in (None, tag['Value'])
+                    for spec in Tags
+                )
+            ]
+        return {}
+
+    def op_describe_tags(self, Filters=None, **params):
+        resource_ids = next((f['Values'] for f in Filters or [] if f['Name'] == 'resource-id'), [])
+        tags = []
+        for resource_id in resource_ids:
+            for tag in self.tag_target(resource_id):
+                tags.append({'ResourceId': resource_id, 'Key': tag['Key'], 'Value': tag['Value']})
+        return {'Tags': tags}
+
+    # Network interfaces
+
+    def op_describe_network_interfaces(self, NetworkInterfaceIds=None, Filters=None, **params):
+        if NetworkInterfaceIds:
+            missing = [i for i in NetworkInterfaceIds if i not in self.network_interfaces]
+            if missing:
+                raise ClientError('InvalidNetworkInterfaceID.NotFound',
+                                  f"The networkInterface ID '{missing[0]}' does not exist",
+                                  'DescribeNetworkInterfaces')
+            interfaces = [self.network_interfaces[i] for i in NetworkInterfaceIds]
+        else:
+            interfaces = list(self.network_interfaces.values())
+        return paginate_list(interfaces, params, 'NetworkInterfaces')
+
+    # Volumes and snapshots
+
+    def op_describe_volumes(self, VolumeIds=None, Filters=None, **params):
+        if VolumeIds:
+            missing = [v for v in VolumeIds if v not in self.volumes]
+            if missing:
+                raise ClientError('InvalidVolume.NotFound',
+                                  f"The volume '{missing[0]}' does not exist", 'DescribeVolumes')
+            volumes = [self.volumes[v] for v in VolumeIds]
+        else:
+            volumes = list(self.volumes.values())
+        return paginate_list(volumes, params, 'Volumes')
+
+    def op_create_snapshot(self, VolumeId, Description='', TagSpecifications=None):
+        if VolumeId not in self.volumes:
+            raise ClientError('InvalidVolume.NotFound',
+                              f"The volume '{VolumeId}' does not exist", 'CreateSnapshot')
+
+        snapshot_id = self.new_id('snap')
+        tags = []
+        for spec in TagSpecifications or []:
+            tags.extend(spec['Tags'])
+
+        snapshot = {
+            'SnapshotId': snapshot_id,
+            'VolumeId': VolumeId,
+            'StartTime': datetime.now(timezone.utc),
+            'State': 'pending',
+            'VolumeSize': self.volumes[VolumeId]['Size'],
+            'Description': Description,
+            'OwnerId': ACCOUNT_ID,
+            'Tags': tags
+        }
+        self.snapshots[snapshot_id] = snapshot
+        return dict(snapshot)
+
+    def op_describe_snapshots(self, SnapshotIds=None, Filters=None, OwnerIds=None, **params):
+        # Snapshots complete as soon as they have been observed once
+        if SnapshotIds:
+            snapshots = [self.snapshots[s] for s in SnapshotIds if s in self.snapshots]
+        else:
+            snapshots = list(self.snapshots.values())
+
+        results = []
+        for snapshot in snapshots:
+            if matches_filters(snapshot, Filters, SNAPSHOT_FILTERS):
+                results.append(dict(snapshot))
+            if snapshot['State'] == 'pending':
+                snapshot['State'] = 'completed'
+
+        return paginate_list(results, params, 'Snapshots')
+
+    def op_delete_snapshot(self, SnapshotId):
+        if self.snapshots.pop(SnapshotId, None) is None:
+            raise ClientError('InvalidSnapshot.NotFound',
+                              f"The snapshot '{SnapshotId}' does not exist", 'DeleteSnapshot')
+        return {}
+
+    def op_copy_snapshot(self, SourceRegion, SourceSnapshotId, Description='',
+                         TagSpecifications=None, **params):
+        snapshot_id = self.new_id('snap')
+        tags = []
+        for spec in TagSpecifications or []:
+            tags.extend(spec['Tags'])
+
+        self.snapshots[snapshot_id] = {
+            'SnapshotId': snapshot_id,
+            'VolumeId': 'vol-ffffffff',
+            'StartTime': datetime.now(timezone.utc),
+            'State': 'pending',
+            'VolumeSize': 8,
+            'Description': Description,
+            'OwnerId': ACCOUNT_ID,
+            'Tags': tags
+        }
+        return {'SnapshotId': snapshot_id}
+
+
+class FakeBucket:
+    """
+    Bucket whose objects are derived from their index on demand
+
+    Object k has key '<prefix>/<k:09d>.log', where prefixes are assigned in
+    contiguous sorted ranges, so keys are in lexicographic order of k and
+    listings can be served by binary search. Only deletions are stored.
+    """
+
+    def __init__(self, name, object_count, prefix_count=16, max_age_days=120,
+                 encrypted=True, region='us-east-1', tags=None):
+        self.name = name
+        self.object_count = object_count
+        self.prefixes = [f"app-{p:02d}" for p in range(prefix_count)]
+        self.max_age_seconds = max_age_days * 86400
+        self.encrypted = encrypted
+        self.region = region
+        self.tags = tags or {}
+        self.created = datetime.now(timezone.utc)
+        self.deleted = bytearray(object_count)
+        self.deleted_count = 0
+        self.lock = threading.Lock()
+
+    def key(self, k):
+        prefix = self.prefixes[k * len(self.prefixes) // self.object_count]
+        return f"{prefix}/{k:09d}.log"
+
+    def index_of(self, key):
+        try:
+            k = int(key.rsplit('/', 1)[1][:9])
+        except (IndexError, ValueError):
+            return None
+        if 0 <= k < self.object_count and self.key(k) == key:
+            return k
+        return None
+
+    def describe(self, k):
+        return {
+            'Key': self.key(k),
+            'LastModified': self.created - timedelta(
+                seconds=(k * 2654435761) % self.max_age_seconds),
+            'Size': 1024 + (k * 40503) % (1024 * 1024),
+            'StorageClass': 'STANDARD_IA' if k % 10 == 0 else 'STANDARD',
+            'ETag': f'"{k:032x}"'
+        }
+
+    def first_index_at_or_after(self, key):
+        lo, hi = 0, self.object_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def delete(self, k):
+        with self.lock:
+            if not self.deleted[k]:
+                self.deleted[k] = 1
+                self.deleted_count += 1
+
+
+class FakeSTS(FakeClient):
+    """
+    STS stand-in reporting the fake account's identity
+    """
+
+    service = 'sts'
+
+    def op_get_caller_identity(self):
+        return {
+            'Account': ACCOUNT_ID,
+            'Arn': f"arn:aws:sts::{ACCOUNT_ID}:assumed-role/benchmark/scale-benchmark",
+            'UserId': 'AROABENCHMARK:scale-benchmark'
+        }
+
+
+class FakeS3(FakeClient):
+    """
+    S3 stand-in holding lazily generated buckets
+    """
+
+    service = 's3'
+    throttle_code = 'SlowDown'
+    throttle_status = 503
+    paginated = {
+        'list_objects_v2': ('ContinuationToken', 'NextContinuationToken', 'MaxKeys')
+    }
+
+    def __init__(self, region, stats, config, buckets=None):
+        super().__init__(region, stats, config)
+        self.buckets = buckets if buckets is not None else {}
+        self.stored = {}  # (bucket, key) -> bytes, for get_object
+        self.exceptions.ServerSideEncryptionConfigurationNotFoundError = type(
+            'ServerSideEncryptionConfigurationNotFoundError', (ClientError,), {})
+        self.exceptions.NoSuchBucket = type('NoSuchBucket', (ClientError,), {})
+
+    def add_bucket(self, bucket):
+        self.buckets[bucket.name] = bucket
+        return bucket
+
+    def add_object(self, bucket_name, key, data):
+        self.stored[(bucket_name, key)] = data
+
+    def get_bucket(self, name, operation):
+        if name not in self.buckets:
+            raise self.exceptions.NoSuchBucket('NoSuchBucket',
+                                               'The specified bucket does not exist', operation, 404)
+        return self.buckets[name]
+
+    def op_list_buckets(self):
+        return {
+            'Buckets': [
+                {'Name': name, 'CreationDate': bucket.created}
+                for name, bucket in sorted(self.buckets.items())
+            ]
+        }
+
+    def op_get_bucket_encryption(self, Bucket):
+        bucket = self.get_bucket(Bucket, 'GetBucketEncryption')
+        if not bucket.encrypted:
+            raise self.exceptions.ServerSideEncryptionConfigurationNotFoundError(
+                'ServerSideEncryptionConfigurationNotFoundError',
+                'The server side encryption configuration was not found',
+                'GetBucketEncryption', 404)
+        return {
+            'ServerSideEncryptionConfiguration': {
+                'Rules': [{
+                    'ApplyServerSideEncryptionByDefault': {'SSEAlgorithm': 'AES256'},
+                    'BucketKeyEnabled': False
+                }]
+            }
+        }
+
+    def op_get_bucket_location(self, Bucket):
+        bucket = self.get_bucket(Bucket, 'GetBucketLocation')
+        return {'LocationConstraint': None if bucket.region == 'us-east-1' else bucket.region}
+
+    def op_get_bucket_versioning(self, Bucket):
+        self.get_bucket(Bucket, 'GetBucketVersioning')
+        return {}
+
+    def op_get_bucket_tagging(self, Bucket):
+        bucket = self.get_bucket(Bucket, 'GetBucketTagging')
+        if not bucket.tags:
+            raise ClientError('NoSuchTagSet', 'The TagSet does not exist', 'GetBucketTagging', 404)
+        return {'TagSet': [{'Key': k, 'Value': v} for k, v in bucket.tags.items()]}
+
+    def op_list_objects_v2(self, Bucket, Prefix='', MaxKeys=1000, ContinuationToken=None,
+                           StartAfter=None, Delimiter=None, **params):
+        bucket = self.get_bucket(Bucket, 'ListObjectsV2')
+
+        if Delimiter == '/' and '/' not in Prefix:
+            prefixes = [p + '/' for p in bucket.prefixes if (p + '/').startswith(Prefix)]
+            return {
+                'CommonPrefixes': [{'Prefix': p} for p in prefixes],
+                'KeyCount': len(prefixes),
+                'IsTruncated': False
+            }
+
+        if ContinuationToken:
+            k = int(ContinuationToken)
+        else:
+            k = bucket.first_index_at_or_after(max(Prefix, (StartAfter or '') + '\0'))
+        end = bucket.first_index_at_or_after(Prefix + '\uffff') if Prefix else bucket.object_count
+
+        contents = []
+        while k < end and len(contents) < MaxKeys:
+            if not bucket.deleted[k]:
+                contents.append(bucket.describe(k))
+            k += 1
+
+        # Skip over deleted objects so IsTruncated is exact
+        while k < end and bucket.deleted[k]:
+            k += 1
+
+        response = {'KeyCount': len(contents), 'IsTruncated': k < end}
+        if contents:
+            response['Contents'] = contents
+        if k < end:
+            response['NextContinuationToken'] = str(k)
+        return response
+
+    def op_get_object(self, Bucket, Key, **params):
+        if (Bucket, Key) not in self.stored:
+            raise ClientError('NoSuchKey', 'The specified key does not exist.', 'GetObject', 404)
+        data = self.stored[(Bucket, Key)]
+        return {'Body': io.BytesIO(data), 'ContentLength': len(data)}
+
+    def op_delete_object(self, Bucket, Key, **params):
+        bucket = self.get_bucket(Bucket, 'DeleteObject')
+        k = bucket.index_of(Key)
+        if k is not None:
+            bucket.delete(k)
+        return {}
+
+    def op_delete_objects(self, Bucket, Delete, **params):
+        bucket = self.get_bucket(Bucket, 'DeleteObjects')
+        objects = Delete['Objects']
+        if len(objects) > 1000:
+            raise ClientError('MalformedXML', 'Too many keys', 'DeleteObjects')
+
+        deleted = []
+        for obj in objects:
+            k = bucket.index_of(obj['Key'])
+            if k is not None:
+                bucket.delete(k)
+            deleted.append({'Key': obj['Key']})
+
+        # Quiet mode only reports the keys that failed
+        if Delete.get('Quiet'):
+            return {'Errors': []}
+        return {'Deleted': deleted, 'Errors': []}
+
+
+class FakeCloudWatch(FakeClient):
+    """
+    CloudWatch stand-in serving the S3 storage metrics of the fake buckets
+    """
+
+    service = 'cloudwatch'
+
+    def __init__(self, region, stats, config, buckets=None):
+        super().__init__(region, stats, config)
+        self.buckets = buckets if buckets is not None else {}
+
+    def op_get_metric_statistics(self, Namespace, MetricName, Dimensions, StartTime, EndTime,
+                                 Period, Statistics, **params):
+        dimensions = {d['Name']: d['Value'] for d in Dimensions}
+        bucket = self.buckets.get(dimensions.get('BucketName'))
+
+        # S3 publishes storage metrics in the bucket's own region only
+        if Namespace != 'AWS/S3' or MetricName != 'NumberOfObjects' or bucket is None \
+                or bucket.region != self.meta.region_name:
+            return {'Label': MetricName, 'Datapoints': []}
+
+        # One daily datapoint, as S3 reports storage metrics once a day
+        return {
+            'Label': MetricName,
+            'Datapoints': [{
+                'Timestamp': EndTime - timedelta(days=1),
+                'Average': float(bucket.object_count),
+                'Unit': 'Count'
+            }]
+        }
+
+
+class FakeSSM(FakeClient):
+    """
+    SSM Parameter Store stand-in holding String parameters
+    """
+
+    service = 'ssm'
+
+    def __init__(self, region, stats, config, parameters=None):
+        super().__init__(region, stats, config)
+        self.parameters = parameters if parameters is not None else {}
+
+    def op_get_parameter(self, Name, WithDecryption=False):
+        if Name not in self.parameters:
+            raise ClientError('ParameterNotFound', f"Parameter {Name} not found.", 'GetParameter')
+        return {
+            'Parameter': {'Name': Name, 'Type': 'String', 'Value': self.parameters[Name], 'Version': 1}
+        }
+
+
+class FakeAWS:
+    """
+    A fake account: one set of stats and config shared by all clients
+    """
+
+    def __init__(self, config=None, regions=('us-east-1',)):
+        self.config = config or FakeConfig()
+        self.stats = CallStats()
+        self.regions = list(regions)
+        self.ec2_clients = {}
+        self.buckets = {}
+        self.s3_clients = {}
+        self.parameters = {}
+
+    def ec2(self, region=None):
+        region = region or self.regions[0]
+        if region not in self.ec2_clients:
+            self.ec2_clients[region] = FakeEC2(region, self.stats, self.config, self.regions)
+        return self.ec2_clients[region]
+
+    def s3(self, region=None):
+        region = region or self.regions[0]
+        if region not in self.s3_clients:
+            self.s3_clients[region] = FakeS3(region, self.stats, self.config, self.buckets)
+        return self.s3_clients[region]
+
+    def install(self, client_cache):
+        """
+        Register the fake clients in aws_clients' client cache
+
+        Args:
+            client_cache: aws_clients.clients dictionary
+        """
+        for region in self.regions:
+            client_cache[('ec2', region, None)] = self.ec2(region)
+            client_cache[('s3', region, None)] = self.s3(region)
+            client_cache[('sts', region, None)] = FakeSTS(region, self.stats, self.config)
+            client_cache[('cloudwatch', region, None)] = FakeCloudWatch(
+                region, self.stats, self.config, self.buckets)
+            client_cache[('ssm', region, None)] = FakeSSM(
+                region, self.stats, self.config, self.parameters)
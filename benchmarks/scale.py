@@ -0,0 +1,481 @@
+"""
+Scale benchmark for the Lambda handlers against in-process AWS stand-ins
+
+Runs each handler's lambda_handler against a synthetic fleet served by
+benchmarks/fake_aws.py (10k instances, 5M S3 keys, 3k buckets and 100k
+snapshots at --scale 1) and reports per scenario:
+- Wall time of the invocation
+- API calls, retries and throttles by operation
+- Peak RSS of the process running the scenario
+- Objects processed per second
+
+Every scenario runs in its own interpreter so peak RSS is per scenario.
+Results can be written as JSON and compared against an earlier run to
+spot regressions across commits.
+
+Usage:
+    python benchmarks/scale.py [--scale 0.01] [--latency-ms 2]
+                               [--throttle-rate 0.01] [--capacity 20]
+                               [--output results.json]
+                               [--compare baseline.json] [scenario ...]
+
+Author: AWS Lambda Automation Project
+Date: January 2026
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from fake_aws import ACCOUNT_ID, FakeAWS, FakeBucket, FakeConfig
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_DIR = os.path.join(BENCHMARK_DIR, '..', 'lambda_functions')
+REGION = 'us-east-1'
+DR_REGION = 'us-west-2'
+
+# Fleet sizes at --scale 1
+FLEET_INSTANCES = 10000
+FLEET_S3_KEYS = 5000000
+FLEET_BUCKETS = 3000
+FLEET_SNAPSHOTS = 100000
+SNAPSHOT_VOLUMES = 100
+
+
+class FakeContext:
+    """
+    Minimal Lambda context with a 15 minute timeout
+    """
+
+    function_name = 'scale-benchmark'
+    invoked_function_arn = f'arn:aws:lambda:{REGION}:{ACCOUNT_ID}:function:scale-benchmark'
+    aws_request_id = 'benchmark'
+
+    def __init__(self, timeout_ms=900000):
+        self.deadline = time.monotonic() + timeout_ms / 1000
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self.deadline - time.monotonic()) * 1000))
+
+
+def scaled(count, scale):
+    return max(1, int(count * scale))
+
+
+def setup_ec2_management(aws, scale):
+    """
+    Instances tagged Auto-Stop (running), Auto-Start (stopped) or with a
+    Schedule (always on, office hours, or never, across several time zones)
+    """
+    count = scaled(FLEET_INSTANCES, scale)
+    aws.ec2().add_instances(
+        count,
+        tag_sets=[
+            {'Action': 'Auto-Stop'},
+            {'Action': 'Auto-Start'},
+            {},
+            {'Schedule': 'Daily 00:00-24:00'},
+            {'Schedule': 'Mon-Fri 08:00-19:00 Europe/Berlin'},
+            {'Schedule': 'Weekdays 09:00-17:00 America/New_York'},
+            {'Schedule': 'Sat 00:01-00:02 Asia/Tokyo'}
+        ],
+        states=['running', 'stopped', 'running', 'stopped', 'running', 'stopped', 'running']
+    )
+    return 'assignment1_ec2_auto_management', {}, count
+
+
+def setup_s3_cleanup(aws, scale):
+    """
+    One bucket of log objects aged 0-120 days, 30 day retention
+    """
+    count = scaled(FLEET_S3_KEYS, scale)
+    aws.s3().add_bucket(FakeBucket('benchmark-logs', count))
+    event = {'bucket_name': 'benchmark-logs', 'retention_days': 30}
+    return 'assignment2_s3_cleanup', event, count
+
+
+def setup_unencrypted_s3(aws, scale):
+    """
+    Buckets of which every fifth has no default encryption
+    """
+    count = scaled(FLEET_BUCKETS, scale)
+    for n in range(count):
+        aws.s3().add_bucket(FakeBucket(f"benchmark-bucket-{n:05d}", 1, encrypted=n % 5 != 0))
+    return 'assignment3_monitor_unencrypted_s3', {}, count
+
+
+def setup_snapshot_manager(aws, scale):
+    """
+    Automated snapshots spread over 60 days across many volumes, with DR
+    """
+    count = scaled(FLEET_SNAPSHOTS, scale)
+    volumes = min(SNAPSHOT_VOLUMES, count)
+    ec2 = aws.ec2()
+    volume_ids = ec2.add_volumes(volumes)
+    ec2.add_snapshots(volume_ids, count // volumes, 60, 'Automated-Backup')
+    event = {
+        'volume_ids': volume_ids,
+        'retention_days': 30,
+        'dr_region': DR_REGION,
+        'dr_retention_days': 30
+    }
+    return 'assignment4_ebs_snapshot_manager', event, count
+
+
+def setup_auto_tag_sweep(aws, scale):
+    """
+    Account-wide sweep where a third of the instances are already tagged
+    """
+    count = scaled(FLEET_INSTANCES, scale)
+    tagged = {
+        'ManagedBy': 'Lambda', 'AutoTagged': 'True',
+        'Environment': 'Development', 'Project': 'AWS-Serverless-Lambda'
+    }
+    aws.ec2().add_instances(count, tag_sets=[{}, {'ManagedBy': 'Lambda'}, tagged])
+    return 'assignment5_auto_tag_ec2', {'mode': 'sweep'}, count
+
+
+def setup_auto_tag_batch(aws, scale):
+    """
+    SQS batch of EventBridge launch events with duplicate deliveries
+    """
+    count = scaled(FLEET_INSTANCES, scale)
+    instance_ids = aws.ec2().add_instances(count)
+    records = []
+    for n, instance_id in enumerate(instance_ids + instance_ids[:count // 10]):
+        body = {
+            'source': 'aws.ec2',
+            'detail-type': 'EC2 Instance State-change Notification',
+            'detail': {'instance-id': instance_id, 'state': 'running'}
+        }
+        records.append({'messageId': f"msg-{n}", 'body': json.dumps(body)})
+    return 'assignment5_auto_tag_ec2', {'Records': records}, len(records)
+
+
+def setup_s3_coordinator(aws, scale):
+    """
+    Tagged log buckets cleaned by worker processes, the largest in shards
+
+    Worker invocations run in a local process pool, so their API calls are
+    not included in this process's call counts.
+    """
+    count = scaled(FLEET_S3_KEYS, scale)
+    s3 = aws.s3()
+    sizes = [count // 2, count // 4, count // 8, count - count // 2 - count // 4 - count // 8]
+    for n, size in enumerate(sizes):
+        s3.add_bucket(FakeBucket(f"benchmark-logs-{n}", max(1, size), tags={'Purpose': 'logs'}))
+    s3.add_bucket(FakeBucket('benchmark-data', 1000))
+    event = {
+        'mode': 'coordinator',
+        'bucket_tag': {'Key': 'Purpose', 'Value': 'logs'},
+        'retention_days': 30,
+        'shard_max_objects': max(1, count // 8),
+        'executor': 'local'
+    }
+    return 'assignment2_s3_cleanup', event, count
+
+
+def setup_s3_analyze(aws, scale):
+    """
+    Report-only analysis of one bucket's listing
+    """
+    count = scaled(FLEET_S3_KEYS, scale)
+    aws.s3().add_bucket(FakeBucket('benchmark-logs', count))
+    event = {'mode': 'analyze', 'bucket_name': 'benchmark-logs'}
+    return 'assignment2_s3_cleanup', event, count
+
+
+def setup_s3_analyze_report(aws, scale):
+    """
+    Report-only analysis of one bucket's CSV S3 Inventory report
+    """
+    import csv
+    import gzip
+    import io
+
+    count = scaled(FLEET_S3_KEYS, scale)
+    s3 = aws.s3()
+    bucket = FakeBucket('benchmark-logs', count)
+    files_count = 4
+
+    files = []
+    for n in range(files_count):
+        text = io.StringIO()
+        writer = csv.writer(text)
+        for k in range(n * count // files_count, (n + 1) * count // files_count):
+            obj = bucket.describe(k)
+            writer.writerow([bucket.name, obj['Key'], obj['Size'],
+                             obj['LastModified'].strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                             obj['StorageClass']])
+        key = f"inventory/benchmark-logs/data/{n}.csv.gz"
+        s3.add_object('benchmark-inventory', key, gzip.compress(text.getvalue().encode()))
+        files.append({'key': key})
+
+    manifest = {
+        'sourceBucket': bucket.name,
+        'destinationBucket': 'arn:aws:s3:::benchmark-inventory',
+        'fileFormat': 'CSV',
+        'fileSchema': 'Bucket, Key, Size, LastModifiedDate, StorageClass',
+        'files': files
+    }
+    manifest_key = 'inventory/benchmark-logs/manifest.json'
+    s3.add_object('benchmark-inventory', manifest_key, json.dumps(manifest).encode())
+    event = {
+        'mode': 'analyze',
+        'inventory_manifest': {'bucket': 'benchmark-inventory', 'key': manifest_key}
+    }
+    return 'assignment2_s3_cleanup', event, count
+
+
+def setup_auto_tag_rules(aws, scale):
+    """
+    CloudTrail RunInstances events tagged by rules from an SSM parameter
+    """
+    count = scaled(FLEET_INSTANCES, scale)
+    instance_ids = aws.ec2().add_instances(count)
+    aws.parameters['/benchmark/tag-rules'] = json.dumps([
+        {
+            'match': {'principal': 'arn:aws:sts::*:assumed-role/TeamA-*'},
+            'tags': {'Team': 'A', 'Owner': '{principal_name}'},
+            'final': True
+        },
+        {
+            'match': {'instance_type': ['t3.*', 't4g.*'], 'key_name': 'key-0'},
+            'tags': {'Environment': 'Development', 'CostCenter': 'dev-{subnet_id}'}
+        },
+        {'tags': {'ManagedBy': 'Lambda', 'AutoTagged': 'True'}}
+    ])
+    os.environ['TAG_RULES_PARAMETER'] = '/benchmark/tag-rules'
+
+    records = []
+    for n in range(0, count, 10):
+        team = 'TeamA-Dev' if n % 20 == 0 else 'TeamB-Dev'
+        body = {
+            'source': 'aws.ec2',
+            'detail-type': 'AWS API Call via CloudTrail',
+            'detail': {
+                'eventName': 'RunInstances',
+                'userIdentity': {
+                    'type': 'AssumedRole',
+                    'arn': f"arn:aws:sts::123456789012:assumed-role/{team}/user{n}@example.com"
+                },
+                'responseElements': {
+                    'instancesSet': {'items': [{'instanceId': i} for i in instance_ids[n:n + 10]]}
+                }
+            }
+        }
+        records.append({'messageId': f"msg-{n}", 'body': json.dumps(body)})
+    return 'assignment5_auto_tag_ec2', {'Records': records}, count
+
+
+SCENARIOS = {
+    'ec2_management': setup_ec2_management,
+    's3_cleanup': setup_s3_cleanup,
+    's3_coordinator': setup_s3_coordinator,
+    's3_analyze': setup_s3_analyze,
+    's3_analyze_report': setup_s3_analyze_report,
+    'unencrypted_s3': setup_unencrypted_s3,
+    'snapshot_manager': setup_snapshot_manager,
+    'auto_tag_sweep': setup_auto_tag_sweep,
+    'auto_tag_batch': setup_auto_tag_batch,
+    'auto_tag_rules': setup_auto_tag_rules
+}
+
+
+def run_scenario(name, scale, latency_ms, throttle_rate, capacity=None):
+    """
+    Run one scenario in the current process
+
+    Args:
+        name: Scenario name
+        scale: Fleet size multiplier
+        latency_ms: Injected latency per API call attempt
+        throttle_rate: Probability that an API call attempt is throttled
+        capacity: Concurrent attempts per operation above which calls are throttled
+
+    Returns:
+        dict: Scenario result
+    """
+    sys.path.insert(0, LAMBDA_DIR)
+    os.environ['AWS_REGION'] = REGION
+
+    import importlib
+    import aws_clients
+    import instrumentation
+
+    aws = FakeAWS(FakeConfig(latency_ms, throttle_rate, capacity=capacity), regions=[REGION, DR_REGION])
+    module_name, event, objects = SCENARIOS[name](aws, scale)
+    aws.install(aws_clients.clients)
+    for client in aws_clients.clients.values():
+        instrumentation.instrument(client)
+    handler = importlib.import_module(module_name)
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        response = handler.lambda_handler(event, FakeContext())
+        wall = time.perf_counter() - start
+
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        'scenario': name,
+        'handler': module_name,
+        'objects': objects,
+        'wall_seconds': wall,
+        'objects_per_second': objects / wall if wall else None,
+        'peak_rss_mb': peak_rss_kb / 1024,
+        'status_code': response.get('statusCode'),
+        'response_bytes': len(response.get('body', '')),
+        'instrumented_calls': json.loads(response['body']).get('api_calls', {}).get('total_calls'),
+        **aws.stats.as_dict()
+    }
+
+
+def run_in_subprocess(name, args):
+    """
+    Run a scenario in a fresh interpreter so peak RSS is per scenario
+
+    Args:
+        name: Scenario name
+        args: Parsed command-line arguments
+
+    Returns:
+        dict: Scenario result
+    """
+    completed = subprocess.run(
+        [
+            sys.executable, os.path.abspath(__file__), '--worker', name,
+            '--scale', str(args.scale),
+            '--latency-ms', str(args.latency_ms),
+            '--throttle-rate', str(args.throttle_rate)
+        ] + (['--capacity', str(args.capacity)] if args.capacity else []),
+        capture_output=True,
+        text=True
+    )
+
+    if completed.returncode != 0:
+        return {'scenario': name, 'error': completed.stderr.strip().splitlines()[-1:]}
+
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results, baseline=None):
+    """
+    Print a summary table, with deltas against a baseline run if given
+
+    Args:
+        results: List of scenario results
+        baseline: Optional earlier results document to compare against
+    """
+    previous = {r['scenario']: r for r in (baseline or {}).get('results', [])}
+
+    print(f"\n{'scenario':<18} {'objects':>9} {'wall s':>9} {'obj/s':>10} "
+          f"{'calls':>9} {'retries':>8} {'RSS MB':>8}")
+
+    for result in results:
+        if 'error' in result:
+            print(f"{result['scenario']:<18} ERROR {' '.join(result['error'])}")
+            continue
+
+        line = (f"{result['scenario']:<18} {result['objects']:>9} "
+                f"{result['wall_seconds']:>9.2f} {result['objects_per_second']:>10.0f} "
+                f"{result['total_calls']:>9} {sum(result['retries'].values()):>8} "
+                f"{result['peak_rss_mb']:>8.1f}")
+
+        before = previous.get(result['scenario'])
+        if before and 'error' not in before and before['wall_seconds']:
+            change = (result['wall_seconds'] / before['wall_seconds'] - 1) * 100
+            line += f"  wall {change:+.0f}%, calls {result['total_calls'] - before['total_calls']:+d}"
+        print(line)
+
+        top_calls = list(result['calls'].items())[:4]
+        print(f"{'':<18} " + ', '.join(f"{op}={n}" for op, n in top_calls))
+
+
+def main(argv=None):
+    """
+    Run the scale benchmark
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv)
+
+    Returns:
+        int: Process exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='fleet size multiplier (1 = full scale)')
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='latency injected into every API call attempt')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='probability that an API call attempt is throttled')
+    parser.add_argument('--capacity', type=int,
+                        help='concurrent attempts per operation above which calls are throttled')
+    parser.add_argument('--output', help='write machine-readable results to this file')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('scenarios', nargs='*', default=list(SCENARIOS),
+                        help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        result = run_scenario(args.worker, args.scale, args.latency_ms, args.throttle_rate,
+                              args.capacity)
+        print(json.dumps(result))
+        return 0
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    results = []
+    for name in args.scenarios:
+        print(f"Running {name}...", flush=True)
+        results.append(run_in_subprocess(name, args))
+
+    config = {
+        'scale': args.scale,
+        'latency_ms': args.latency_ms,
+        'throttle_rate': args.throttle_rate,
+        'capacity': args.capacity
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('config') != config:
+            print(f"Warning: baseline was run with {baseline.get('config')}, not {config}")
+
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'commit': git_commit(),
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'config': config,
+                'results': results
+            }, f, indent=2)
+
+    return 1 if any('error' in result for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
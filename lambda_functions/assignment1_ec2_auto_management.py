@@ -4,18 +4,39 @@ Assignment 1: Automated Instance Management Using AWS Lambda and Boto3
 This Lambda function automatically manages EC2 instances based on their tags:
 - Stops instances tagged with Action=Auto-Stop
 - Starts instances tagged with Action=Auto-Start
+- Runs instances tagged with a Schedule expression (e.g.
+  'Mon-Fri 08:00-19:00 Europe/Berlin') only inside its periods, stopping
+  them outside; see schedules.py. A Schedule tag takes precedence over
+  the Action tag.
+
+Run it on a fixed rate (e.g. every 15 minutes): each run reconciles the
+whole fleet from one inventory listing with batched stop/start calls.
 
 Author: AWS Lambda Automation Project
 Date: January 2026
 """
 
-import boto3
 import json
-from datetime import datetime
+from datetime import datetime, timezone
+
+from aws_clients import get_client
+from concurrency import get_limiter
+from inventory import (
+    apply_state_change, get_instances, list_instances, patch_instance_states, set_account
+)
+from instrumentation import instrumented_handler
+from schedules import get_schedule
+from structured_log import get_logger, logged_handler
+
+logger = get_logger(__name__)
 
-# Initialize EC2 client
-ec2 = boto3.client('ec2')
+# Configuration
+SCHEDULE_TAG_KEY = 'Schedule'
+STATE_CHANGE_BATCH_SIZE = 1000  # instance IDs per stop_instances/start_instances call
 
+
+@logged_handler
+@instrumented_handler
 def lambda_handler(event, context):
     """
     Main Lambda handler function
@@ -28,40 +49,47 @@ def lambda_handler(event, context):
         dict: Response with statusCode and processed instance details
     """
     
-    print(f"Lambda function started at {datetime.utcnow().isoformat()}")
+    logger.info("Lambda function started")
+    
+    # Keep the warm inventory current when wired to state-change events
+    set_account(context)
+    apply_state_change(event)
     
     response = {
         'stopped_instances': [],
         'started_instances': [],
+        'scheduled_instances': 0,
+        'invalid_schedules': [],
         'errors': []
     }
     
     try:
-        # Process Auto-Stop instances
-        print("Searching for instances with Action=Auto-Stop tag...")
-        stop_instances = get_instances_by_tag('Action', 'Auto-Stop')
+        # One listing serves both tags; desired states are computed in memory
+        stop_instances, start_instances = plan_state_changes(
+            list_instances(['running', 'stopped']),
+            datetime.now(timezone.utc),
+            response
+        )
         
         if stop_instances:
-            print(f"Found {len(stop_instances)} instance(s) to stop: {stop_instances}")
+            logger.info("Found instances to stop", count=len(stop_instances))
+            logger.debug("Instances to stop", instance_ids=stop_instances)
             stop_result = stop_ec2_instances(stop_instances)
             response['stopped_instances'] = stop_result
         else:
-            print("No instances found with Auto-Stop tag")
-        
-        # Process Auto-Start instances
-        print("Searching for instances with Action=Auto-Start tag...")
-        start_instances = get_instances_by_tag('Action', 'Auto-Start')
+            logger.info("No instances to stop")
         
         if start_instances:
-            print(f"Found {len(start_instances)} instance(s) to start: {start_instances}")
+            logger.info("Found instances to start", count=len(start_instances))
+            logger.debug("Instances to start", instance_ids=start_instances)
             start_result = start_ec2_instances(start_instances)
             response['started_instances'] = start_result
         else:
-            print("No instances found with Auto-Start tag")
+            logger.info("No instances to start")
             
     except Exception as e:
         error_msg = f"Error in lambda_handler: {str(e)}"
-        print(error_msg)
+        logger.error(error_msg)
         response['errors'].append(error_msg)
         
         return {
@@ -69,9 +97,11 @@ def lambda_handler(event, context):
             'body': json.dumps(response)
         }
     
-    print(f"Lambda function completed successfully")
-    print(f"Summary: Stopped {len(response['stopped_instances'])} instance(s), "
-          f"Started {len(response['started_instances'])} instance(s)")
+    logger.info(
+        "Lambda function completed successfully",
+        stopped=len(response['stopped_instances']),
+        started=len(response['started_instances'])
+    )
     
     return {
         'statusCode': 200,
@@ -79,41 +109,52 @@ def lambda_handler(event, context):
     }
 
 
-def get_instances_by_tag(tag_key, tag_value):
+def plan_state_changes(instances, now, response):
     """
-    Get EC2 instance IDs by tag key and value
+    Decide which instances to stop and start
     
     Args:
-        tag_key: The tag key to filter by
-        tag_value: The tag value to filter by
+        instances: Instance records from the inventory
+        now: Timezone-aware current time
+        response: Handler response; scheduled_instances and
+                  invalid_schedules are filled in
         
     Returns:
-        list: List of instance IDs matching the tag
+        tuple: (IDs of running instances to stop, IDs of stopped instances to start)
     """
-    try:
-        response = ec2.describe_instances(
-            Filters=[
-                {
-                    'Name': f'tag:{tag_key}',
-                    'Values': [tag_value]
-                },
-                {
-                    'Name': 'instance-state-name',
-                    'Values': ['running', 'stopped']
-                }
-            ]
-        )
-        
-        instance_ids = []
-        for reservation in response['Reservations']:
-            for instance in reservation['Instances']:
-                instance_ids.append(instance['InstanceId'])
-                
-        return instance_ids
+    to_stop = []
+    to_start = []
+    
+    for instance in instances:
+        tags = instance['Tags']
+        expression = tags.get(SCHEDULE_TAG_KEY)
+        
+        if expression:
+            try:
+                desired = get_schedule(expression).desired_state(now)
+            except ValueError as e:
+                logger.warning("Invalid schedule", instance_id=instance['InstanceId'],
+                               schedule=expression, error=str(e))
+                response['invalid_schedules'].append({
+                    'InstanceId': instance['InstanceId'],
+                    'Schedule': expression,
+                    'Error': str(e)
+                })
+                continue
+            response['scheduled_instances'] += 1
+        elif tags.get('Action') == 'Auto-Stop':
+            desired = 'stopped'
+        elif tags.get('Action') == 'Auto-Start':
+            desired = 'running'
+        else:
+            continue
         
-    except Exception as e:
-        print(f"Error getting instances by tag: {str(e)}")
-        raise
+        if desired == 'stopped' and instance['State'] == 'running':
+            to_stop.append(instance['InstanceId'])
+        elif desired == 'running' and instance['State'] == 'stopped':
+            to_start.append(instance['InstanceId'])
+    
+    return to_stop, to_start
 
 
 def stop_ec2_instances(instance_ids):
@@ -126,22 +167,26 @@ def stop_ec2_instances(instance_ids):
     Returns:
         list: List of dictionaries with instance details
     """
+    ec2 = get_client('ec2')
     stopped_instances = []
     
     try:
         # Filter only running instances
         running_instances = []
+        instances = get_instances(instance_ids)
         for instance_id in instance_ids:
-            instance_info = ec2.describe_instances(InstanceIds=[instance_id])
-            state = instance_info['Reservations'][0]['Instances'][0]['State']['Name']
+            state = instances[instance_id]['State'] if instance_id in instances else 'not found'
             
             if state == 'running':
                 running_instances.append(instance_id)
             else:
-                print(f"Instance {instance_id} is already {state}, skipping stop operation")
+                logger.debug("Instance not running, skipping stop", instance_id=instance_id, state=state)
         
-        if running_instances:
-            response = ec2.stop_instances(InstanceIds=running_instances)
+        for i in range(0, len(running_instances), STATE_CHANGE_BATCH_SIZE):
+            response = get_limiter('ec2', 'write').call(
+                ec2.stop_instances, InstanceIds=running_instances[i:i + STATE_CHANGE_BATCH_SIZE]
+            )
+            patch_instance_states(response['StoppingInstances'])
             
             for instance in response['StoppingInstances']:
                 instance_detail = {
@@ -150,14 +195,12 @@ def stop_ec2_instances(instance_ids):
                     'CurrentState': instance['CurrentState']['Name']
                 }
                 stopped_instances.append(instance_detail)
-                print(f"Stopped instance: {instance['InstanceId']} "
-                      f"(Previous: {instance['PreviousState']['Name']}, "
-                      f"Current: {instance['CurrentState']['Name']})")
+                logger.debug("Stopped instance", **instance_detail)
         
         return stopped_instances
         
     except Exception as e:
-        print(f"Error stopping instances: {str(e)}")
+        logger.error("Error stopping instances", error=str(e))
         raise
 
 
@@ -171,22 +214,26 @@ def start_ec2_instances(instance_ids):
     Returns:
         list: List of dictionaries with instance details
     """
+    ec2 = get_client('ec2')
     started_instances = []
     
     try:
         # Filter only stopped instances
         stopped_instances = []
+        instances = get_instances(instance_ids)
         for instance_id in instance_ids:
-            instance_info = ec2.describe_instances(InstanceIds=[instance_id])
-            state = instance_info['Reservations'][0]['Instances'][0]['State']['Name']
+            state = instances[instance_id]['State'] if instance_id in instances else 'not found'
             
             if state == 'stopped':
                 stopped_instances.append(instance_id)
             else:
-                print(f"Instance {instance_id} is already {state}, skipping start operation")
+                logger.debug("Instance not stopped, skipping start", instance_id=instance_id, state=state)
         
-        if stopped_instances:
-            response = ec2.start_instances(InstanceIds=stopped_instances)
+        for i in range(0, len(stopped_instances), STATE_CHANGE_BATCH_SIZE):
+            response = get_limiter('ec2', 'write').call(
+                ec2.start_instances, InstanceIds=stopped_instances[i:i + STATE_CHANGE_BATCH_SIZE]
+            )
+            patch_instance_states(response['StartingInstances'])
             
             for instance in response['StartingInstances']:
                 instance_detail = {
@@ -195,12 +242,10 @@ def start_ec2_instances(instance_ids):
                     'CurrentState': instance['CurrentState']['Name']
                 }
                 started_instances.append(instance_detail)
-                print(f"Started instance: {instance['InstanceId']} "
-                      f"(Previous: {instance['PreviousState']['Name']}, "
-                      f"Current: {instance['CurrentState']['Name']})")
+                logger.debug("Started instance", **instance_detail)
         
         return started_instances
         
     except Exception as e:
-        print(f"Error starting instances: {str(e)}")
+        logger.error("Error starting instances", error=str(e))
         raise
@@ -4,21 +4,71 @@ Assignment 2: Automated S3 Bucket Cleanup Using AWS Lambda and Boto3
 This Lambda function automatically deletes files older than 30 days 
 from a specified S3 bucket.
 
+A coordinator mode ({"mode": "coordinator"}) cleans many buckets at once:
+it selects buckets by tag or name pattern, estimates their size from the
+CloudWatch NumberOfObjects metric, splits large buckets into shards of
+top-level prefixes and dispatches each shard to a worker invocation
+({"mode": "worker"}) of this function, then aggregates the results.
+
+An analyze mode ({"mode": "analyze"}) deletes nothing: it streams a
+bucket's listing, or its S3 Inventory report, through mergeable sketches
+and reports age and size distributions per top-level prefix and storage
+class, with the objects and bytes each candidate retention would reclaim.
+The coordinator runs it across buckets with {"action": "analyze"}.
+
 Author: AWS Lambda Automation Project
 Date: January 2026
 """
 
-import boto3
 import json
+import os
+import time
 from datetime import datetime, timezone, timedelta
+from fnmatch import fnmatch
 
-# Initialize S3 client
-s3 = boto3.client('s3')
+from aws_clients import get_client
+from concurrency import get_limiter, imap_calls, map_calls
+from fanout import get_executor
+from instrumentation import instrumented_handler
+from sketches import Histogram, QuantileSketch
+from structured_log import get_logger, logged_handler
+
+logger = get_logger(__name__)
 
 # Configuration
 BUCKET_NAME = 'ghanshyam-cleanup-bucket'  # Replace with your bucket name
 RETENTION_DAYS = 30
+DELETE_BATCH_SIZE = 1000  # keys per delete_objects call (S3 maximum)
+
+# Coordinator mode configuration
+BUCKET_TAG = None  # e.g. {'Key': 'Purpose', 'Value': 'logs'}
+BUCKET_PATTERN = None  # e.g. '*-logs'; fnmatch pattern on bucket names
+SHARD_MAX_OBJECTS = 2000000  # estimated objects per worker invocation
+MAX_SHARDS_PER_BUCKET = 50
+UNKNOWN_SIZE_SHARDS = 1  # shards for buckets without a size estimate (e.g. new buckets)
+WORKER_EXECUTOR = os.environ.get('WORKER_EXECUTOR', 'lambda')  # 'lambda' or 'local'
+WORKER_FUNCTION_NAME = os.environ.get('WORKER_FUNCTION_NAME')  # defaults to this function
+WORKER_TIME_BUFFER = 30  # seconds of invocation time kept in reserve
+
+# Analyze mode configuration
+ANALYZE_RETENTIONS = [7, 14, 30, 90]  # candidate retention days
+AGE_HISTOGRAM_DAYS = [1, 7, 14, 30, 60, 90, 180, 365]
+SIZE_HISTOGRAM_BYTES = [1024, 64 * 1024, 1024 ** 2, 16 * 1024 ** 2, 128 * 1024 ** 2, 1024 ** 3]
+REPORT_QUANTILES = [0.5, 0.9, 0.99]
+MAX_ANALYSIS_GROUPS = 1000  # (prefix, storage class) groups before folding into OTHER_PREFIX
+OTHER_PREFIX = '(other)'
+
+# A group serializes to at most ~15 KB, so 200 groups stay far below the
+# 6 MB synchronous invoke response limit; the byte budget is a backstop
+WORKER_MAX_ANALYSIS_GROUPS = 200
+MAX_RESPONSE_BYTES = 5 * 1024 * 1024
+
+# A reported prefix takes ~2 KB per storage class, so reports list each
+# bucket's largest prefixes and fold the rest into OTHER_PREFIX
+REPORT_MAX_PREFIXES = 50
 
+@logged_handler
+@instrumented_handler
 def lambda_handler(event, context):
     """
     Main Lambda handler function
@@ -31,19 +81,28 @@ def lambda_handler(event, context):
         dict: Response with statusCode and deleted files details
     """
     
-    print(f"Lambda function started at {datetime.now(timezone.utc).isoformat()}")
+    logger.info("Lambda function started")
+    
+    if event.get('mode') == 'coordinator':
+        return run_coordinator(event, context)
+    
+    if event.get('mode') == 'worker':
+        return run_worker(event, context)
+    
+    if event.get('mode') == 'analyze':
+        return run_analyze(event, context)
     
     # Allow bucket name override from event
     bucket_name = event.get('bucket_name', BUCKET_NAME)
     retention_days = event.get('retention_days', RETENTION_DAYS)
     
-    print(f"Processing bucket: {bucket_name}")
-    print(f"Retention period: {retention_days} days")
+    logger.info("Processing bucket", bucket=bucket_name, retention_days=retention_days)
     
     response = {
         'bucket': bucket_name,
         'retention_days': retention_days,
         'deleted_files': [],
+        'failed_deletes': [],
         'total_size_deleted_bytes': 0,
         'errors': []
     }
@@ -51,18 +110,21 @@ def lambda_handler(event, context):
     try:
         # Calculate cutoff date
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=retention_days)
-        print(f"Cutoff date: {cutoff_date.isoformat()}")
+        logger.info("Cutoff date", cutoff_date=cutoff_date.isoformat())
         
         # List and delete old objects
-        deleted_files = delete_old_files(bucket_name, cutoff_date)
+        deleted_files = delete_old_files(bucket_name, cutoff_date, response['failed_deletes'])
         
         response['deleted_files'] = deleted_files
         response['total_size_deleted_bytes'] = sum(f['size'] for f in deleted_files)
         
-        print(f"Cleanup completed successfully")
-        print(f"Total files deleted: {len(deleted_files)}")
-        print(f"Total size freed: {response['total_size_deleted_bytes']} bytes "
-              f"({response['total_size_deleted_bytes'] / (1024*1024):.2f} MB)")
+        logger.info(
+            "Cleanup completed successfully",
+            files_deleted=len(deleted_files),
+            files_failed=len(response['failed_deletes']),
+            bytes_freed=response['total_size_deleted_bytes'],
+            mb_freed=round(response['total_size_deleted_bytes'] / (1024*1024), 2)
+        )
         
         return {
             'statusCode': 200,
@@ -71,7 +133,7 @@ def lambda_handler(event, context):
         
     except Exception as e:
         error_msg = f"Error in lambda_handler: {str(e)}"
-        print(error_msg)
+        logger.error(error_msg)
         response['errors'].append(error_msg)
         
         return {
@@ -80,78 +142,1144 @@ def lambda_handler(event, context):
         }
 
 
-def delete_old_files(bucket_name, cutoff_date):
+def delete_old_files(bucket_name, cutoff_date, failed=None):
     """
     Delete files older than the cutoff date from S3 bucket
     
     Args:
         bucket_name: Name of the S3 bucket
         cutoff_date: Datetime object representing the cutoff date
+        failed: Optional list that collects the keys S3 failed to delete
         
     Returns:
         list: List of deleted file details
     """
     deleted_files = []
-    continuation_token = None
     
-    try:
-        while True:
-            # List objects in bucket (with pagination)
-            list_params = {
-                'Bucket': bucket_name,
-                'MaxKeys': 1000
-            }
-            
-            if continuation_token:
-                list_params['ContinuationToken'] = continuation_token
-            
-            response = s3.list_objects_v2(**list_params)
-            
-            if 'Contents' not in response:
-                print(f"No objects found in bucket: {bucket_name}")
-                break
+    for page in delete_old_files_by_page(bucket_name, cutoff_date, failed=failed):
+        deleted_files.extend(page)
+    
+    return deleted_files
+
+
+def delete_old_files_by_page(bucket_name, cutoff_date, prefix='', delimiter=None,
+                             context=None, deadline=None, status=None, failed=None):
+    """
+    Delete files older than the cutoff date, one delete batch at a time
+    
+    Expired objects from consecutive listed pages are collected into
+    batches of up to DELETE_BATCH_SIZE keys. The batches are deleted with
+    delete_objects concurrently, within the adaptive 's3'/'delete' limiter,
+    while the listing continues. Keys S3 reports under Errors are not
+    counted as deleted.
+    
+    Args:
+        bucket_name: Name of the S3 bucket
+        cutoff_date: Datetime object representing the cutoff date
+        prefix, delimiter, context, deadline, status: See list_object_pages
+        failed: Optional list that collects {'key', 'code', 'message'} for
+                each key S3 failed to delete
+        
+    Yields:
+        list: Details of the files deleted by each batch
+    """
+    s3 = get_client('s3')
+    limiter = get_limiter('s3', 'delete')
+    progress = logger.progress("Cleanup progress")
+    counts = {'deleted': 0}
+    
+    def expired_batches():
+        expired = []
+        
+        for contents in list_object_pages(bucket_name, prefix, delimiter, context, deadline, status):
+            now = datetime.now(timezone.utc)
             
             # Process each object
-            for obj in response['Contents']:
+            for obj in contents:
                 key = obj['Key']
                 last_modified = obj['LastModified']
-                size = obj['Size']
                 
                 # Check if file is older than cutoff date
                 if last_modified < cutoff_date:
-                    age_days = (datetime.now(timezone.utc) - last_modified).days
-                    
-                    print(f"Deleting: {key} (Last modified: {last_modified.isoformat()}, "
-                          f"Age: {age_days} days, Size: {size} bytes)")
-                    
-                    try:
-                        # Delete the object
-                        s3.delete_object(Bucket=bucket_name, Key=key)
-                        
-                        deleted_files.append({
-                            'key': key,
-                            'last_modified': last_modified.isoformat(),
-                            'age_days': age_days,
-                            'size': size
-                        })
-                        
-                    except Exception as delete_error:
-                        print(f"Error deleting {key}: {str(delete_error)}")
+                    if logger.debug_enabled and logger.sampled('delete'):
+                        logger.debug("Deleting object", key=key, last_modified=last_modified,
+                                     age_days=(now - last_modified).days, size=obj['Size'])
+                    expired.append(obj)
+                    if len(expired) == DELETE_BATCH_SIZE:
+                        yield expired
+                        expired = []
+                elif logger.debug_enabled and logger.sampled('keep'):
+                    logger.debug("Keeping object", key=key, age_days=(now - last_modified).days)
+            
+            progress.update(len(contents), deleted=counts['deleted'])
+        
+        if expired:
+            yield expired
+    
+    try:
+        results = imap_calls(lambda batch: delete_batch(s3, bucket_name, batch), expired_batches(), limiter)
+        
+        for batch, errors, delete_error in results:
+            now = datetime.now(timezone.utc)
+            if delete_error:
+                logger.error("Error deleting objects", keys=len(batch), error=str(delete_error))
+                errors = [{'Key': obj['Key'], 'Message': str(delete_error)} for obj in batch]
+            
+            failed_keys = set()
+            for error in errors:
+                if not delete_error:
+                    logger.error("Error deleting object", key=error['Key'], code=error.get('Code'),
+                                 error=error.get('Message'))
+                failed_keys.add(error['Key'])
+                if failed is not None:
+                    failed.append({'key': error['Key'], 'code': error.get('Code'),
+                                   'message': error.get('Message')})
+            
+            deleted_files = [
+                {
+                    'key': obj['Key'],
+                    'last_modified': obj['LastModified'].isoformat(),
+                    'age_days': (now - obj['LastModified']).days,
+                    'size': obj['Size']
+                }
+                for obj in batch
+                if obj['Key'] not in failed_keys
+            ]
+            
+            counts['deleted'] += len(deleted_files)
+            yield deleted_files
+        
+    except Exception as e:
+        logger.error("Error in delete_old_files", error=str(e))
+        raise
+
+
+def delete_batch(s3, bucket_name, objects):
+    """
+    Delete up to DELETE_BATCH_SIZE objects with one delete_objects call
+    
+    Args:
+        s3: S3 client
+        bucket_name: Name of the S3 bucket
+        objects: Listed objects to delete
+        
+    Returns:
+        list: Per-key errors reported by S3 ({'Key', 'Code', 'Message'})
+    """
+    response = s3.delete_objects(
+        Bucket=bucket_name,
+        Delete={'Objects': [{'Key': obj['Key']} for obj in objects], 'Quiet': True}
+    )
+    return response.get('Errors', [])
+
+
+def list_object_pages(bucket_name, prefix='', delimiter=None, context=None, deadline=None,
+                      status=None):
+    """
+    List a bucket's objects one page at a time
+    
+    With a delimiter only the objects directly under the prefix are listed.
+    
+    Args:
+        bucket_name: Name of the S3 bucket
+        prefix: Only list keys starting with this prefix
+        delimiter: Optional delimiter (e.g. '/') for the listing
+        context: Lambda context object (used to stop before the timeout)
+        deadline: Optional epoch time after which no new page is started
+        status: Optional dictionary; 'complete' is set to False when the
+                listing is cut short by the time limit
+        
+    Yields:
+        list: Objects of each page, in list_objects_v2 format
+    """
+    s3 = get_client('s3')
+    continuation_token = None
+    
+    while True:
+        # List objects in bucket (with pagination)
+        list_params = {
+            'Bucket': bucket_name,
+            'Prefix': prefix,
+            'MaxKeys': 1000
+        }
+        
+        if delimiter:
+            list_params['Delimiter'] = delimiter
+        
+        if continuation_token:
+            list_params['ContinuationToken'] = continuation_token
+        
+        response = s3.list_objects_v2(**list_params)
+        contents = response.get('Contents', [])
+        
+        if not contents and not response.get('IsTruncated', False):
+            logger.info("No more objects found in bucket", bucket=bucket_name, prefix=prefix)
+            break
+        
+        yield contents
+        
+        # Check if there are more objects to process
+        if not response.get('IsTruncated', False):
+            break
+        
+        if is_out_of_time(context, deadline):
+            logger.warning("Stopping early to stay within the time limit",
+                           bucket=bucket_name, prefix=prefix)
+            if status is not None:
+                status['complete'] = False
+            break
+        
+        continuation_token = response['NextContinuationToken']
+
+
+class StorageAnalysis:
+    """
+    Age and size distributions per top-level prefix and storage class
+    
+    Each (prefix, storage class) group holds quantile sketches and
+    histograms of object ages (days) and sizes (bytes), so memory does not
+    grow with the number of objects. Groups beyond MAX_ANALYSIS_GROUPS are
+    folded into OTHER_PREFIX. Analyses of shards merge into the analysis
+    of the whole bucket.
+    """
+    
+    def __init__(self, retentions=ANALYZE_RETENTIONS):
+        self.retentions = sorted(set(retentions))
+        self.age_edges = sorted(set(self.retentions) | set(AGE_HISTOGRAM_DAYS))
+        self.groups = {}  # (prefix, storage class) -> sketches
+    
+    def new_group(self):
+        return {
+            'ages': QuantileSketch(),
+            'sizes': QuantileSketch(),
+            'age_histogram': Histogram(self.age_edges),
+            'size_histogram': Histogram(SIZE_HISTOGRAM_BYTES)
+        }
+    
+    def get_group(self, prefix, storage_class):
+        group = self.groups.get((prefix, storage_class))
+        if group is None:
+            if len(self.groups) >= MAX_ANALYSIS_GROUPS and prefix != OTHER_PREFIX:
+                return self.get_group(OTHER_PREFIX, storage_class)
+            group = self.groups[(prefix, storage_class)] = self.new_group()
+        return group
+    
+    def add(self, key, size, age_days, storage_class):
+        """
+        Add one object
+        
+        Args:
+            key: Object key
+            size: Object size in bytes
+            age_days: Days since the object was last modified
+            storage_class: Object storage class
+        """
+        prefix = key.split('/', 1)[0] + '/' if '/' in key else ''
+        group = self.get_group(prefix, storage_class)
+        group['ages'].add(age_days)
+        group['sizes'].add(size)
+        group['age_histogram'].add(age_days, size)
+        group['size_histogram'].add(size, size)
+    
+    def limit_groups(self, max_groups):
+        """
+        Fold all but the largest groups into OTHER_PREFIX
+        
+        Totals and storage class breakdowns are unchanged; only the
+        smallest prefixes lose their own entry.
+        
+        Args:
+            max_groups: Number of groups (by object count) to keep
+            
+        Returns:
+            int: Number of groups folded
+        """
+        ranked = sorted(
+            (key for key in self.groups if key[0] != OTHER_PREFIX),
+            key=lambda key: self.groups[key]['sizes'].count,
+            reverse=True
+        )
+        
+        for prefix, storage_class in ranked[max_groups:]:
+            merge_group(self.get_group(OTHER_PREFIX, storage_class),
+                        self.groups.pop((prefix, storage_class)))
+        
+        return len(ranked[max_groups:])
+    
+    def merge(self, other):
+        """
+        Add the groups of another analysis with the same retentions
+        
+        Args:
+            other: StorageAnalysis
+        """
+        if other.retentions != self.retentions:
+            raise ValueError("Cannot merge analyses with different retentions")
+        
+        for (prefix, storage_class), group in other.groups.items():
+            merge_group(self.get_group(prefix, storage_class), group)
+    
+    def to_dict(self):
+        return {
+            'retentions': self.retentions,
+            'groups': [
+                {
+                    'prefix': prefix,
+                    'storage_class': storage_class,
+                    **{name: sketch.to_dict() for name, sketch in group.items()}
+                }
+                for (prefix, storage_class), group in self.groups.items()
+            ]
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        analysis = cls(data['retentions'])
+        for entry in data['groups']:
+            analysis.groups[(entry['prefix'], entry['storage_class'])] = {
+                'ages': QuantileSketch.from_dict(entry['ages']),
+                'sizes': QuantileSketch.from_dict(entry['sizes']),
+                'age_histogram': Histogram.from_dict(entry['age_histogram']),
+                'size_histogram': Histogram.from_dict(entry['size_histogram'])
+            }
+        return analysis
+    
+    def summarize(self, max_prefixes=None):
+        """
+        Build the report: totals, then breakdowns by storage class and by
+        prefix (each prefix also broken down by storage class)
+        
+        Args:
+            max_prefixes: Optional number of prefixes (by object count) to
+                          report; the others are folded into OTHER_PREFIX
+        
+        Returns:
+            dict: Report of the analysis
+        """
+        groups = self.groups
+        folded = set()
+        
+        if max_prefixes is not None:
+            counts = {}
+            for (prefix, _), group in self.groups.items():
+                if prefix != OTHER_PREFIX:
+                    counts[prefix] = counts.get(prefix, 0) + group['sizes'].count
+            folded = set(sorted(counts, key=lambda prefix: (-counts[prefix], prefix))[max_prefixes:])
+        
+        if folded:
+            groups = {}
+            for (prefix, storage_class), group in self.groups.items():
+                if prefix in folded or prefix == OTHER_PREFIX:
+                    merge_group(groups.setdefault((OTHER_PREFIX, storage_class), self.new_group()), group)
                 else:
-                    age_days = (datetime.now(timezone.utc) - last_modified).days
-                    print(f"Keeping: {key} (Age: {age_days} days)")
+                    groups[(prefix, storage_class)] = group
+        
+        total = self.new_group()
+        by_class = {}
+        by_prefix = {}
+        
+        for (prefix, storage_class), group in sorted(groups.items()):
+            merge_group(total, group)
+            merge_group(by_class.setdefault(storage_class, self.new_group()), group)
+            merge_group(by_prefix.setdefault(prefix, self.new_group()), group)
+        
+        prefixes = {}
+        for prefix, group in by_prefix.items():
+            prefixes[prefix] = self.summarize_group(group)
+            prefixes[prefix]['storage_classes'] = {
+                storage_class: self.summarize_group(class_group)
+                for (group_prefix, storage_class), class_group in sorted(groups.items())
+                if group_prefix == prefix
+            }
+        
+        return {
+            'retentions': self.retentions,
+            'total': self.summarize_group(total),
+            'storage_classes': {
+                storage_class: self.summarize_group(group)
+                for storage_class, group in by_class.items()
+            },
+            'prefixes': prefixes,
+            'folded_prefixes': len(folded)
+        }
+    
+    def summarize_group(self, group):
+        """
+        Summarize one group's sketches
+        
+        Args:
+            group: Sketches of a group (see new_group)
             
-            # Check if there are more objects to process
-            if response.get('IsTruncated', False):
-                continuation_token = response['NextContinuationToken']
-            else:
+        Returns:
+            dict: Counts, quantiles, histograms and reclaimable amounts
+        """
+        sizes = group['sizes']
+        ages = group['ages']
+        total_bytes = int(sizes.sum)
+        
+        reclaimable = []
+        for retention_days in self.retentions:
+            objects, reclaimable_bytes = group['age_histogram'].at_or_above(retention_days)
+            reclaimable.append({
+                'retention_days': retention_days,
+                'objects': objects,
+                'bytes': reclaimable_bytes,
+                'percent_bytes': round(100 * reclaimable_bytes / total_bytes, 2) if total_bytes else 0.0
+            })
+        
+        return {
+            'objects': sizes.count,
+            'bytes': total_bytes,
+            'age_days': summarize_quantiles(ages, 1),
+            'size_bytes': summarize_quantiles(sizes, 0),
+            'age_histogram': summarize_histogram(group['age_histogram'], 'days'),
+            'size_histogram': summarize_histogram(group['size_histogram'], 'bytes'),
+            'reclaimable': reclaimable
+        }
+
+
+def merge_group(target, source):
+    """
+    Merge the sketches of one analysis group into another
+    """
+    for name, sketch in source.items():
+        target[name].merge(sketch)
+
+
+def summarize_quantiles(sketch, digits):
+    """
+    Report a sketch's quantiles and maximum, rounded to the given digits
+    """
+    summary = {
+        f"p{round(q * 100)}": round(sketch.quantile(q), digits) if sketch.count else None
+        for q in REPORT_QUANTILES
+    }
+    summary['max'] = round(sketch.max, digits) if sketch.count else None
+    return summary
+
+
+def summarize_histogram(histogram, unit):
+    """
+    Report a histogram's non-empty buckets with their bounds
+    """
+    bounds = [None] + histogram.edges + [None]
+    return [
+        {
+            f"min_{unit}": bounds[i],
+            f"max_{unit}": bounds[i + 1],
+            'objects': count,
+            'bytes': histogram.weights[i]
+        }
+        for i, count in enumerate(histogram.counts)
+        if count
+    ]
+
+
+def run_analyze(event, context):
+    """
+    Report a bucket's age and size distributions without deleting anything
+    
+    Args:
+        event: Analyze event with bucket_name or inventory_manifest
+               ({'bucket', 'key'} of an S3 Inventory manifest.json), and
+               optionally retentions (candidate retention days)
+        context: Lambda context object
+        
+    Returns:
+        dict: Response with the analysis report
+    """
+    retentions = event.get('retentions', ANALYZE_RETENTIONS)
+    manifest = event.get('inventory_manifest')
+    bucket_name = event.get('bucket_name', BUCKET_NAME)
+    analysis = StorageAnalysis(retentions)
+    status = {'complete': True}
+    
+    response = {
+        'mode': 'analyze',
+        'bucket': bucket_name,
+        'source': 'inventory' if manifest else 'listing',
+        'objects_scanned': 0,
+        'complete': True,
+        'errors': []
+    }
+    
+    try:
+        if manifest:
+            response['bucket'], response['objects_scanned'] = analyze_inventory(
+                manifest, analysis, context, status=status)
+        else:
+            response['objects_scanned'] = analyze_objects(
+                bucket_name, analysis, context=context, status=status)
+        
+        response['complete'] = status['complete']
+        response['analysis'] = analysis.summarize(REPORT_MAX_PREFIXES)
+        
+        logger.info(
+            "Analysis completed",
+            bucket=response['bucket'],
+            objects_scanned=response['objects_scanned'],
+            groups=len(analysis.groups),
+            complete=response['complete']
+        )
+        
+        return {
+            'statusCode': 200,
+            'body': json.dumps(response, default=str)
+        }
+        
+    except Exception as e:
+        error_msg = f"Error in run_analyze: {str(e)}"
+        logger.error(error_msg)
+        response['errors'].append(error_msg)
+        
+        return {
+            'statusCode': 500,
+            'body': json.dumps(response, default=str)
+        }
+
+
+def analyze_objects(bucket_name, analysis, prefix='', delimiter=None, context=None,
+                    deadline=None, status=None):
+    """
+    Stream a bucket's listing into an analysis
+    
+    Args:
+        bucket_name: Name of the S3 bucket
+        analysis: StorageAnalysis to add the objects to
+        prefix, delimiter, context, deadline, status: See list_object_pages
+        
+    Returns:
+        int: Number of objects scanned
+    """
+    scanned = 0
+    progress = logger.progress("Analysis progress")
+    
+    for contents in list_object_pages(bucket_name, prefix, delimiter, context, deadline, status):
+        now = datetime.now(timezone.utc)
+        
+        for obj in contents:
+            analysis.add(
+                obj['Key'],
+                obj['Size'],
+                (now - obj['LastModified']).total_seconds() / 86400,
+                obj.get('StorageClass', 'STANDARD')
+            )
+        
+        scanned += len(contents)
+        progress.update(len(contents))
+    
+    return scanned
+
+
+def analyze_inventory(manifest, analysis, context=None, deadline=None, status=None):
+    """
+    Stream a CSV S3 Inventory report into an analysis
+    
+    Report files are decompressed and parsed as they are downloaded; only
+    the latest version of each object is counted and delete markers are
+    skipped, matching what a listing returns.
+    
+    Args:
+        manifest: {'bucket', 'key'} of the report's manifest.json
+        analysis: StorageAnalysis to add the objects to
+        context: Lambda context object (used to stop before the timeout)
+        deadline: Optional epoch time after which no new file is started
+        status: Optional dictionary; 'complete' is set to False when the
+                report is cut short by the time limit
+        
+    Returns:
+        tuple: (source bucket name, number of objects scanned)
+    """
+    import csv
+    import gzip
+    import io
+    from urllib.parse import unquote
+    
+    s3 = get_client('s3')
+    body = s3.get_object(Bucket=manifest['bucket'], Key=manifest['key'])['Body']
+    report = json.loads(body.read())
+    
+    if report.get('fileFormat', 'CSV') != 'CSV':
+        raise ValueError(f"Unsupported inventory format: {report['fileFormat']}")
+    
+    columns = [column.strip() for column in report['fileSchema'].split(',')]
+    destination = report['destinationBucket'].split(':::')[-1]
+    scanned = 0
+    progress = logger.progress("Analysis progress")
+    
+    for report_file in report['files']:
+        if is_out_of_time(context, deadline):
+            logger.warning("Stopping early to stay within the time limit", file=report_file['key'])
+            if status is not None:
+                status['complete'] = False
+            break
+        
+        stream = s3.get_object(Bucket=destination, Key=report_file['key'])['Body']
+        now = datetime.now(timezone.utc)
+        
+        with io.TextIOWrapper(gzip.GzipFile(fileobj=stream), encoding='utf-8') as text:
+            for row in csv.reader(text):
+                record = dict(zip(columns, row))
+                
+                if record.get('IsLatest') == 'false' or record.get('IsDeleteMarker') == 'true':
+                    continue
+                
+                last_modified = datetime.fromisoformat(record['LastModifiedDate'].replace('Z', '+00:00'))
+                analysis.add(
+                    unquote(record['Key']),
+                    int(record.get('Size') or 0),
+                    (now - last_modified).total_seconds() / 86400,
+                    record.get('StorageClass') or 'STANDARD'
+                )
+                scanned += 1
+                progress.update()
+    
+    return report['sourceBucket'], scanned
+
+
+def run_coordinator(event, context):
+    """
+    Clean (or analyze) every selected bucket by fanning shards out to
+    worker invocations
+    
+    Args:
+        event: Coordinator event with bucket_tag ({'Key', 'Value'}) and/or
+               bucket_pattern, and optionally action ('delete' or
+               'analyze'), retention_days, retentions, shard_max_objects,
+               executor ('lambda' or 'local') and worker_function
+        context: Lambda context object
+        
+    Returns:
+        dict: Response with per-bucket totals (or analysis reports) and
+              failed/incomplete shards
+    """
+    retention_days = event.get('retention_days', RETENTION_DAYS)
+    action = event.get('action', 'delete')
+    analyses = {}
+    
+    response = {
+        'mode': 'coordinator',
+        'action': action,
+        'retention_days': retention_days,
+        'buckets': {},
+        'shards': 0,
+        'files_deleted': 0,
+        'files_failed': 0,
+        'bytes_deleted': 0,
+        'objects_scanned': 0,
+        'incomplete_shards': [],
+        'failed_shards': [],
+        'errors': []
+    }
+    
+    try:
+        buckets = select_buckets(
+            event.get('bucket_tag', BUCKET_TAG),
+            event.get('bucket_pattern', BUCKET_PATTERN)
+        )
+        logger.info("Selected buckets", count=len(buckets))
+        
+        estimates = estimate_bucket_objects(buckets)
+        shard_max_objects = event.get('shard_max_objects', SHARD_MAX_OBJECTS)
+        
+        shards = []
+        for bucket_name in buckets:
+            shards.extend(plan_shards(bucket_name, estimates.get(bucket_name), shard_max_objects))
+            response['buckets'][bucket_name] = {
+                'estimated_objects': estimates.get(bucket_name),
+                'files_deleted': 0,
+                'files_failed': 0,
+                'bytes_deleted': 0,
+                'objects_scanned': 0
+            }
+            if action == 'analyze':
+                analyses[bucket_name] = StorageAnalysis(event.get('retentions', ANALYZE_RETENTIONS))
+        response['shards'] = len(shards)
+        
+        # Workers stop starting new pages before the coordinator times out
+        deadline = None
+        if context is not None:
+            deadline = time.time() + context.get_remaining_time_in_millis() / 1000 - WORKER_TIME_BUFFER
+        
+        executor = get_executor(
+            event.get('executor', WORKER_EXECUTOR),
+            __name__,
+            event.get('worker_function') or WORKER_FUNCTION_NAME or getattr(context, 'function_name', None)
+        )
+        payloads = [
+            {
+                'mode': 'worker',
+                'action': action,
+                'shard': shard,
+                'retention_days': retention_days,
+                'retentions': event.get('retentions', ANALYZE_RETENTIONS),
+                'deadline': deadline
+            }
+            for shard in shards
+        ]
+        
+        logger.info("Dispatching shards", shards=len(payloads))
+        
+        for payload, result, error in executor.map(payloads):
+            shard = payload['shard']
+            
+            if error is None and result.get('statusCode') != 200:
+                error = result.get('body')
+            
+            if error is not None:
+                logger.error("Shard failed", bucket=shard['bucket'], error=str(error))
+                response['failed_shards'].append({'shard': shard, 'error': str(error)})
+                continue
+            
+            body = json.loads(result['body'])
+            bucket_totals = response['buckets'][shard['bucket']]
+            
+            for total in ('files_deleted', 'files_failed', 'bytes_deleted', 'objects_scanned'):
+                bucket_totals[total] += body[total]
+                response[total] += body[total]
+            
+            if action == 'analyze':
+                analyses[shard['bucket']].merge(StorageAnalysis.from_dict(body['analysis']))
+            
+            if not body['complete']:
+                response['incomplete_shards'].append(shard)
+        
+        logger.info(
+            "Coordinator completed",
+            buckets=len(buckets),
+            shards=len(shards),
+            files_deleted=response['files_deleted'],
+            files_failed=response['files_failed'],
+            bytes_deleted=response['bytes_deleted'],
+            objects_scanned=response['objects_scanned'],
+            failed_shards=len(response['failed_shards']),
+            incomplete_shards=len(response['incomplete_shards'])
+        )
+        
+        status_code = 500 if response['failed_shards'] else 200
+        if action == 'analyze':
+            return report_response(response, analyses, status_code)
+        
+        return {
+            'statusCode': status_code,
+            'body': json.dumps(response, default=str)
+        }
+        
+    except Exception as e:
+        error_msg = f"Error in run_coordinator: {str(e)}"
+        logger.error(error_msg)
+        response['errors'].append(error_msg)
+        
+        return {
+            'statusCode': 500,
+            'body': json.dumps(response, default=str)
+        }
+
+
+def run_worker(event, context):
+    """
+    Clean one shard of a bucket and report totals rather than every key
+    
+    With action 'analyze' the shard is analyzed instead and the response
+    carries its serialized StorageAnalysis for the coordinator to merge.
+    
+    Args:
+        event: Worker event with shard ({'bucket', 'prefixes',
+               'include_root'}), action, retention_days, retentions and
+               an optional deadline
+        context: Lambda context object
+        
+    Returns:
+        dict: Response with the shard's deleted and failed file counts and
+              deleted bytes
+    """
+    shard = event['shard']
+    retention_days = event.get('retention_days', RETENTION_DAYS)
+    cutoff_date = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    status = {'complete': True}
+    failed = []
+    analysis = None
+    if event.get('action') == 'analyze':
+        analysis = StorageAnalysis(event.get('retentions', ANALYZE_RETENTIONS))
+    
+    response = {
+        'mode': 'worker',
+        'shard': shard,
+        'files_deleted': 0,
+        'files_failed': 0,
+        'bytes_deleted': 0,
+        'objects_scanned': 0,
+        'complete': True,
+        'errors': []
+    }
+    
+    # (prefix, delimiter) listings covering the shard
+    listings = [(prefix, None) for prefix in shard['prefixes']]
+    if shard.get('include_root'):
+        listings.append(('', '/'))
+    
+    try:
+        for prefix, delimiter in listings:
+            if not status['complete']:
                 break
+            
+            if analysis is not None:
+                response['objects_scanned'] += analyze_objects(
+                    shard['bucket'], analysis, prefix, delimiter,
+                    context, event.get('deadline'), status
+                )
+                continue
+            
+            pages = delete_old_files_by_page(
+                shard['bucket'], cutoff_date, prefix, delimiter,
+                context, event.get('deadline'), status, failed
+            )
+            for deleted_files in pages:
+                response['files_deleted'] += len(deleted_files)
+                response['bytes_deleted'] += sum(f['size'] for f in deleted_files)
+        
+        response['complete'] = status['complete']
+        response['files_failed'] = len(failed)
+        if analysis is not None:
+            return analysis_response(response, analysis)
+        
+        return {
+            'statusCode': 200,
+            'body': json.dumps(response, default=str)
+        }
+        
+    except Exception as e:
+        error_msg = f"Error in run_worker: {str(e)}"
+        logger.error(error_msg)
+        response['errors'].append(error_msg)
+        
+        return {
+            'statusCode': 500,
+            'body': json.dumps(response, default=str)
+        }
+
+
+def analysis_response(response, analysis):
+    """
+    Attach a worker's analysis to its response within the invoke size limit
+    
+    At most WORKER_MAX_ANALYSIS_GROUPS groups are returned; if the response
+    still exceeds MAX_RESPONSE_BYTES, the cap is halved until it fits.
+    
+    Args:
+        response: Worker response fields
+        analysis: StorageAnalysis of the shard
+        
+    Returns:
+        dict: Worker result with statusCode and body
+    """
+    max_groups = WORKER_MAX_ANALYSIS_GROUPS
+    response['folded_groups'] = 0
+    
+    while True:
+        response['folded_groups'] += analysis.limit_groups(max_groups)
+        response['analysis'] = analysis.to_dict()
+        result = {
+            'statusCode': 200,
+            'body': json.dumps(response, default=str)
+        }
+        
+        size = len(json.dumps(result))
+        if size <= MAX_RESPONSE_BYTES or max_groups == 0:
+            break
+        max_groups //= 2
+    
+    if response['folded_groups']:
+        logger.info("Folded small prefixes into the other group", groups=response['folded_groups'],
+                    response_bytes=size)
+    return result
+
+
+def report_response(response, analyses, status_code):
+    """
+    Attach per-bucket analysis reports to the coordinator's response
+    within the invoke size limit
+    
+    Each bucket reports its REPORT_MAX_PREFIXES largest prefixes. If the
+    response exceeds MAX_RESPONSE_BYTES, the cap is lowered to what the
+    measured prefix entries allow (halving further if the folded entries
+    grow); if even no prefixes of their own do not fit, each bucket keeps
+    only its totals.
+    
+    Args:
+        response: Coordinator response fields
+        analyses: Merged StorageAnalysis by bucket name
+        status_code: statusCode of the result
+        
+    Returns:
+        dict: Coordinator result with statusCode and body
+    """
+    max_prefixes = REPORT_MAX_PREFIXES
+    reports = {bucket_name: analysis.summarize(max_prefixes) for bucket_name, analysis in analyses.items()}
+    totals_only = False
+    
+    while True:
+        for bucket_name, report in reports.items():
+            if totals_only:
+                report = {key: report[key] for key in ('retentions', 'total', 'folded_prefixes')}
+            response['buckets'][bucket_name]['analysis'] = report
         
-        return deleted_files
+        response['report_max_prefixes'] = max_prefixes
+        response['report_totals_only'] = totals_only
+        result = {
+            'statusCode': status_code,
+            'body': json.dumps(response, default=str)
+        }
+        
+        size = len(result['body'])
+        if size <= MAX_RESPONSE_BYTES or totals_only:
+            break
+        
+        if max_prefixes == 0:
+            totals_only = True
+            continue
         
+        if max_prefixes == REPORT_MAX_PREFIXES:
+            max_prefixes = fitting_prefixes(reports, size)
+        else:
+            max_prefixes //= 2
+        reports = {bucket_name: analysis.summarize(max_prefixes) for bucket_name, analysis in analyses.items()}
+    
+    if max_prefixes < REPORT_MAX_PREFIXES:
+        logger.info("Reduced the analysis report to fit the response", buckets=len(analyses),
+                    max_prefixes=max_prefixes, totals_only=totals_only, response_bytes=size)
+    return result
+
+
+def fitting_prefixes(reports, size):
+    """
+    Find the largest prefix cap whose prefix entries fit the response
+    
+    Args:
+        reports: Analysis reports by bucket name (see StorageAnalysis.summarize)
+        size: Current response size in bytes
+        
+    Returns:
+        int: Number of prefixes per bucket, below the reports' current cap
+    """
+    # Serialized size of each bucket's own prefix entries, largest prefix first
+    entry_sizes = []
+    for report in reports.values():
+        prefixes = sorted(
+            (prefix for prefix in report['prefixes'] if prefix != OTHER_PREFIX),
+            key=lambda prefix: (-report['prefixes'][prefix]['objects'], prefix)
+        )
+        entry_sizes.append([
+            len(json.dumps({prefix: report['prefixes'][prefix]}, default=str))
+            for prefix in prefixes
+        ])
+    
+    budget = MAX_RESPONSE_BYTES - (size - sum(map(sum, entry_sizes)))
+    max_prefixes = max(map(len, entry_sizes), default=1) - 1
+    
+    while max_prefixes > 0 and sum(sum(sizes[:max_prefixes]) for sizes in entry_sizes) > budget:
+        max_prefixes -= 1
+    
+    return max_prefixes
+
+
+def select_buckets(bucket_tag, bucket_pattern):
+    """
+    Select the buckets to clean by tag and/or name pattern
+    
+    Args:
+        bucket_tag: Optional {'Key': ..., 'Value': ...} the bucket must carry
+        bucket_pattern: Optional fnmatch pattern the bucket name must match
+        
+    Returns:
+        list: Names of the selected buckets
+    """
+    if not bucket_tag and not bucket_pattern:
+        raise ValueError("bucket_tag or bucket_pattern is required in coordinator mode")
+    
+    s3 = get_client('s3')
+    buckets = [bucket['Name'] for bucket in s3.list_buckets()['Buckets']]
+    
+    if bucket_pattern:
+        buckets = [name for name in buckets if fnmatch(name, bucket_pattern)]
+    
+    if not bucket_tag:
+        return buckets
+    
+    results = map_calls(get_bucket_tags, buckets, get_limiter('s3', 'read'))
+    selected = []
+    
+    for bucket_name, tags, error in results:
+        if error:
+            logger.error("Error getting bucket tags", bucket=bucket_name, error=str(error))
+        elif tags.get(bucket_tag['Key']) == bucket_tag['Value']:
+            selected.append(bucket_name)
+    
+    return selected
+
+
+def get_bucket_tags(bucket_name):
+    """
+    Get a bucket's tags
+    
+    Args:
+        bucket_name: Name of the S3 bucket
+        
+    Returns:
+        dict: Tags by key (empty when the bucket has none)
+    """
+    try:
+        response = get_client('s3').get_bucket_tagging(Bucket=bucket_name)
     except Exception as e:
-        print(f"Error in delete_old_files: {str(e)}")
+        if getattr(e, 'response', {}).get('Error', {}).get('Code') == 'NoSuchTagSet':
+            return {}
         raise
+    
+    return {tag['Key']: tag['Value'] for tag in response['TagSet']}
+
+
+def estimate_bucket_objects(bucket_names):
+    """
+    Estimate object counts from the daily CloudWatch NumberOfObjects metric
+    
+    S3 publishes storage metrics in the bucket's own region, so each
+    bucket's metric is read from CloudWatch in that region.
+    
+    Args:
+        bucket_names: List of bucket names
+        
+    Returns:
+        dict: Latest object count by bucket name, None when unavailable
+    """
+    end_time = datetime.now(timezone.utc)
+    
+    def get_object_count(bucket_name):
+        cloudwatch = get_client('cloudwatch', get_bucket_region(bucket_name))
+        response = cloudwatch.get_metric_statistics(
+            Namespace='AWS/S3',
+            MetricName='NumberOfObjects',
+            Dimensions=[
+                {'Name': 'BucketName', 'Value': bucket_name},
+                {'Name': 'StorageType', 'Value': 'AllStorageTypes'}
+            ],
+            StartTime=end_time - timedelta(days=3),
+            EndTime=end_time,
+            Period=86400,
+            Statistics=['Average']
+        )
+        datapoints = sorted(response['Datapoints'], key=lambda point: point['Timestamp'])
+        return int(datapoints[-1]['Average']) if datapoints else None
+    
+    estimates = {}
+    for bucket_name, count, error in map_calls(get_object_count, bucket_names,
+                                               get_limiter('cloudwatch', 'read')):
+        if error:
+            logger.warning("Error estimating bucket size", bucket=bucket_name, error=str(error))
+        estimates[bucket_name] = count
+    
+    return estimates
+
+
+def get_bucket_region(bucket_name):
+    """
+    Get the region a bucket is in
+    
+    Args:
+        bucket_name: Name of the S3 bucket
+        
+    Returns:
+        str: Region name
+    """
+    location = get_client('s3').get_bucket_location(Bucket=bucket_name).get('LocationConstraint')
+    
+    # Buckets in us-east-1 have no location constraint; 'EU' is the legacy eu-west-1 value
+    if not location:
+        return 'us-east-1'
+    return 'eu-west-1' if location == 'EU' else location
+
+
+def plan_shards(bucket_name, estimated_objects, shard_max_objects=SHARD_MAX_OBJECTS):
+    """
+    Split a bucket into shards of top-level prefixes for worker invocations
+    
+    Buckets within shard_max_objects get a single shard, and buckets
+    without an estimate get UNKNOWN_SIZE_SHARDS. Larger buckets are split
+    by their top-level prefixes into contiguous groups, with one shard also
+    covering the keys at the root.
+    
+    Args:
+        bucket_name: Name of the S3 bucket
+        estimated_objects: Estimated object count, or None if unknown
+        shard_max_objects: Target maximum objects per shard
+        
+    Returns:
+        list: Shards ({'bucket', 'prefixes', 'include_root'})
+    """
+    whole_bucket = [{'bucket': bucket_name, 'prefixes': [''], 'include_root': False}]
+    
+    if estimated_objects is None:
+        shard_count = UNKNOWN_SIZE_SHARDS
+    else:
+        shard_count = -(-estimated_objects // shard_max_objects)
+    
+    if shard_count <= 1:
+        return whole_bucket
+    
+    prefixes = list_top_level_prefixes(bucket_name)
+    if len(prefixes) < 2:
+        return whole_bucket
+    
+    shard_count = min(shard_count, len(prefixes), MAX_SHARDS_PER_BUCKET)
+    
+    shards = []
+    for i in range(shard_count):
+        shards.append({
+            'bucket': bucket_name,
+            'prefixes': prefixes[i * len(prefixes) // shard_count:(i + 1) * len(prefixes) // shard_count],
+            'include_root': i == 0
+        })
+    
+    logger.info("Split bucket into shards", bucket=bucket_name,
+                estimated_objects=estimated_objects, shards=shard_count)
+    return shards
+
+
+def list_top_level_prefixes(bucket_name):
+    """
+    List a bucket's top-level prefixes
+    
+    Args:
+        bucket_name: Name of the S3 bucket
+        
+    Returns:
+        list: Prefixes such as 'app-01/', in lexicographic order
+    """
+    paginator = get_client('s3').get_paginator('list_objects_v2')
+    prefixes = []
+    
+    for page in paginator.paginate(Bucket=bucket_name, Delimiter='/'):
+        prefixes.extend(common['Prefix'] for common in page.get('CommonPrefixes', []))
+    
+    return prefixes
+
+
+def is_out_of_time(context, deadline=None):
+    """
+    Check whether the invocation is close to its timeout or deadline
+    
+    Args:
+        context: Lambda context object, or None outside Lambda
+        deadline: Optional epoch time set by the coordinator
+        
+    Returns:
+        bool: True if less than WORKER_TIME_BUFFER seconds remain, or the
+              deadline has passed
+    """
+    if deadline is not None and time.time() >= deadline:
+        return True
+    if context is None:
+        return False
+    return context.get_remaining_time_in_millis() < WORKER_TIME_BUFFER * 1000
 
 
 def get_bucket_info(bucket_name):
@@ -164,6 +1292,7 @@ def get_bucket_info(bucket_name):
     Returns:
         dict: Bucket information
     """
+    s3 = get_client('s3')
     try:
         # Get bucket location
         location = s3.get_bucket_location(Bucket=bucket_name)
@@ -180,9 +1309,9 @@ def get_bucket_info(bucket_name):
             'versioning': versioning.get('Status', 'Disabled')
         }
         
-        print(f"Bucket info: {json.dumps(bucket_info)}")
+        logger.info("Bucket info", **bucket_info)
         return bucket_info
         
     except Exception as e:
-        print(f"Error getting bucket info: {str(e)}")
+        logger.error("Error getting bucket info", error=str(e))
         raise
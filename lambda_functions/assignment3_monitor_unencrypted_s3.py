@@ -8,13 +8,18 @@ Author: AWS Lambda Automation Project
 Date: January 2026
 """
 
-import boto3
 import json
-from datetime import datetime, timezone
 
-# Initialize S3 client
-s3 = boto3.client('s3')
+from aws_clients import get_client
+from concurrency import get_limiter, map_calls
+from instrumentation import instrumented_handler
+from structured_log import get_logger, logged_handler
 
+logger = get_logger(__name__)
+
+
+@logged_handler
+@instrumented_handler
 def lambda_handler(event, context):
     """
     Main Lambda handler function
@@ -27,7 +32,7 @@ def lambda_handler(event, context):
         dict: Response with unencrypted buckets list
     """
     
-    print(f"Lambda function started at {datetime.now(timezone.utc).isoformat()}")
+    logger.info("Lambda function started")
     
     response = {
         'total_buckets': 0,
@@ -41,27 +46,27 @@ def lambda_handler(event, context):
         buckets = list_all_buckets()
         response['total_buckets'] = len(buckets)
         
-        # Check encryption for each bucket
-        for bucket_name in buckets:
-            try:
-                is_encrypted = check_bucket_encryption(bucket_name)
-                
-                if is_encrypted:
-                    response['encrypted_buckets'].append(bucket_name)
-                    print(f"✓ {bucket_name}: Encrypted")
-                else:
-                    response['unencrypted_buckets'].append(bucket_name)
-                    print(f"⚠️ {bucket_name}: NOT ENCRYPTED")
-                    
-            except Exception as e:
+        # Check encryption for every bucket concurrently
+        results = map_calls(check_bucket_encryption, buckets, get_limiter('s3', 'read'))
+        
+        for bucket_name, is_encrypted, e in results:
+            if e:
                 error_msg = f"Error checking {bucket_name}: {str(e)}"
-                print(error_msg)
+                logger.error(error_msg)
                 response['errors'].append(error_msg)
-        
-        print(f"\nSummary:")
-        print(f"Total buckets: {response['total_buckets']}")
-        print(f"Encrypted: {len(response['encrypted_buckets'])}")
-        print(f"Unencrypted: {len(response['unencrypted_buckets'])}")
+            elif is_encrypted:
+                response['encrypted_buckets'].append(bucket_name)
+                logger.debug("Bucket encrypted", bucket=bucket_name)
+            else:
+                response['unencrypted_buckets'].append(bucket_name)
+                logger.warning("Bucket NOT ENCRYPTED", bucket=bucket_name)
+        
+        logger.info(
+            "Summary",
+            total_buckets=response['total_buckets'],
+            encrypted=len(response['encrypted_buckets']),
+            unencrypted=len(response['unencrypted_buckets'])
+        )
         
         return {
             'statusCode': 200,
@@ -70,7 +75,7 @@ def lambda_handler(event, context):
         
     except Exception as e:
         error_msg = f"Error in lambda_handler: {str(e)}"
-        print(error_msg)
+        logger.error(error_msg)
         response['errors'].append(error_msg)
         
         return {
@@ -86,13 +91,14 @@ def list_all_buckets():
     Returns:
         list: List of bucket names
     """
+    s3 = get_client('s3')
     try:
         response = s3.list_buckets()
         buckets = [bucket['Name'] for bucket in response['Buckets']]
         return buckets
         
     except Exception as e:
-        print(f"Error listing buckets: {str(e)}")
+        logger.error("Error listing buckets", error=str(e))
         raise
 
 
@@ -106,6 +112,7 @@ def check_bucket_encryption(bucket_name):
     Returns:
         bool: True if encrypted with bucket key enabled (for KMS), False otherwise
     """
+    s3 = get_client('s3')
     try:
         # Get bucket encryption configuration
         response = s3.get_bucket_encryption(Bucket=bucket_name)
@@ -119,8 +126,9 @@ def check_bucket_encryption(bucket_name):
                 encryption_type = encryption_config.get('SSEAlgorithm')
                 bucket_key_enabled = rule.get('BucketKeyEnabled', False)
                 
-                print(f"  Encryption for {bucket_name}:")
-                print(f"    - Type: {encryption_type}")
+                if logger.debug_enabled:
+                    logger.debug("Bucket encryption", bucket=bucket_name,
+                                 type=encryption_type, bucket_key_enabled=bucket_key_enabled)
                     
             return True
         
@@ -128,11 +136,11 @@ def check_bucket_encryption(bucket_name):
         
     except s3.exceptions.ServerSideEncryptionConfigurationNotFoundError:
         # No encryption configured
-        print(f"  ✗ Encryption is DISABLED for {bucket_name}")
+        logger.debug("Encryption is disabled", bucket=bucket_name)
         return False
         
     except Exception as e:
-        print(f"Error checking encryption for {bucket_name}: {str(e)}")
+        logger.error("Error checking encryption", bucket=bucket_name, error=str(e))
         raise
 
 
@@ -146,6 +154,7 @@ def get_bucket_details(bucket_name):
     Returns:
         dict: Bucket details
     """
+    s3 = get_client('s3')
     try:
         # Get bucket location
         location = s3.get_bucket_location(Bucket=bucket_name)
@@ -165,7 +174,7 @@ def get_bucket_details(bucket_name):
         }
         
     except Exception as e:
-        print(f"Error getting details for {bucket_name}: {str(e)}")
+        logger.error("Error getting bucket details", bucket=bucket_name, error=str(e))
         return {
             'name': bucket_name,
             'error': str(e)
@@ -4,23 +4,39 @@ Assignment 4: Automatic EBS Snapshot and Cleanup Using AWS Lambda and Boto3
 This Lambda function automates:
 - Creating snapshots for specified EBS volumes
 - Cleaning up snapshots older than 30 days
+- Copying completed snapshots to a DR region and applying retention there
 
 Author: AWS Lambda Automation Project
 Date: January 2026
 """
 
-import boto3
 import json
+import time
 from datetime import datetime, timezone, timedelta
 
-# Initialize EC2 client
-ec2 = boto3.client('ec2')
+from aws_clients import get_client
+from concurrency import get_limiter, map_calls
+from inventory import get_volumes, set_account
+from instrumentation import instrumented_handler
+from structured_log import get_logger, logged_handler
 
 # Configuration
 VOLUME_ID = 'vol-0123456789abcdef0'  # Replace with your volume ID
 RETENTION_DAYS = 30
 DESCRIPTION_PREFIX = 'Automated-Backup'
 
+# Disaster recovery configuration
+DR_REGION = None  # e.g. 'us-west-2'; None disables the copy stage
+DR_RETENTION_DAYS = 30
+MAX_CONCURRENT_COPIES = 20  # EBS limit on in-flight copies per destination region
+SNAPSHOT_POLL_INTERVAL = 15  # seconds between describe_snapshots polls
+SNAPSHOT_WAIT_TIMEOUT = 600  # seconds to wait for new snapshots to complete
+DESCRIBE_BATCH_SIZE = 200  # snapshot IDs per describe_snapshots call
+
+logger = get_logger(__name__)
+
+@logged_handler
+@instrumented_handler
 def lambda_handler(event, context):
     """
     Main Lambda handler function
@@ -33,46 +49,84 @@ def lambda_handler(event, context):
         dict: Response with snapshot details
     """
     
-    print(f"Lambda function started at {datetime.now(timezone.utc).isoformat()}")
+    logger.info("Lambda function started")
+    set_account(context)
     
     # Allow configuration override
     volume_id = event.get('volume_id', VOLUME_ID)
+    volume_ids = event.get('volume_ids') or [volume_id]
     retention_days = event.get('retention_days', RETENTION_DAYS)
+    dr_region = event.get('dr_region', DR_REGION)
+    dr_retention_days = event.get('dr_retention_days', DR_RETENTION_DAYS)
     
     response = {
         'volume_id': volume_id,
+        'volume_ids': volume_ids,
         'retention_days': retention_days,
         'created_snapshots': [],
+        'failed_volumes': [],
         'deleted_snapshots': [],
         'errors': []
     }
     
     try:
-        # Create new snapshot
-        print(f"Creating snapshot for volume: {volume_id}")
-        snapshot = create_snapshot(volume_id)
+        # Describe every volume in batched calls up front; create_snapshot
+        # then reads them from the inventory cache
+        try:
+            get_volumes(volume_ids)
+        except Exception as e:
+            logger.warning("Error describing volumes in bulk", error=str(e))
+        
+        # Create new snapshots concurrently; a failed volume is reported
+        # without holding back the snapshots of the others
+        logger.info("Creating snapshots", volumes=len(volume_ids))
+        results = map_calls(create_snapshot, volume_ids, get_limiter('ec2', 'write'))
+        
+        for vol_id, snapshot, error in results:
+            if error:
+                response['failed_volumes'].append({'volume_id': vol_id, 'error': str(error)})
+                continue
+            
+            if snapshot:
+                response['created_snapshots'].append(snapshot)
+                logger.info("Created snapshot", volume_id=vol_id, snapshot_id=snapshot['SnapshotId'])
         
-        if snapshot:
-            response['created_snapshots'].append(snapshot)
-            print(f"Created snapshot: {snapshot['SnapshotId']}")
+        for vol_id in volume_ids:
+            # Cleanup old snapshots
+            logger.debug("Cleaning up old snapshots", volume_id=vol_id, retention_days=retention_days)
+            deleted = cleanup_old_snapshots(vol_id, retention_days)
+            response['deleted_snapshots'].extend(deleted)
         
-        # Cleanup old snapshots
-        print(f"\nCleaning up snapshots older than {retention_days} days")
-        deleted = cleanup_old_snapshots(volume_id, retention_days)
-        response['deleted_snapshots'] = deleted
+        if dr_region:
+            logger.info("Replicating snapshots to DR region", dr_region=dr_region)
+            new_snapshot_ids = [s['SnapshotId'] for s in response['created_snapshots']]
+            dr_result = replicate_snapshots(
+                volume_ids, new_snapshot_ids, dr_region, dr_retention_days, context
+            )
+            response['dr_region'] = dr_region
+            response['dr_retention_days'] = dr_retention_days
+            response.update(dr_result)
         
-        print(f"\nSummary:")
-        print(f"Snapshots created: {len(response['created_snapshots'])}")
-        print(f"Snapshots deleted: {len(response['deleted_snapshots'])}")
+        summary = {
+            'snapshots_created': len(response['created_snapshots']),
+            'snapshot_failures': len(response['failed_volumes']),
+            'snapshots_deleted': len(response['deleted_snapshots'])
+        }
+        if dr_region:
+            summary['dr_copies_started'] = len(response['copied_snapshots'])
+            summary['dr_copies_deferred'] = len(response['deferred_copies'])
+            summary['dr_copies_deleted'] = len(response['deleted_dr_snapshots'])
+            summary['dr_failed_copies_deleted'] = len(response['deleted_failed_copies'])
+        logger.info("Summary", **summary)
         
         return {
-            'statusCode': 200,
+            'statusCode': 500 if response['failed_volumes'] else 200,
             'body': json.dumps(response, default=str)
         }
         
     except Exception as e:
         error_msg = f"Error in lambda_handler: {str(e)}"
-        print(error_msg)
+        logger.error(error_msg)
         response['errors'].append(error_msg)
         
         return {
@@ -91,15 +145,14 @@ def create_snapshot(volume_id):
     Returns:
         dict: Snapshot details
     """
+    ec2 = get_client('ec2')
     try:
-        # Get volume details
-        volumes = ec2.describe_volumes(VolumeIds=[volume_id])
+        # Get volume details (read through the inventory cache)
+        volumes = get_volumes([volume_id])
         
-        if not volumes['Volumes']:
+        if volume_id not in volumes:
             raise Exception(f"Volume {volume_id} not found")
         
-        volume = volumes['Volumes'][0]
-        
         # Create description
         timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d-%H-%M-%S')
         description = f"{DESCRIPTION_PREFIX}-{volume_id}-{timestamp}"
@@ -133,7 +186,7 @@ def create_snapshot(volume_id):
         return snapshot_details
         
     except Exception as e:
-        print(f"Error creating snapshot: {str(e)}")
+        logger.error("Error creating snapshot", volume_id=volume_id, error=str(e))
         raise
 
 
@@ -148,8 +201,11 @@ def cleanup_old_snapshots(volume_id, retention_days):
     Returns:
         list: List of deleted snapshot details
     """
+    ec2 = get_client('ec2')
     deleted_snapshots = []
-    cutoff_date = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    expired = []
+    now = datetime.now(timezone.utc)
+    cutoff_date = now - timedelta(days=retention_days)
     
     try:
         # Get all snapshots for this volume
@@ -161,42 +217,51 @@ def cleanup_old_snapshots(volume_id, retention_days):
             OwnerIds=['self']
         )
         
-        print(f"Found {len(snapshots['Snapshots'])} snapshot(s) for volume {volume_id}")
+        logger.info("Found snapshots", volume_id=volume_id, count=len(snapshots['Snapshots']))
         
         # Check each snapshot
         for snapshot in snapshots['Snapshots']:
             snapshot_id = snapshot['SnapshotId']
             start_time = snapshot['StartTime']
-            age_days = (datetime.now(timezone.utc) - start_time).days
+            age_days = (now - start_time).days
             
             # Check if automated backup (by description prefix)
             description = snapshot.get('Description', '')
             if not description.startswith(DESCRIPTION_PREFIX):
-                print(f"Skipping {snapshot_id}: Not an automated backup")
+                if logger.debug_enabled and logger.sampled('skip'):
+                    logger.debug("Skipping snapshot: not an automated backup", snapshot_id=snapshot_id)
                 continue
             
             if start_time < cutoff_date:
-                print(f"Deleting snapshot {snapshot_id} (Age: {age_days} days)")
-                
-                try:
-                    ec2.delete_snapshot(SnapshotId=snapshot_id)
-                    
-                    deleted_snapshots.append({
-                        'SnapshotId': snapshot_id,
-                        'StartTime': start_time.isoformat(),
-                        'AgeDays': age_days,
-                        'VolumeSize': snapshot['VolumeSize']
-                    })
-                    
-                except Exception as delete_error:
-                    print(f"Error deleting {snapshot_id}: {str(delete_error)}")
-            else:
-                print(f"Keeping snapshot {snapshot_id} (Age: {age_days} days)")
+                if logger.debug_enabled and logger.sampled('delete'):
+                    logger.debug("Deleting snapshot", snapshot_id=snapshot_id, age_days=age_days)
+                expired.append(snapshot)
+            elif logger.debug_enabled and logger.sampled('keep'):
+                logger.debug("Keeping snapshot", snapshot_id=snapshot_id, age_days=age_days)
+        
+        results = map_calls(
+            lambda snapshot: ec2.delete_snapshot(SnapshotId=snapshot['SnapshotId']),
+            expired,
+            get_limiter('ec2', 'delete')
+        )
+        
+        for snapshot, _, delete_error in results:
+            if delete_error:
+                logger.error("Error deleting snapshot", snapshot_id=snapshot['SnapshotId'],
+                             error=str(delete_error))
+                continue
+            
+            deleted_snapshots.append({
+                'SnapshotId': snapshot['SnapshotId'],
+                'StartTime': snapshot['StartTime'].isoformat(),
+                'AgeDays': (now - snapshot['StartTime']).days,
+                'VolumeSize': snapshot['VolumeSize']
+            })
         
         return deleted_snapshots
         
     except Exception as e:
-        print(f"Error in cleanup_old_snapshots: {str(e)}")
+        logger.error("Error in cleanup_old_snapshots", volume_id=volume_id, error=str(e))
         raise
 
 
@@ -210,6 +275,7 @@ def list_all_snapshots(volume_id=None):
     Returns:
         list: List of snapshots
     """
+    ec2 = get_client('ec2')
     try:
         filters = [{'Name': 'status', 'Values': ['completed']}]
         
@@ -224,5 +290,376 @@ def list_all_snapshots(volume_id=None):
         return response['Snapshots']
         
     except Exception as e:
-        print(f"Error listing snapshots: {str(e)}")
+        logger.error("Error listing snapshots", error=str(e))
         raise
+
+
+def replicate_snapshots(volume_ids, new_snapshot_ids, dr_region, dr_retention_days, context=None):
+    """
+    Copy completed automated snapshots to the DR region and apply DR retention
+    
+    Newly created snapshots are awaited first. The source and DR snapshots are
+    then indexed once, so any snapshot without a DR copy (including ones
+    deferred by earlier runs or whose copy failed) is copied, and DR copies
+    past retention are deleted from the same index.
+    
+    Args:
+        volume_ids: List of EBS volume IDs being backed up
+        new_snapshot_ids: Snapshot IDs created in this invocation
+        dr_region: Destination region for the copies
+        dr_retention_days: Number of days to retain DR copies
+        context: Lambda context object (used to bound the wait)
+        
+    Returns:
+        dict: Copied, deferred and deleted DR snapshot details
+    """
+    ec2 = get_client('ec2')
+    source_region = ec2.meta.region_name
+    dr_ec2 = get_client('ec2', dr_region)
+    
+    try:
+        # Wait for this run's snapshots so they can be copied right away
+        if new_snapshot_ids:
+            timeout = SNAPSHOT_WAIT_TIMEOUT
+            if context is not None:
+                # Leave a minute of the invocation for copying and cleanup
+                remaining = context.get_remaining_time_in_millis() / 1000 - 60
+                timeout = max(0, min(timeout, remaining))
+            wait_for_snapshots(new_snapshot_ids, timeout)
+        
+        index = build_snapshot_index(volume_ids, dr_ec2)
+        
+        # Copies that failed do not count as copied; drop them so their
+        # source snapshots are copied again below
+        failed = delete_failed_copies(index['failed_copies'], dr_ec2)
+        
+        # Snapshots that still need a DR copy, oldest first
+        dr_cutoff = datetime.now(timezone.utc) - timedelta(days=dr_retention_days)
+        to_copy = [
+            snapshot for snapshot_id, snapshot in index['source'].items()
+            if snapshot_id not in index['copied'] and snapshot['StartTime'] >= dr_cutoff
+        ]
+        to_copy.sort(key=lambda snapshot: snapshot['StartTime'])
+        
+        copied, deferred = copy_snapshots_to_region(
+            to_copy, source_region, dr_ec2, index['pending_copies']
+        )
+        
+        deleted = cleanup_dr_snapshots(index['dr'], dr_ec2, dr_retention_days)
+        
+        return {
+            'copied_snapshots': copied,
+            'deferred_copies': deferred,
+            'deleted_dr_snapshots': deleted,
+            'deleted_failed_copies': failed
+        }
+        
+    except Exception as e:
+        logger.error("Error in replicate_snapshots", error=str(e))
+        raise
+
+
+def wait_for_snapshots(snapshot_ids, timeout):
+    """
+    Poll snapshots in batches until they are completed or the timeout expires
+    
+    Args:
+        snapshot_ids: List of snapshot IDs to wait for
+        timeout: Maximum number of seconds to wait
+        
+    Returns:
+        list: Snapshot IDs that reached the completed state
+    """
+    ec2 = get_client('ec2')
+    pending = list(snapshot_ids)
+    completed = []
+    deadline = time.monotonic() + timeout
+    
+    while pending:
+        still_pending = []
+        for i in range(0, len(pending), DESCRIBE_BATCH_SIZE):
+            batch = pending[i:i + DESCRIBE_BATCH_SIZE]
+            response = ec2.describe_snapshots(SnapshotIds=batch)
+            
+            for snapshot in response['Snapshots']:
+                if snapshot['State'] == 'completed':
+                    completed.append(snapshot['SnapshotId'])
+                elif snapshot['State'] == 'error':
+                    logger.warning("Snapshot failed, not copying", snapshot_id=snapshot['SnapshotId'])
+                else:
+                    still_pending.append(snapshot['SnapshotId'])
+        
+        pending = still_pending
+        if not pending:
+            break
+        
+        if time.monotonic() + SNAPSHOT_POLL_INTERVAL > deadline:
+            logger.info("Snapshots not completed yet, they will be copied on a later run",
+                        pending=len(pending))
+            break
+        
+        logger.info("Waiting for snapshots to complete", pending=len(pending))
+        time.sleep(SNAPSHOT_POLL_INTERVAL)
+    
+    return completed
+
+
+def build_snapshot_index(volume_ids, dr_ec2):
+    """
+    Index automated snapshots in the source region and their DR copies
+    
+    Args:
+        volume_ids: List of EBS volume IDs being backed up
+        dr_ec2: EC2 client for the DR region
+        
+    Returns:
+        dict: 'source' snapshots by ID, 'dr' copies, the set of source IDs
+              already 'copied', the number of 'pending_copies' and the
+              'failed_copies' in the error state
+    """
+    ec2 = get_client('ec2')
+    index = {
+        'source': {},
+        'dr': [],
+        'copied': set(),
+        'pending_copies': 0,
+        'failed_copies': []
+    }
+    
+    paginator = ec2.get_paginator('describe_snapshots')
+    for page in paginator.paginate(
+        Filters=[
+            {'Name': 'volume-id', 'Values': volume_ids},
+            {'Name': 'status', 'Values': ['completed']}
+        ],
+        OwnerIds=['self']
+    ):
+        for snapshot in page['Snapshots']:
+            if snapshot.get('Description', '').startswith(DESCRIPTION_PREFIX):
+                index['source'][snapshot['SnapshotId']] = snapshot
+    
+    # DR copies carry the source volume in their VolumeId tag
+    dr_paginator = dr_ec2.get_paginator('describe_snapshots')
+    for page in dr_paginator.paginate(
+        Filters=[
+            {'Name': 'tag:VolumeId', 'Values': volume_ids},
+            {'Name': 'tag:CreatedBy', 'Values': ['Lambda-Automation']}
+        ],
+        OwnerIds=['self']
+    ):
+        for snapshot in page['Snapshots']:
+            tags = {tag['Key']: tag['Value'] for tag in snapshot.get('Tags', [])}
+            source_id = tags.get('SourceSnapshotId')
+            if not source_id:
+                continue
+            
+            details = {
+                'SnapshotId': snapshot['SnapshotId'],
+                'SourceSnapshotId': source_id,
+                'SourceStartTime': tags.get('SourceStartTime'),
+                'StartTime': snapshot['StartTime'],
+                'State': snapshot['State'],
+                'VolumeSize': snapshot['VolumeSize']
+            }
+            
+            if snapshot['State'] == 'error':
+                index['failed_copies'].append(details)
+                continue
+            
+            index['copied'].add(source_id)
+            if snapshot['State'] == 'pending':
+                index['pending_copies'] += 1
+            
+            index['dr'].append(details)
+    
+    logger.info(
+        "Indexed snapshots",
+        source_snapshots=len(index['source']),
+        dr_copies=len(index['dr']),
+        pending_copies=index['pending_copies'],
+        failed_copies=len(index['failed_copies'])
+    )
+    return index
+
+
+def delete_failed_copies(failed_copies, dr_ec2):
+    """
+    Delete DR copies that ended in the error state
+    
+    Args:
+        failed_copies: Failed copies from build_snapshot_index
+        dr_ec2: EC2 client for the DR region
+        
+    Returns:
+        list: List of deleted DR snapshot details
+    """
+    deleted_snapshots = []
+    
+    results = map_calls(
+        lambda snapshot: dr_ec2.delete_snapshot(SnapshotId=snapshot['SnapshotId']),
+        failed_copies,
+        get_limiter('ec2', 'delete', dr_ec2.meta.region_name)
+    )
+    
+    for snapshot, _, delete_error in results:
+        if delete_error:
+            logger.error("Error deleting failed DR copy", snapshot_id=snapshot['SnapshotId'],
+                         error=str(delete_error))
+            continue
+        
+        logger.warning("Deleted failed DR copy", snapshot_id=snapshot['SnapshotId'],
+                       source_snapshot_id=snapshot['SourceSnapshotId'])
+        deleted_snapshots.append({
+            'SnapshotId': snapshot['SnapshotId'],
+            'SourceSnapshotId': snapshot['SourceSnapshotId']
+        })
+    
+    return deleted_snapshots
+
+
+def copy_snapshots_to_region(snapshots, source_region, dr_ec2, pending_copies=0):
+    """
+    Copy snapshots to the DR region within the concurrent-copy limit
+    
+    Copies stay in flight after copy_snapshot returns, so at most
+    MAX_CONCURRENT_COPIES minus the copies already pending are started;
+    the rest are deferred to a later run.
+    
+    Args:
+        snapshots: List of source snapshots (describe_snapshots format)
+        source_region: Region the snapshots live in
+        dr_ec2: EC2 client for the DR region
+        pending_copies: Number of copies already in flight in the DR region
+        
+    Returns:
+        tuple: (list of started copies, list of deferred snapshot IDs)
+    """
+    slots = max(0, MAX_CONCURRENT_COPIES - pending_copies)
+    batch = snapshots[:slots]
+    deferred = [snapshot['SnapshotId'] for snapshot in snapshots[slots:]]
+    copied = []
+    
+    if deferred:
+        logger.info("Concurrent copy limit reached, deferring snapshots", deferred=len(deferred))
+    
+    if not batch:
+        return copied, deferred
+    
+    results = map_calls(
+        lambda snapshot: copy_snapshot(snapshot, source_region, dr_ec2),
+        batch,
+        get_limiter('ec2', 'copy', dr_ec2.meta.region_name)
+    )
+    
+    for snapshot, copy, copy_error in results:
+        if copy_error:
+            logger.error("Error copying snapshot", snapshot_id=snapshot['SnapshotId'],
+                         error=str(copy_error))
+            deferred.append(snapshot['SnapshotId'])
+            continue
+        
+        copied.append(copy)
+        logger.debug("Copying snapshot", snapshot_id=snapshot['SnapshotId'],
+                     dr_region=dr_ec2.meta.region_name)
+    
+    return copied, deferred
+
+
+def copy_snapshot(snapshot, source_region, dr_ec2):
+    """
+    Start a cross-region copy of a single snapshot
+    
+    Args:
+        snapshot: Source snapshot (describe_snapshots format)
+        source_region: Region the snapshot lives in
+        dr_ec2: EC2 client for the DR region
+        
+    Returns:
+        dict: DR copy details
+    """
+    source_tags = {tag['Key']: tag['Value'] for tag in snapshot.get('Tags', [])}
+    start_time = snapshot['StartTime']
+    
+    result = dr_ec2.copy_snapshot(
+        SourceRegion=source_region,
+        SourceSnapshotId=snapshot['SnapshotId'],
+        Description=snapshot.get('Description', ''),
+        TagSpecifications=[
+            {
+                'ResourceType': 'snapshot',
+                'Tags': [
+                    {'Key': 'Name', 'Value': source_tags.get('Name', snapshot.get('Description', ''))},
+                    {'Key': 'VolumeId', 'Value': snapshot['VolumeId']},
+                    {'Key': 'CreatedBy', 'Value': 'Lambda-Automation'},
+                    {'Key': 'BackupDate', 'Value': start_time.strftime('%Y-%m-%d')},
+                    {'Key': 'SourceSnapshotId', 'Value': snapshot['SnapshotId']},
+                    {'Key': 'SourceRegion', 'Value': source_region},
+                    {'Key': 'SourceStartTime', 'Value': start_time.isoformat()}
+                ]
+            }
+        ]
+    )
+    
+    return {
+        'SnapshotId': result['SnapshotId'],
+        'SourceSnapshotId': snapshot['SnapshotId'],
+        'VolumeId': snapshot['VolumeId'],
+        'SourceStartTime': start_time.isoformat()
+    }
+
+
+def cleanup_dr_snapshots(dr_snapshots, dr_ec2, retention_days):
+    """
+    Delete DR copies whose source snapshot is older than the retention period
+    
+    Args:
+        dr_snapshots: DR copies from build_snapshot_index
+        dr_ec2: EC2 client for the DR region
+        retention_days: Number of days to retain DR copies
+        
+    Returns:
+        list: List of deleted DR snapshot details
+    """
+    deleted_snapshots = []
+    expired = []
+    now = datetime.now(timezone.utc)
+    cutoff_date = now - timedelta(days=retention_days)
+    
+    for snapshot in dr_snapshots:
+        if snapshot['State'] != 'completed':
+            continue
+        
+        # Age is measured from the original backup, not from the copy
+        if snapshot['SourceStartTime']:
+            backup_time = datetime.fromisoformat(snapshot['SourceStartTime'])
+        else:
+            backup_time = snapshot['StartTime']
+        
+        if backup_time >= cutoff_date:
+            continue
+        
+        age_days = (now - backup_time).days
+        if logger.debug_enabled and logger.sampled('delete_dr'):
+            logger.debug("Deleting DR snapshot", snapshot_id=snapshot['SnapshotId'], age_days=age_days)
+        expired.append((snapshot, age_days))
+    
+    results = map_calls(
+        lambda item: dr_ec2.delete_snapshot(SnapshotId=item[0]['SnapshotId']),
+        expired,
+        get_limiter('ec2', 'delete', dr_ec2.meta.region_name)
+    )
+    
+    for (snapshot, age_days), _, delete_error in results:
+        if delete_error:
+            logger.error("Error deleting DR snapshot", snapshot_id=snapshot['SnapshotId'],
+                         error=str(delete_error))
+            continue
+        
+        deleted_snapshots.append({
+            'SnapshotId': snapshot['SnapshotId'],
+            'SourceSnapshotId': snapshot['SourceSnapshotId'],
+            'AgeDays': age_days,
+            'VolumeSize': snapshot['VolumeSize']
+        })
+    
+    return deleted_snapshots
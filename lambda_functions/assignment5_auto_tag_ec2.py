@@ -2,24 +2,43 @@
 Assignment 5: Auto-Tagging EC2 Instances on Launch Using AWS Lambda and Boto3
 
 This Lambda function automatically tags newly launched EC2 instances with:
-- Current launch date
-- Custom tags (Owner, Environment, etc.)
+- Launch date (from the instance's LaunchTime)
+- Custom tags (Owner, Environment, etc.): CUSTOM_TAGS, or the rule set
+  configured through TAG_RULES, TAG_RULES_FILE or TAG_RULES_PARAMETER,
+  matched on the instance's type, subnet, key name and launching IAM
+  principal (see tag_rules.py)
+
+The same tags are propagated to the instance's attached EBS volumes and
+network interfaces for cost allocation. Only tags missing from the
+instance are written, so repeated state changes
+do not rewrite the launch date or issue redundant create_tags calls.
 
 This function is triggered by CloudWatch Events (EventBridge) when an EC2 
-instance state changes to 'running'.
+instance state changes to 'running', or by CloudTrail RunInstances API
+call events, which also name the launching principal. It also accepts SQS
+batches of those events or a list of instance IDs, and reports failed SQS messages as
+partial batch failures. A sweep mode ({"mode": "sweep"}) reconciles every
+existing instance in the account, for instances whose events were missed.
 
 Author: AWS Lambda Automation Project
 Date: January 2026
 """
 
-import boto3
 import json
-from datetime import datetime, timezone
+import time
+from datetime import timezone
 
-# Initialize EC2 client
-ec2 = boto3.client('ec2')
+from aws_clients import get_client
+from concurrency import get_limiter, map_calls
+from inventory import (
+    apply_state_change, get_cache, get_instances, get_network_interfaces, get_volumes,
+    load_instances, patch_tags, set_account, store_instances
+)
+from instrumentation import instrumented_handler
+from structured_log import get_logger, logged_handler
+from tag_rules import MAX_TAG_VALUE_LENGTH, get_rule_set, instance_attributes
 
-# Custom tags configuration
+# Custom tags configuration (used when no tag rule source is configured)
 CUSTOM_TAGS = {
     'ManagedBy': 'Lambda',
     'AutoTagged': 'True',
@@ -27,72 +46,240 @@ CUSTOM_TAGS = {
     'Project': 'AWS-Serverless-Lambda'
 }
 
+# Batching configuration
+DESCRIBE_BATCH_SIZE = 200  # instance IDs per describe_instances call
+TAG_BATCH_SIZE = 1000  # resource IDs per create_tags call (API maximum)
+
+# Tag attached EBS volumes and network interfaces along with the instance
+PROPAGATE_TO_ATTACHED_RESOURCES = True
+
+# Records the launching principal from CloudTrail, so evaluations without
+# it (state-change events, sweeps) match principal rules the same way
+PRINCIPAL_TAG_KEY = 'LaunchedBy'
+
+# Instances tagged recently by this container, to skip duplicate deliveries
+TAGGED_CACHE_TTL = 300  # seconds
+TAGGED_CACHE_MAX_SIZE = 10000
+recently_tagged = {}  # instance ID -> expiry (time.monotonic())
+
+# Sweep mode configuration
+SWEEP_INSTANCE_STATES = ['pending', 'running', 'stopping', 'stopped']
+SWEEP_PAGE_SIZE = 1000  # instances per describe_instances page
+SWEEP_TIME_BUFFER = 30  # seconds of invocation time kept in reserve
+
+logger = get_logger(__name__)
+
+
+@logged_handler
+@instrumented_handler
 def lambda_handler(event, context):
     """
     Main Lambda handler function triggered by EC2 state change events
     
     Args:
-        event: CloudWatch Event with EC2 instance details
+        event: CloudWatch Event with EC2 instance details, an SQS batch of
+               such events, or a manual event with instance_id/instance_ids
         context: Lambda context object
         
     Returns:
-        dict: Response with statusCode and tagging details
+        dict: Response with statusCode and tagging details, plus
+              batchItemFailures for SQS batches
     """
     
-    print(f"Lambda function started at {datetime.now(timezone.utc).isoformat()}")
-    print(f"Event received: {json.dumps(event)}")
+    logger.info("Lambda function started")
+    if logger.debug_enabled:
+        logger.debug("Event received", event=event)
+    
+    set_account(context)
+    
+    if event.get('mode') == 'sweep':
+        return run_sweep(event, context)
     
     response = {
         'tagged_instances': [],
+        'skipped_instances': [],
         'errors': []
     }
     
+    is_sqs_batch = 'Records' in event
+    
     try:
-        # Extract instance ID from the event
-        instance_id = extract_instance_id(event)
-        
-        if not instance_id:
-            error_msg = "No instance ID found in event"
-            print(error_msg)
-            response['errors'].append(error_msg)
-            
-            return {
+        # Extract (item identifier, instance ID) pairs from the event
+        items = extract_batch_items(event)
+        
+        # De-duplicate instance IDs, remembering which items asked for each
+        instance_items = {}
+        principals = {}
+        for item_id, instance_id, principal in items:
+            if not instance_id:
+                error_msg = "No instance ID found in event"
+                if is_sqs_batch:
+                    error_msg = f"No instance ID found in message {item_id}"
+                logger.error(error_msg)
+                response['errors'].append(error_msg)
+                continue
+            instance_items.setdefault(instance_id, []).append(item_id)
+            if principal:
+                principals[instance_id] = principal
+        
+        if not instance_items:
+            result = {
                 'statusCode': 400,
                 'body': json.dumps(response)
             }
+            
+            if is_sqs_batch:
+                # Messages without an instance ID cannot succeed on retry
+                result['batchItemFailures'] = []
+            
+            return result
+        
+        # Duplicate deliveries for recently tagged instances need no API calls,
+        # unless they name a launching principal that rules may match on
+        pending_ids = []
+        for instance_id in instance_items:
+            if is_recently_tagged(instance_id) and instance_id not in principals:
+                response['skipped_instances'].append(instance_id)
+            else:
+                pending_ids.append(instance_id)
+        
+        logger.info("Processing instances", count=len(pending_ids))
+        if logger.debug_enabled:
+            logger.debug("Pending instances", instance_ids=pending_ids)
+        
+        # Get instance details in chunked describe calls
+        instance_details, failed = get_instances_details(pending_ids)
+        
+        # Tag instances, grouping identical tag sets into shared calls
+        tagged, tag_failed = tag_instances(instance_details, principals)
+        failed.update(tag_failed)
+        
+        for instance_id, tags_applied in tagged.items():
+            mark_recently_tagged(instance_id)
+            
+            if not tags_applied:
+                response['skipped_instances'].append(instance_id)
+                continue
+            
+            details = instance_details[instance_id]
+            response['tagged_instances'].append({
+                'instance_id': instance_id,
+                'tags_applied': tags_applied,
+                'attached_resources': get_attached_resource_ids(details),
+                'instance_type': details.get('InstanceType'),
+                'availability_zone': details.get('AvailabilityZone')
+            })
         
-        print(f"Processing instance: {instance_id}")
-        
-        # Get instance details
-        instance_details = get_instance_details(instance_id)
-        
-        # Create tags for the instance
-        tags = create_tags(instance_id, instance_details)
-        
-        response['tagged_instances'].append({
-            'instance_id': instance_id,
-            'tags_applied': tags,
-            'instance_type': instance_details.get('InstanceType'),
-            'availability_zone': instance_details.get('AvailabilityZone')
-        })
+        for instance_id, error in failed.items():
+            error_msg = f"Error tagging {instance_id}: {error}"
+            logger.error(error_msg)
+            response['errors'].append(error_msg)
         
-        print(f"Successfully tagged instance {instance_id}")
-        print(f"Tags applied: {json.dumps(tags)}")
+        logger.info(
+            "Summary",
+            tagged=len(response['tagged_instances']),
+            skipped=len(response['skipped_instances']),
+            failed=len(failed)
+        )
         
-        return {
-            'statusCode': 200,
+        result = {
+            'statusCode': 500 if failed and not is_sqs_batch else 200,
             'body': json.dumps(response, default=str)
         }
         
+        if is_sqs_batch:
+            failed_items = {
+                item_id
+                for instance_id in failed
+                for item_id in instance_items[instance_id]
+            }
+            result['batchItemFailures'] = [
+                {'itemIdentifier': item_id} for item_id in sorted(failed_items)
+            ]
+        
+        return result
+        
     except Exception as e:
         error_msg = f"Error in lambda_handler: {str(e)}"
-        print(error_msg)
+        logger.error(error_msg)
         response['errors'].append(error_msg)
         
-        return {
+        result = {
             'statusCode': 500,
             'body': json.dumps(response)
         }
+        
+        if is_sqs_batch:
+            # Retry every message when the batch could not be processed
+            result['batchItemFailures'] = [
+                {'itemIdentifier': record['messageId']} for record in event['Records']
+            ]
+        
+        return result
+
+
+def extract_batch_items(event):
+    """
+    Extract instance IDs from a single event, an SQS batch or a manual list
+    
+    Args:
+        event: Lambda event object
+        
+    Returns:
+        list: (item identifier, instance ID or None, launching principal
+              ARN or None) tuples; the identifier is the SQS messageId for
+              SQS batches
+    """
+    # SQS batch of EventBridge events
+    if 'Records' in event:
+        items = []
+        for record in event['Records']:
+            try:
+                body = json.loads(record['body'])
+                apply_state_change(body)
+                launched = extract_launched_instances(body)
+                if launched:
+                    items.extend((record['messageId'], instance_id, principal)
+                                 for instance_id, principal in launched)
+                else:
+                    items.append((record['messageId'], extract_instance_id(body), None))
+            except Exception as e:
+                logger.error("Error parsing SQS message", message_id=record.get('messageId'), error=str(e))
+                items.append((record.get('messageId'), None, None))
+        return items
+    
+    # Manual invocation with a list of instance IDs
+    if 'instance_ids' in event:
+        return [(instance_id, instance_id, None) for instance_id in event['instance_ids']]
+    
+    launched = extract_launched_instances(event)
+    if launched:
+        return [(instance_id, instance_id, principal) for instance_id, principal in launched]
+    
+    apply_state_change(event)
+    instance_id = extract_instance_id(event)
+    return [(instance_id, instance_id, None)]
+
+
+def extract_launched_instances(event):
+    """
+    Extract launched instances from a CloudTrail RunInstances event
+    
+    Args:
+        event: EventBridge 'AWS API Call via CloudTrail' event
+        
+    Returns:
+        list: (instance ID, principal ARN) tuples, empty for other events
+    """
+    detail = event.get('detail') or {}
+    
+    if event.get('detail-type') != 'AWS API Call via CloudTrail' or detail.get('eventName') != 'RunInstances':
+        return []
+    
+    principal = (detail.get('userIdentity') or {}).get('arn')
+    instances = ((detail.get('responseElements') or {}).get('instancesSet') or {}).get('items', [])
+    
+    return [(instance['instanceId'], principal) for instance in instances]
 
 
 def extract_instance_id(event):
@@ -121,7 +308,7 @@ def extract_instance_id(event):
         return None
         
     except Exception as e:
-        print(f"Error extracting instance ID: {str(e)}")
+        logger.error("Error extracting instance ID", error=str(e))
         return None
 
 
@@ -136,86 +323,629 @@ def get_instance_details(instance_id):
         dict: Instance details
     """
     try:
-        response = ec2.describe_instances(InstanceIds=[instance_id])
+        # Read through the inventory cache
+        instances = get_instances([instance_id])
         
-        if not response['Reservations']:
+        if instance_id not in instances:
             raise Exception(f"Instance {instance_id} not found")
         
-        instance = response['Reservations'][0]['Instances'][0]
-        
-        details = {
-            'InstanceId': instance['InstanceId'],
-            'InstanceType': instance['InstanceType'],
-            'State': instance['State']['Name'],
-            'LaunchTime': instance['LaunchTime'],
-            'AvailabilityZone': instance['Placement']['AvailabilityZone'],
-            'PrivateIpAddress': instance.get('PrivateIpAddress', 'N/A'),
-            'PublicIpAddress': instance.get('PublicIpAddress', 'N/A')
-        }
+        details = instances[instance_id]
         
-        print(f"Instance details: {json.dumps(details, default=str)}")
+        if logger.debug_enabled:
+            logger.debug("Instance details", details=details)
         return details
         
     except Exception as e:
-        print(f"Error getting instance details: {str(e)}")
+        logger.error("Error getting instance details", instance_id=instance_id, error=str(e))
         raise
 
 
-def create_tags(instance_id, instance_details):
+def get_instances_details(instance_ids):
     """
-    Create and apply tags to EC2 instance
+    Get EC2 instance details for many instances in chunked describe calls
+    
+    Instances in the warm inventory cache are not described again. A chunk
+    of uncached instances that fails (e.g. one unknown instance ID) is retried one
+    instance at a time so a single bad ID does not fail the whole chunk.
+    
+    Args:
+        instance_ids: List of unique EC2 instance IDs
+        
+    Returns:
+        tuple: (dict of instance details by ID, dict of errors by ID)
+    """
+    details, missing = get_cache('instance').get_many(instance_ids)
+    failed = {}
+    
+    for i in range(0, len(missing), DESCRIBE_BATCH_SIZE):
+        chunk = missing[i:i + DESCRIBE_BATCH_SIZE]
+        
+        try:
+            details.update(load_instances(chunk))
+        except Exception as e:
+            if len(chunk) == 1:
+                failed[chunk[0]] = str(e)
+                continue
+            
+            logger.warning("Error describing instances, retrying individually",
+                           count=len(chunk), error=str(e))
+            for instance_id in chunk:
+                try:
+                    details.update(load_instances([instance_id]))
+                except Exception as single_error:
+                    failed[instance_id] = str(single_error)
+        
+        for instance_id in chunk:
+            if instance_id not in details and instance_id not in failed:
+                failed[instance_id] = f"Instance {instance_id} not found"
+    
+    return details, failed
+
+
+def get_attached_resource_ids(instance_details):
+    """
+    Get the IDs of resources that inherit the instance's tags
     
     Args:
-        instance_id: EC2 instance ID
         instance_details: Dictionary with instance information
         
     Returns:
-        list: List of applied tags
+        list: Attached EBS volume and network interface IDs
     """
-    try:
-        # Get current date
-        current_date = datetime.now(timezone.utc).strftime('%Y-%m-%d')
-        current_datetime = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
-        
-        # Build tags list
-        tags = [
-            {
-                'Key': 'LaunchDate',
-                'Value': current_date
-            },
-            {
-                'Key': 'LaunchDateTime',
-                'Value': current_datetime
-            }
-        ]
+    if not PROPAGATE_TO_ATTACHED_RESOURCES:
+        return []
+    
+    return instance_details.get('VolumeIds', []) + instance_details.get('NetworkInterfaceIds', [])
+
+
+def build_tags(instance_details, principal=None):
+    """
+    Build the desired tag set for an EC2 instance
+    
+    Without a principal from the event, the one recorded under
+    PRINCIPAL_TAG_KEY (if any) is used for the rules.
+    
+    Args:
+        instance_details: Dictionary with instance information
+        principal: ARN of the IAM principal that launched the instance
         
-        # Add custom tags
-        for key, value in CUSTOM_TAGS.items():
-            tags.append({
-                'Key': key,
-                'Value': value
-            })
+    Returns:
+        dict: Desired tags, by key
+    """
+    launch_time = instance_details['LaunchTime'].astimezone(timezone.utc)
+    principal = principal or get_recorded_principal(instance_details)
+    
+    tags = {
+        'LaunchDate': launch_time.strftime('%Y-%m-%d'),
+        'LaunchDateTime': launch_time.strftime('%Y-%m-%d %H:%M:%S UTC')
+    }
+    
+    if principal and len(principal) <= MAX_TAG_VALUE_LENGTH:
+        tags[PRINCIPAL_TAG_KEY] = principal
+    
+    # Add custom tags from the matching rules
+    rule_set = get_rule_set(CUSTOM_TAGS)
+    tags.update(rule_set.evaluate(instance_attributes(instance_details, principal)))
+    
+    # Add instance type tag
+    tags['InstanceType'] = instance_details.get('InstanceType', 'Unknown')
+    
+    return tags
+
+
+def get_recorded_principal(instance_details):
+    """
+    Get the launching principal recorded on the instance, if any
+    """
+    return instance_details.get('Tags', {}).get(PRINCIPAL_TAG_KEY)
+
+
+def get_replaceable_tags(instance_details, principal):
+    """
+    Get the rule tags an evaluation without the principal produces
+    
+    State-change events usually arrive before the CloudTrail RunInstances
+    event, so the rules first run without the principal. Once the principal
+    is known, tags still carrying those values are replaced (or removed if
+    the principal's rules do not produce them); values set by anyone else
+    are left alone.
+    
+    Args:
+        instance_details: Dictionary with instance information
+        principal: ARN of the launching principal from the event, or None
+        
+    Returns:
+        dict: Tags that may be replaced, empty unless the principal is new
+    """
+    if not principal or get_recorded_principal(instance_details) == principal:
+        return {}
+    
+    return get_rule_set(CUSTOM_TAGS).evaluate(instance_attributes(instance_details))
+
+
+def get_missing_tags(desired_tags, existing_tags, replaceable_tags=None):
+    """
+    Diff a desired tag set against the tags already on one resource
+    
+    Args:
+        desired_tags: Dictionary of desired tags
+        existing_tags: Dictionary of the resource's current tags
+        replaceable_tags: Optional tags whose current values may be
+                          overwritten (see get_replaceable_tags)
+        
+    Returns:
+        dict: Desired tags whose keys are not yet on the resource, or whose
+              replaceable value differs
+    """
+    replaceable_tags = replaceable_tags or {}
+    
+    return {
+        key: value
+        for key, value in desired_tags.items()
+        if key not in existing_tags
+        or (existing_tags[key] != value and existing_tags[key] == replaceable_tags.get(key))
+    }
+
+
+def get_stale_tags(desired_tags, existing_tags, replaceable_tags):
+    """
+    Get replaceable tags on one resource that the desired set drops
+    
+    Args:
+        desired_tags: Dictionary of desired tags
+        existing_tags: Dictionary of the resource's current tags
+        replaceable_tags: Tags whose current values may be removed
+        
+    Returns:
+        dict: Tags to delete, with the values they must still have
+    """
+    return {
+        key: value
+        for key, value in replaceable_tags.items()
+        if key not in desired_tags and existing_tags.get(key) == value
+    }
+
+
+def get_attached_resource_tags(instances, region=None):
+    """
+    Get the current tags of the instances' attached resources
+    
+    Volumes and network interfaces are read through the inventory cache in
+    batched describe calls. If a lookup fails, its resources are treated
+    as untagged, so every desired tag is written to them.
+    
+    Args:
+        instances: Iterable of instance records
+        region: AWS region name (defaults to the function's region)
+        
+    Returns:
+        dict: Tags by resource ID
+    """
+    if not PROPAGATE_TO_ATTACHED_RESOURCES:
+        return {}
+    
+    volume_ids = []
+    interface_ids = []
+    for details in instances:
+        volume_ids.extend(details.get('VolumeIds', []))
+        interface_ids.extend(details.get('NetworkInterfaceIds', []))
+    
+    attached_tags = {}
+    for lookup, resource_ids in ((get_volumes, volume_ids), (get_network_interfaces, interface_ids)):
+        try:
+            records = lookup(resource_ids, region)
+        except Exception as e:
+            logger.warning("Error describing attached resources, treating them as untagged",
+                           resources=len(resource_ids), error=str(e))
+            continue
+        
+        attached_tags.update((resource_id, record['Tags']) for resource_id, record in records.items())
+    
+    return attached_tags
+
+
+def get_resource_missing_tags(instance_details, desired_tags, attached_tags, replaceable_tags=None):
+    """
+    Diff the desired tags against the instance's and each attached
+    resource's own tags
+    
+    Args:
+        instance_details: Dictionary with instance information
+        desired_tags: Dictionary of desired tags (see build_tags)
+        attached_tags: Tags of attached resources by ID (see
+                       get_attached_resource_tags)
+        replaceable_tags: Optional tags whose values may be overwritten
+        
+    Returns:
+        tuple: (dict of missing tags by resource ID, dict of stale tags to
+                delete by resource ID); resources without changes are absent
+    """
+    resources = [(instance_details['InstanceId'], instance_details.get('Tags', {}))]
+    resources.extend(
+        (resource_id, attached_tags.get(resource_id, {}))
+        for resource_id in get_attached_resource_ids(instance_details)
+    )
+    
+    missing = {}
+    stale = {}
+    for resource_id, existing_tags in resources:
+        missing_tags = get_missing_tags(desired_tags, existing_tags, replaceable_tags)
+        if missing_tags:
+            missing[resource_id] = missing_tags
+        
+        if replaceable_tags:
+            stale_tags = get_stale_tags(desired_tags, existing_tags, replaceable_tags)
+            if stale_tags:
+                stale[resource_id] = stale_tags
+    
+    return missing, stale
+
+
+def tag_instances(instance_details, principals=None):
+    """
+    Apply missing tags to EC2 instances and their attached resources
+    
+    The instance, its volumes and its network interfaces are each diffed
+    against their own tags. Resources missing identical tag sets share
+    multi-resource create_tags calls, chunked to the API resource limit.
+    Resources that already carry every tag are not written to. When an
+    event brings a new launching principal, rule tags written without it
+    are replaced or deleted (see get_replaceable_tags).
+    
+    Args:
+        instance_details: Dictionary of instance details by instance ID
+        principals: Optional dictionary of launching principal ARNs by
+                    instance ID
         
-        # Add instance type tag
-        tags.append({
-            'Key': 'InstanceType',
-            'Value': instance_details.get('InstanceType', 'Unknown')
-        })
+    Returns:
+        tuple: (dict of tags applied to any of each instance's resources
+                by instance ID, empty when nothing was missing; dict of
+                errors by ID)
+    """
+    ec2 = get_client('ec2')
+    principals = principals or {}
+    tagged = {}
+    failed = {}
+    attached_tags = get_attached_resource_tags(instance_details.values())
+    
+    # Group resources by identical tag set to write or delete:
+    # (action, tag items) -> {instance ID: resource IDs}
+    groups = {}
+    for instance_id, details in instance_details.items():
+        principal = principals.get(instance_id)
+        desired_tags = build_tags(details, principal)
+        missing, stale = get_resource_missing_tags(
+            details, desired_tags, attached_tags, get_replaceable_tags(details, principal)
+        )
         
-        # Apply tags to instance
-        ec2.create_tags(
-            Resources=[instance_id],
-            Tags=tags
+        if not missing and not stale:
+            if logger.debug_enabled and logger.sampled('already_tagged'):
+                logger.debug("Instance already has all tags, skipping", instance_id=instance_id)
+            tagged[instance_id] = {}
+            continue
+        
+        for action, changes in (('create', missing), ('delete', stale)):
+            for resource_id, tags in changes.items():
+                group = groups.setdefault((action, tuple(sorted(tags.items()))), {})
+                group.setdefault(instance_id, []).append(resource_id)
+    
+    # One create_tags/delete_tags call per (tag set, resource chunk), run concurrently
+    calls = [
+        (action, tag_items, chunk)
+        for (action, tag_items), resources in groups.items()
+        for chunk in chunk_instance_resources(resources)
+    ]
+    
+    def write_tags(call):
+        action, tag_items, chunk = call
+        resources = [resource_id for ids in chunk.values() for resource_id in ids]
+        tags = [{'Key': key, 'Value': value} for key, value in tag_items]
+        
+        if action == 'delete':
+            # Values make the delete conditional on the tag being unchanged
+            response = ec2.delete_tags(Resources=resources, Tags=tags)
+            patch_tags(resources, {}, removed=[key for key, _ in tag_items])
+        else:
+            response = ec2.create_tags(Resources=resources, Tags=tags)
+            patch_tags(resources, dict(tag_items))
+        return response
+    
+    for (action, tag_items, chunk), _, e in map_calls(write_tags, calls, get_limiter('ec2', 'tag')):
+        if e:
+            logger.error("Error writing tags", action=action, instances=len(chunk), error=str(e))
+            for instance_id in chunk:
+                failed[instance_id] = str(e)
+            continue
+        
+        for instance_id in chunk:
+            tags_applied = tagged.setdefault(instance_id, {})
+            if action == 'create':
+                tags_applied.update(tag_items)
+        
+        logger.info(
+            "Tags applied" if action == 'create' else "Stale rule tags removed",
+            instances=len(chunk),
+            resources=sum(len(ids) for ids in chunk.values()),
+            tags=dict(tag_items)
         )
+    
+    # An instance is only done once every one of its calls succeeded
+    for instance_id in failed:
+        tagged.pop(instance_id, None)
+    
+    return tagged, failed
+
+
+def chunk_instance_resources(resources_by_instance):
+    """
+    Split resources sharing a tag set into create_tags chunks
+    
+    An instance's resources always land in the same chunk, so a failed
+    call maps cleanly back to the instances it covered.
+    
+    Args:
+        resources_by_instance: Dictionary of resource IDs (the instance
+                               and/or its attached resources) by instance ID
+        
+    Returns:
+        list: Chunks, each a dict of resource IDs by instance ID
+    """
+    chunks = []
+    chunk = {}
+    chunk_size = 0
+    
+    for instance_id, resources in resources_by_instance.items():
+        if chunk and chunk_size + len(resources) > TAG_BATCH_SIZE:
+            chunks.append(chunk)
+            chunk = {}
+            chunk_size = 0
+        
+        chunk[instance_id] = resources
+        chunk_size += len(resources)
+    
+    if chunk:
+        chunks.append(chunk)
+    
+    return chunks
+
+
+def is_recently_tagged(instance_id):
+    """
+    Check whether this container tagged the instance within the cache TTL
+    
+    Args:
+        instance_id: EC2 instance ID
+        
+    Returns:
+        bool: True if the instance was tagged recently
+    """
+    expiry = recently_tagged.get(instance_id)
+    return expiry is not None and expiry > time.monotonic()
+
+
+def mark_recently_tagged(instance_id):
+    """
+    Record that the instance is fully tagged, evicting expired entries
+    
+    Args:
+        instance_id: EC2 instance ID
+    """
+    now = time.monotonic()
+    
+    if len(recently_tagged) >= TAGGED_CACHE_MAX_SIZE:
+        for cached_id, expiry in list(recently_tagged.items()):
+            if expiry <= now:
+                del recently_tagged[cached_id]
+        
+        # Still full: drop the oldest entries (dicts keep insertion order)
+        while len(recently_tagged) >= TAGGED_CACHE_MAX_SIZE:
+            del recently_tagged[next(iter(recently_tagged))]
+    
+    recently_tagged.pop(instance_id, None)
+    recently_tagged[instance_id] = now + TAGGED_CACHE_TTL
+
+
+def run_sweep(event, context):
+    """
+    Reconcile the custom tags on every existing instance in one or more regions
+    
+    Args:
+        event: Sweep event; 'regions' may be a list of region names or 'all'
+               (defaults to the function's own region)
+        context: Lambda context object (used to stop before the timeout)
         
-        # Convert tags to dictionary for response
-        tags_dict = {tag['Key']: tag['Value'] for tag in tags}
+    Returns:
+        dict: Response with statusCode and per-region sweep statistics
+    """
+    ec2 = get_client('ec2')
+    response = {
+        'mode': 'sweep',
+        'regions': {},
+        'complete': True,
+        'errors': []
+    }
+    
+    try:
+        regions = event.get('regions') or [ec2.meta.region_name]
+        if regions == 'all':
+            regions = [
+                region['RegionName']
+                for region in ec2.describe_regions()['Regions']
+            ]
         
-        return tags_dict
+        for region in regions:
+            if is_out_of_time(context):
+                response['complete'] = False
+                response['errors'].append(f"Out of time before sweeping {region}")
+                break
+            
+            logger.info("Sweeping region", region=region)
+            stats = sweep_region(get_client('ec2', region), context)
+            response['regions'][region] = stats
+            response['complete'] = response['complete'] and stats['complete']
+            
+            logger.info(
+                "Region swept",
+                region=region,
+                scanned=stats['scanned'],
+                tagged=stats['tagged'],
+                failed=len(stats['failed'])
+            )
+        
+        return {
+            'statusCode': 200,
+            'body': json.dumps(response, default=str)
+        }
         
     except Exception as e:
-        print(f"Error creating tags: {str(e)}")
-        raise
+        error_msg = f"Error in run_sweep: {str(e)}"
+        logger.error(error_msg)
+        response['errors'].append(error_msg)
+        
+        return {
+            'statusCode': 500,
+            'body': json.dumps(response, default=str)
+        }
+
+
+def sweep_region(client, context=None):
+    """
+    Page through a region's instances and bulk-apply missing custom tags
+    
+    The launching principal is not known during a sweep; rules that match
+    on it use the one recorded under PRINCIPAL_TAG_KEY, if any.
+    
+    Instances are processed as they stream in. The tags of each page's
+    attached volumes and network interfaces are looked up in batches, and
+    every resource is added to the pending group for its own missing tag
+    set. A group is flushed as one create_tags call as soon as it reaches
+    the resource limit, so memory stays bounded by the number of distinct
+    missing tag sets. The calls go through the region's adaptive
+    'ec2'/'tag' limiter.
+    
+    Args:
+        client: EC2 client for the region
+        context: Lambda context object (used to stop before the timeout)
+        
+    Returns:
+        dict: Sweep statistics for the region
+    """
+    stats = {
+        'scanned': 0,
+        'already_tagged': 0,
+        'tagged': 0,
+        'tagged_resources': 0,
+        'failed': [],
+        'complete': True
+    }
+    
+    # Missing tag set -> {instance ID: resource IDs} awaiting create_tags
+    groups = {}
+    group_sizes = {}
+    
+    progress = logger.progress("Sweep progress")
+    rule_set = get_rule_set(CUSTOM_TAGS)
+    
+    paginator = client.get_paginator('describe_instances')
+    pages = paginator.paginate(
+        Filters=[{'Name': 'instance-state-name', 'Values': SWEEP_INSTANCE_STATES}],
+        PaginationConfig={'PageSize': SWEEP_PAGE_SIZE}
+    )
+    
+    for page in pages:
+        scanned = stats['scanned']
+        instances = [
+            details
+            for reservation in page['Reservations']
+            for details in store_instances(reservation['Instances'], client.meta.region_name)
+        ]
+        attached_tags = get_attached_resource_tags(instances, client.meta.region_name)
+        
+        for details in instances:
+            stats['scanned'] += 1
+            
+            attributes = instance_attributes(details, get_recorded_principal(details))
+            missing, _ = get_resource_missing_tags(details, rule_set.evaluate(attributes), attached_tags)
+            
+            if not missing:
+                stats['already_tagged'] += 1
+                continue
+            
+            stats['tagged'] += 1
+            
+            for resource_id, missing_tags in missing.items():
+                key = tuple(sorted(missing_tags.items()))
+                
+                if key in groups and group_sizes[key] + 1 > TAG_BATCH_SIZE:
+                    flush_sweep_group(client, key, groups.pop(key), stats)
+                
+                if key not in groups:
+                    groups[key] = {}
+                    group_sizes[key] = 0
+                
+                groups[key].setdefault(details['InstanceId'], []).append(resource_id)
+                group_sizes[key] += 1
+        
+        progress.update(
+            stats['scanned'] - scanned,
+            region=client.meta.region_name,
+            tagged=stats['tagged']
+        )
+        
+        if is_out_of_time(context):
+            logger.warning("Sweep stopping early to stay within the invocation timeout")
+            stats['complete'] = False
+            break
+    
+    for key in list(groups):
+        flush_sweep_group(client, key, groups.pop(key), stats)
+    
+    # Instances whose resources span several groups may have failed twice
+    stats['failed'] = list(dict.fromkeys(stats['failed']))
+    stats['tagged'] -= len(stats['failed'])
+    
+    return stats
+
+
+def flush_sweep_group(client, tag_items, group, stats):
+    """
+    Apply one group's missing tags with a single multi-resource call
+    
+    Args:
+        client: EC2 client for the region
+        tag_items: Sorted (key, value) tuples of the tags to apply
+        group: Dictionary of resource IDs by instance ID
+        stats: Sweep statistics to update
+    """
+    resources = [resource_id for ids in group.values() for resource_id in ids]
+    
+    try:
+        get_limiter('ec2', 'tag', client.meta.region_name).call(
+            client.create_tags,
+            Resources=resources,
+            Tags=[{'Key': key, 'Value': value} for key, value in tag_items]
+        )
+        patch_tags(resources, dict(tag_items), client.meta.region_name)
+        stats['tagged_resources'] += len(resources)
+        
+    except Exception as e:
+        logger.error("Error creating tags", instances=len(group), error=str(e))
+        stats['failed'].extend(group)
+
+
+def is_out_of_time(context):
+    """
+    Check whether the invocation is close to its timeout
+    
+    Args:
+        context: Lambda context object, or None outside Lambda
+        
+    Returns:
+        bool: True if less than SWEEP_TIME_BUFFER seconds remain
+    """
+    if context is None:
+        return False
+    return context.get_remaining_time_in_millis() < SWEEP_TIME_BUFFER * 1000
 
 
 def get_existing_tags(instance_id):
@@ -228,6 +958,7 @@ def get_existing_tags(instance_id):
     Returns:
         dict: Existing tags
     """
+    ec2 = get_client('ec2')
     try:
         response = ec2.describe_tags(
             Filters=[
@@ -239,10 +970,10 @@ def get_existing_tags(instance_id):
         )
         
         existing_tags = {tag['Key']: tag['Value'] for tag in response['Tags']}
-        print(f"Existing tags on {instance_id}: {existing_tags}")
+        logger.debug("Existing tags", instance_id=instance_id, tags=existing_tags)
         
         return existing_tags
         
     except Exception as e:
-        print(f"Error getting existing tags: {str(e)}")
+        logger.error("Error getting existing tags", instance_id=instance_id, error=str(e))
         return {}
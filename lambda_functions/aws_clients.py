@@ -0,0 +1,183 @@
+"""
+Shared boto3 client factory for the Lambda functions
+
+Clients are created lazily on first use and cached per (service, region,
+role) for the lifetime of the container, so warm invocations reuse their
+connection pools and cold starts only pay for the clients a code path
+actually needs. Every client shares a tuned botocore configuration:
+- A larger connection pool for concurrent calls
+- Adaptive retry mode (client-side rate limiting on throttles)
+- TCP keep-alive and explicit connect/read timeouts
+- Per-operation call instrumentation (see instrumentation.py)
+
+Settings can be overridden with environment variables on the function.
+
+boto3 and botocore are imported on the first get_client() call rather than
+at module import, so a handler that exits before touching AWS never pays
+for loading them.
+
+Author: AWS Lambda Automation Project
+Date: January 2026
+"""
+
+import os
+import threading
+from datetime import timezone
+
+from instrumentation import instrument
+
+# Client configuration (overridable through environment variables)
+MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '50'))
+RETRY_MODE = os.environ.get('AWS_RETRY_MODE', 'adaptive')
+MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS', '8'))
+CONNECT_TIMEOUT = float(os.environ.get('AWS_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.environ.get('AWS_READ_TIMEOUT', '30'))
+TCP_KEEPALIVE = os.environ.get('AWS_TCP_KEEPALIVE', 'true').lower() == 'true'
+ROLE_SESSION_NAME = 'Lambda-Automation'
+
+# Cached clients and sessions, reused across warm invocations
+clients = {}  # (service, region, role ARN) -> client
+sessions = {}  # role ARN (None for the function's own role) -> boto3 Session
+lock = threading.Lock()
+
+
+def get_client(service, region=None, role_arn=None):
+    """
+    Get a cached boto3 client, creating it on first use
+
+    Args:
+        service: AWS service name (e.g. 'ec2', 's3')
+        region: AWS region name (defaults to the function's region)
+        role_arn: Optional IAM role to assume for the client
+
+    Returns:
+        boto3 client for the service, region and role
+    """
+    region = region or default_region()
+    key = (service, region, role_arn)
+
+    client = clients.get(key)
+    if client is None:
+        # Client creation is not thread-safe, and threads may race here
+        with lock:
+            client = clients.get(key)
+            if client is None:
+                client = create_client(service, region, role_arn)
+                clients[key] = client
+
+    return client
+
+
+def create_client(service, region, role_arn=None, **overrides):
+    """
+    Create an instrumented client; must be called with the lock held
+
+    Args:
+        service: AWS service name
+        region: AWS region name
+        role_arn: Optional IAM role to assume for the client
+        **overrides: Settings replacing the shared configuration (see
+                     get_client_config)
+
+    Returns:
+        boto3 client
+    """
+    client = get_session(role_arn).client(
+        service, region_name=region, config=get_client_config(**overrides)
+    )
+    instrument(client)
+    return client
+
+
+def get_client_config(**overrides):
+    """
+    Build the botocore configuration shared by all clients
+
+    Args:
+        **overrides: botocore Config settings replacing the shared ones,
+                     e.g. read_timeout for long-running calls
+
+    Returns:
+        botocore.config.Config: Client configuration
+    """
+    from botocore.config import Config
+
+    settings = {
+        'max_pool_connections': MAX_POOL_CONNECTIONS,
+        'retries': {'mode': RETRY_MODE, 'max_attempts': MAX_ATTEMPTS},
+        'connect_timeout': CONNECT_TIMEOUT,
+        'read_timeout': READ_TIMEOUT,
+        'tcp_keepalive': TCP_KEEPALIVE
+    }
+    settings.update(overrides)
+
+    return Config(**settings)
+
+
+def default_region():
+    """
+    Get the region the function runs in
+
+    Returns:
+        str: Region name from the Lambda environment, or None
+    """
+    return os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION')
+
+
+def get_session(role_arn=None):
+    """
+    Get a boto3 session for the function's role or an assumed role
+
+    Must be called with the lock held.
+
+    Args:
+        role_arn: Optional IAM role to assume
+
+    Returns:
+        boto3.Session: Session whose credentials refresh automatically
+    """
+    if role_arn not in sessions:
+        import boto3
+        
+        if role_arn is None:
+            sessions[role_arn] = boto3.session.Session()
+        else:
+            sessions[role_arn] = create_assumed_role_session(role_arn)
+
+    return sessions[role_arn]
+
+
+def create_assumed_role_session(role_arn):
+    """
+    Create a session whose credentials are refreshed by assuming a role
+
+    Args:
+        role_arn: IAM role to assume
+
+    Returns:
+        boto3.Session: Session using refreshable assumed-role credentials
+    """
+    import boto3
+    from botocore.credentials import RefreshableCredentials
+    from botocore.session import get_session as get_botocore_session
+
+    sts = get_session().client('sts', config=get_client_config())
+
+    def refresh():
+        response = sts.assume_role(RoleArn=role_arn, RoleSessionName=ROLE_SESSION_NAME)
+        credentials = response['Credentials']
+        return {
+            'access_key': credentials['AccessKeyId'],
+            'secret_key': credentials['SecretAccessKey'],
+            'token': credentials['SessionToken'],
+            'expiry_time': credentials['Expiration'].astimezone(timezone.utc).isoformat()
+        }
+
+    botocore_session = get_botocore_session()
+    botocore_session._credentials = RefreshableCredentials.create_from_metadata(
+        metadata=refresh(),
+        refresh_using=refresh,
+        method='sts-assume-role'
+    )
+
+    return boto3.session.Session(botocore_session=botocore_session)
@@ -0,0 +1,343 @@
+"""
+Adaptive (AIMD) concurrency control for AWS API calls
+
+Instead of hand-picked worker counts, each kind of call gets a limiter
+that learns how many requests it can keep in flight:
+- Additive increase: the limit grows by about one per window of `limit`
+  successful calls while latency stays near its baseline and calls succeed
+- Multiplicative decrease: the limit is cut sharply on throttling
+  (Throttling, RequestLimitExceeded, SlowDown, HTTP 429/503) and on calls
+  that only succeeded after retries, at most once per window of calls
+  that were already in flight when the backoff happened
+
+Limiters are kept per (service, region, operation class), e.g.
+('s3', 'us-east-1', 'delete'), and live for the lifetime of the container
+so warm invocations start from the limit the previous ones learned.
+
+Work is scheduled with map_calls(), which runs a function over items on
+a thread pool and lets the limiter decide how many run at once, or with
+imap_calls(), which streams the results while items are still produced.
+
+Author: AWS Lambda Automation Project
+Date: January 2026
+"""
+
+import os
+import threading
+import time
+
+from aws_clients import default_region, MAX_POOL_CONNECTIONS
+from instrumentation import THROTTLE_ERROR_CODES
+from structured_log import get_logger
+
+# Limiter configuration (overridable through environment variables)
+INITIAL_CONCURRENCY = int(os.environ.get('ADAPTIVE_INITIAL_CONCURRENCY', '4'))
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = int(os.environ.get('ADAPTIVE_MAX_CONCURRENCY', str(MAX_POOL_CONNECTIONS)))
+BACKOFF_FACTOR = 0.5  # limit multiplier on throttling
+LATENCY_TOLERANCE = 2.0  # latency above baseline * tolerance stops growth
+LATENCY_SLACK_MS = 20.0  # ignore latency increases smaller than this
+LATENCY_SMOOTHING = 0.1  # weight of a new sample in the latency average
+
+THROTTLE_STATUS_CODES = {429, 503}
+
+# Limiters by (service, region, operation class), reused across warm invocations
+limiters = {}
+lock = threading.Lock()
+
+logger = get_logger(__name__)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on the number of concurrent calls of one kind
+    """
+
+    def __init__(self, name, initial=INITIAL_CONCURRENCY, minimum=MIN_CONCURRENCY,
+                 maximum=MAX_CONCURRENCY):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.in_flight = 0
+        self.condition = threading.Condition()
+
+        # Calls are numbered as they start; a backoff is only applied for
+        # calls started after the previous one, so a burst of throttles from
+        # the same window cuts the limit once
+        self.started = 0
+        self.backoff_after = 0
+
+        self.latency_avg_ms = None
+        self.latency_baseline_ms = None
+
+        self.calls = 0
+        self.throttles = 0
+        self.backoffs = 0
+        self.peak_in_flight = 0
+
+    def acquire(self):
+        """
+        Wait until the limit allows another call to start
+
+        Returns:
+            int: Sequence number of the call, to pass to release()
+        """
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.started += 1
+            return self.started
+
+    def release(self, sequence, latency_ms, throttled=False, failed=False):
+        """
+        Finish a call and adjust the limit from its outcome
+
+        Args:
+            sequence: Sequence number returned by acquire()
+            latency_ms: Duration of the call in milliseconds
+            throttled: True if the call was throttled or had to be retried
+            failed: True if the call failed for another reason
+        """
+        with self.condition:
+            self.in_flight -= 1
+            self.calls += 1
+
+            if throttled:
+                self.throttles += 1
+                if sequence > self.backoff_after:
+                    self.backoff()
+            elif not failed:
+                self.record_latency(latency_ms)
+                if self.latency_healthy() and self.limit < self.maximum:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+            self.condition.notify_all()
+
+    def backoff(self):
+        """
+        Cut the limit multiplicatively; must be called with the condition held
+        """
+        previous = int(self.limit)
+        self.limit = max(self.minimum, self.limit * BACKOFF_FACTOR)
+        self.backoff_after = self.started
+        self.backoffs += 1
+
+        logger.debug("Throttled, reducing concurrency", limiter=self.name,
+                     previous_limit=previous, limit=int(self.limit))
+
+    def record_latency(self, latency_ms):
+        """
+        Update the latency average and its baseline (lowest average seen)
+        """
+        if self.latency_avg_ms is None:
+            self.latency_avg_ms = latency_ms
+        else:
+            self.latency_avg_ms += LATENCY_SMOOTHING * (latency_ms - self.latency_avg_ms)
+
+        if self.latency_baseline_ms is None or self.latency_avg_ms < self.latency_baseline_ms:
+            self.latency_baseline_ms = self.latency_avg_ms
+
+    def latency_healthy(self):
+        """
+        Check whether latency is close enough to its baseline to grow the limit
+        """
+        excess = self.latency_avg_ms - self.latency_baseline_ms
+        return (excess <= LATENCY_SLACK_MS
+                or self.latency_avg_ms <= self.latency_baseline_ms * LATENCY_TOLERANCE)
+
+    def call(self, function, *args, **kwargs):
+        """
+        Run one call within the limit and learn from its outcome
+
+        Args:
+            function: Callable making the AWS call
+            *args, **kwargs: Arguments for the callable
+
+        Returns:
+            The callable's return value (exceptions are re-raised)
+        """
+        sequence = self.acquire()
+        start = time.perf_counter()
+
+        try:
+            result = function(*args, **kwargs)
+        except Exception as e:
+            self.release(sequence, (time.perf_counter() - start) * 1000,
+                         throttled=is_throttle_error(e), failed=True)
+            raise
+
+        self.release(sequence, (time.perf_counter() - start) * 1000,
+                     throttled=was_retried(result))
+        return result
+
+    def get_summary(self):
+        """
+        Summarize the limiter's state
+
+        Returns:
+            dict: Current limit, peak concurrency and call counts
+        """
+        with self.condition:
+            return {
+                'limit': int(self.limit),
+                'peak_in_flight': self.peak_in_flight,
+                'calls': self.calls,
+                'throttles': self.throttles,
+                'backoffs': self.backoffs
+            }
+
+
+def get_limiter(service, operation_class, region=None):
+    """
+    Get the limiter for a kind of call, creating it on first use
+
+    Args:
+        service: AWS service name (e.g. 's3')
+        operation_class: Kind of operation (e.g. 'read', 'write', 'delete', 'tag')
+        region: AWS region name (defaults to the function's region)
+
+    Returns:
+        AdaptiveLimiter: Limiter shared by all calls of that kind
+    """
+    key = (service, region or default_region(), operation_class)
+
+    limiter = limiters.get(key)
+    if limiter is None:
+        with lock:
+            limiter = limiters.setdefault(key, AdaptiveLimiter('/'.join(map(str, key))))
+
+    return limiter
+
+
+def map_calls(function, items, limiter):
+    """
+    Run a function over items concurrently within a limiter
+
+    Args:
+        function: Callable taking one item and making the AWS call
+        items: Iterable of items
+        limiter: AdaptiveLimiter for the calls
+
+    Returns:
+        list: (item, result, error) tuples in the order of items, with
+              error None on success and result None on failure
+    """
+    return list(imap_calls(function, items, limiter))
+
+
+def imap_calls(function, items, limiter):
+    """
+    Run a function over items concurrently within a limiter, yielding
+    results in the order of items as they become available
+
+    Items are consumed lazily: at most twice limiter.maximum calls are
+    submitted ahead of the oldest unfinished one, so items can be a
+    generator over a long listing whose next page is fetched while earlier
+    calls run. Errors are returned per item rather than raised. If
+    iterating items raises, the calls already submitted are still yielded
+    before the exception is re-raised.
+
+    Args:
+        function: Callable taking one item and making the AWS call
+        items: Iterable of items
+        limiter: AdaptiveLimiter for the calls
+
+    Yields:
+        tuple: (item, result, error), with error None on success and
+               result None on failure
+    """
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+    from itertools import chain, islice
+
+    items = iter(items)
+    head = list(islice(items, 2))
+    if len(head) <= 1 or limiter.maximum == 1:
+        for item in chain(head, items):
+            yield call_item(function, item, limiter)
+        return
+
+    workers = limiter.maximum
+    pending = deque()
+    iteration_error = None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for item in chain(head, items):
+                while pending and (pending[0].done() or len(pending) >= workers * 2):
+                    yield pending.popleft().result()
+                pending.append(executor.submit(call_item, function, item, limiter))
+        except Exception as e:
+            iteration_error = e
+
+        while pending:
+            yield pending.popleft().result()
+
+    if iteration_error is not None:
+        raise iteration_error
+
+
+def call_item(function, item, limiter):
+    """
+    Run one call within the limiter, capturing its error
+
+    Returns:
+        tuple: (item, result, error)
+    """
+    try:
+        return item, limiter.call(function, item), None
+    except Exception as e:
+        return item, None, e
+
+
+def is_throttle_error(error):
+    """
+    Check whether an exception is a throttling response
+
+    Args:
+        error: Exception raised by a client call
+
+    Returns:
+        bool: True for throttling error codes and HTTP 429/503
+    """
+    response = getattr(error, 'response', None)
+    if not isinstance(response, dict):
+        return False
+
+    code = response.get('Error', {}).get('Code')
+    status = response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    return code in THROTTLE_ERROR_CODES or status in THROTTLE_STATUS_CODES
+
+
+def was_retried(result):
+    """
+    Check whether a call only succeeded after retries
+
+    The client retries throttled calls itself, so a response that needed
+    retries is the earliest sign that the limit is too high.
+
+    Args:
+        result: Return value of a client call
+
+    Returns:
+        bool: True if the response reports retry attempts
+    """
+    if not isinstance(result, dict):
+        return False
+
+    return result.get('ResponseMetadata', {}).get('RetryAttempts', 0) > 0
+
+
+def get_summary():
+    """
+    Summarize every limiter created in this container
+
+    Returns:
+        dict: Limiter summaries by 'service/region/operation class'
+    """
+    with lock:
+        return {limiter.name: limiter.get_summary() for limiter in limiters.values()}
@@ -0,0 +1,287 @@
+"""
+Fan-out of work items to worker invocations of a Lambda function
+
+A coordinator hands a list of JSON payloads to an executor and gets back
+each worker's response:
+- LambdaExecutor invokes a function synchronously (RequestResponse) once
+  per payload, FANOUT_CONCURRENCY at a time. Invocations use a dedicated
+  client that waits up to FANOUT_READ_TIMEOUT seconds for a worker and
+  never retries, since a retried invoke would run the same shard twice.
+  Only throttled invocations (429 TooManyRequestsException), which never
+  started a worker, are resubmitted, and a burst of throttles halves the
+  width
+- LocalExecutor runs the handler in a local process pool instead, as an
+  offline stand-in for Lambda invoke in tests and benchmarks. It cannot
+  run inside Lambda, which has no /dev/shm for the pool's semaphores
+
+Both return (payload, response, error) tuples in the order of the payloads,
+where response is the handler's return value.
+
+Author: AWS Lambda Automation Project
+Date: January 2026
+"""
+
+import json
+import os
+import time
+
+import aws_clients
+from structured_log import flush, get_logger
+
+# Concurrent worker invocations (overridable through an environment variable)
+FANOUT_CONCURRENCY = int(os.environ.get('FANOUT_CONCURRENCY', '10'))
+FANOUT_THROTTLE_RETRIES = 5  # resubmissions of a throttled payload
+FANOUT_THROTTLE_DELAY = 1.0  # seconds, multiplied by the attempt number
+
+# Longer than the 900 second Lambda maximum, so a worker is never cut off
+# by the client (overridable through an environment variable)
+FANOUT_READ_TIMEOUT = float(os.environ.get('FANOUT_READ_TIMEOUT', '910'))
+
+# Invoke clients by region, separate from the shared retrying clients
+invoke_clients = {}
+
+logger = get_logger(__name__)
+
+
+def get_invoke_client(region=None):
+    """
+    Get the Lambda client for worker invocations, creating it on first use
+
+    Unlike the shared clients it has a read timeout above the worker's
+    timeout and a single attempt, so a slow worker is never invoked twice
+    and failures come back per payload.
+
+    Args:
+        region: AWS region name (defaults to the function's region)
+
+    Returns:
+        boto3 Lambda client
+    """
+    region = region or aws_clients.default_region()
+
+    client = invoke_clients.get(region)
+    if client is None:
+        with aws_clients.lock:
+            client = invoke_clients.get(region)
+            if client is None:
+                client = aws_clients.create_client(
+                    'lambda', region,
+                    read_timeout=FANOUT_READ_TIMEOUT,
+                    retries={'mode': 'standard', 'max_attempts': 1}
+                )
+                invoke_clients[region] = client
+
+    return client
+
+
+class LambdaExecutor:
+    """
+    Runs payloads as synchronous invocations of a Lambda function
+    """
+
+    def __init__(self, function_name, concurrency=FANOUT_CONCURRENCY):
+        self.function_name = function_name
+        self.concurrency = max(1, concurrency)
+
+    def invoke(self, payload):
+        """
+        Invoke the function once and decode its response
+
+        Args:
+            payload: JSON-serializable event for the worker
+
+        Returns:
+            dict: The worker handler's return value
+        """
+        response = get_invoke_client().invoke(
+            FunctionName=self.function_name,
+            InvocationType='RequestResponse',
+            Payload=json.dumps(payload, default=str).encode()
+        )
+
+        result = json.loads(response['Payload'].read() or b'null')
+        if response.get('FunctionError'):
+            raise Exception(f"Worker failed: {result.get('errorMessage', result)}")
+
+        return result
+
+    def map(self, payloads):
+        """
+        Invoke the function for every payload concurrently
+
+        At most self.concurrency invocations run at once. A throttled
+        invocation is resubmitted once its delay has passed, while other
+        results keep being collected and dispatched, and halves the width
+        for the rest of the run, at most once for the invocations that were
+        in flight together; any other error is that payload's result.
+
+        Args:
+            payloads: List of worker events
+
+        Returns:
+            list: (payload, response, error) tuples in the order of payloads
+        """
+        import heapq
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+        # Workers may run for minutes; write out what was logged before waiting
+        flush()
+
+        results = [None] * len(payloads)
+        attempts = [0] * len(payloads)
+        sequence = [0] * len(payloads)  # submission number of the last attempt
+        submitted = 0
+        shrink_after = 0
+        queue = deque(range(len(payloads)))
+        delayed = []  # heap of (not before, index) for throttled payloads
+        width = self.concurrency
+
+        with ThreadPoolExecutor(max_workers=width) as pool:
+            running = {}
+
+            while queue or running or delayed:
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    queue.append(heapq.heappop(delayed)[1])
+
+                while queue and len(running) < width:
+                    index = queue.popleft()
+                    attempts[index] += 1
+                    submitted += 1
+                    sequence[index] = submitted
+                    running[pool.submit(self.invoke, payloads[index])] = index
+
+                # Wake up for the next delayed payload even if nothing completes
+                timeout = max(0.0, delayed[0][0] - now) if delayed else None
+                if not running:
+                    time.sleep(timeout)
+                    continue
+
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        results[index] = (payloads[index], future.result(), None)
+                    except Exception as e:
+                        if not is_invoke_throttle(e) or attempts[index] > FANOUT_THROTTLE_RETRIES:
+                            results[index] = (payloads[index], None, e)
+                            continue
+
+                        if sequence[index] > shrink_after:
+                            width = max(1, width // 2)
+                            shrink_after = submitted
+                            logger.warning("Worker invocations throttled, reducing fan-out",
+                                           width=width)
+                        heapq.heappush(delayed, (time.monotonic() + FANOUT_THROTTLE_DELAY * attempts[index],
+                                                 index))
+
+        return results
+
+
+def is_invoke_throttle(error):
+    """
+    Check whether an invoke was rejected by Lambda throttling
+
+    Only 429 responses count: the worker never started, so resubmitting
+    the payload cannot run a shard twice.
+
+    Args:
+        error: Exception raised by the invoke call
+
+    Returns:
+        bool: True for TooManyRequestsException or HTTP 429
+    """
+    response = getattr(error, 'response', None)
+    if not isinstance(response, dict):
+        return False
+
+    code = response.get('Error', {}).get('Code')
+    status = response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    return code == 'TooManyRequestsException' or status == 429
+
+
+def run_handler(module_name, payload):
+    """
+    Run a handler module's lambda_handler in the current process
+
+    Module-level so that process pools can pickle it.
+
+    Args:
+        module_name: Handler module name (e.g. 'assignment2_s3_cleanup')
+        payload: Worker event
+
+    Returns:
+        dict: The handler's return value
+    """
+    import importlib
+
+    return importlib.import_module(module_name).lambda_handler(payload, None)
+
+
+class LocalExecutor:
+    """
+    Runs payloads through a handler in a local process pool
+    """
+
+    def __init__(self, module_name, max_workers=None):
+        self.module_name = module_name
+        self.max_workers = max_workers or os.cpu_count()
+
+    def map(self, payloads):
+        """
+        Run the handler for every payload in worker processes
+
+        Args:
+            payloads: List of worker events
+
+        Returns:
+            list: (payload, response, error) tuples in the order of payloads
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        results = []
+
+        # Forked workers would otherwise inherit and re-write buffered lines
+        flush()
+
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, max(1, len(payloads)))) as pool:
+            futures = [pool.submit(run_handler, self.module_name, payload) for payload in payloads]
+
+            for payload, future in zip(payloads, futures):
+                try:
+                    results.append((payload, future.result(), None))
+                except Exception as e:
+                    results.append((payload, None, e))
+
+        return results
+
+
+def get_executor(kind, module_name, function_name=None):
+    """
+    Create an executor for worker invocations
+
+    Args:
+        kind: 'lambda' to invoke a function or 'local' for a process pool
+        module_name: Handler module the local executor runs
+        function_name: Function the Lambda executor invokes
+
+    Returns:
+        LambdaExecutor or LocalExecutor
+
+    Raises:
+        ValueError: For unknown kinds, a missing function name, or the
+                    local executor inside Lambda
+    """
+    if kind == 'local':
+        if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+            raise ValueError("The local executor only runs outside Lambda; use the lambda executor")
+        return LocalExecutor(module_name)
+
+    if kind == 'lambda':
+        if not function_name:
+            raise ValueError("A worker function name is required for the lambda executor")
+        return LambdaExecutor(function_name)
+
+    raise ValueError(f"Unknown executor: {kind}")
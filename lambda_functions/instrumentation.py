@@ -0,0 +1,284 @@
+"""
+Per-operation AWS API call instrumentation for the Lambda functions
+
+Hooks botocore's before-call, after-call and needs-retry events on every
+client created by aws_clients and aggregates in memory, per operation:
+- Calls, errors, retries and throttles
+- A latency histogram in milliseconds (including time spent retrying)
+
+At the end of each invocation the aggregates are written to the log as a
+single CloudWatch Embedded Metric Format (EMF) line, and a summary is
+added to the handler's response body under 'api_calls'.
+
+Author: AWS Lambda Automation Project
+Date: January 2026
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+
+from structured_log import write_raw
+
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'LambdaAutomation')
+EMF_MAX_METRICS = 100  # metric definitions per EMF directive
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+THROTTLE_ERROR_CODES = {
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottled',
+    'RequestThrottledException',
+    'RequestLimitExceeded',
+    'TooManyRequestsException',
+    'SlowDown',
+    'EC2ThrottledException'
+}
+
+# Aggregates for the current invocation, by 'service.Operation'
+operation_stats = {}
+lock = threading.Lock()
+
+
+def instrument(client):
+    """
+    Register the instrumentation hooks on a client's event system
+
+    Args:
+        client: boto3 client
+    """
+    events = client.meta.events
+    events.register('before-call', before_call, unique_id='instrumentation-before-call')
+    events.register('after-call', after_call, unique_id='instrumentation-after-call')
+    events.register('needs-retry', needs_retry, unique_id='instrumentation-needs-retry')
+
+
+def get_stats(event_name):
+    """
+    Get the aggregates for the operation of a botocore event
+
+    Must be called with the lock held.
+
+    Args:
+        event_name: Event name such as 'after-call.ec2.DescribeInstances'
+
+    Returns:
+        dict: Aggregates for the operation
+    """
+    operation = event_name.split('.', 1)[1]
+
+    if operation not in operation_stats:
+        operation_stats[operation] = {
+            'calls': 0,
+            'errors': 0,
+            'retries': 0,
+            'throttles': 0,
+            'latency_ms_sum': 0.0,
+            'latency_ms_max': 0.0,
+            'latency_histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        }
+
+    return operation_stats[operation]
+
+
+def before_call(context, **kwargs):
+    """
+    Record when an API call starts
+    """
+    context['instrumentation_start'] = time.perf_counter()
+
+
+def after_call(event_name, http_response, parsed, context, **kwargs):
+    """
+    Record the outcome and latency of a completed API call
+    """
+    start = context.get('instrumentation_start')
+    latency_ms = (time.perf_counter() - start) * 1000 if start is not None else 0.0
+    retries = parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+    failed = 'Error' in parsed or http_response.status_code >= 300
+
+    bucket = len(LATENCY_BUCKETS_MS)
+    for i, upper_bound in enumerate(LATENCY_BUCKETS_MS):
+        if latency_ms <= upper_bound:
+            bucket = i
+            break
+
+    with lock:
+        stats = get_stats(event_name)
+        stats['calls'] += 1
+        stats['errors'] += failed
+        stats['retries'] += retries
+        stats['latency_ms_sum'] += latency_ms
+        stats['latency_ms_max'] = max(stats['latency_ms_max'], latency_ms)
+        stats['latency_histogram'][bucket] += 1
+
+
+def needs_retry(event_name, response=None, **kwargs):
+    """
+    Count throttled attempts; never changes the retry decision
+    """
+    if response is None:
+        return None
+
+    http_response, parsed = response
+    error_code = parsed.get('Error', {}).get('Code')
+
+    if error_code in THROTTLE_ERROR_CODES or http_response.status_code == 429:
+        with lock:
+            get_stats(event_name)['throttles'] += 1
+
+    return None
+
+
+def reset():
+    """
+    Discard the aggregates of the previous invocation
+    """
+    with lock:
+        operation_stats.clear()
+
+
+def get_summary():
+    """
+    Summarize the aggregates of the current invocation
+
+    Returns:
+        dict: Total calls and per-operation counts and latency
+    """
+    with lock:
+        operations = {}
+
+        for operation, stats in sorted(operation_stats.items()):
+            labels = [f"<={b}" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+            operations[operation] = {
+                'calls': stats['calls'],
+                'errors': stats['errors'],
+                'retries': stats['retries'],
+                'throttles': stats['throttles'],
+                'latency_ms': {
+                    'avg': round(stats['latency_ms_sum'] / stats['calls'], 2) if stats['calls'] else 0.0,
+                    'max': round(stats['latency_ms_max'], 2),
+                    'histogram': {
+                        label: count
+                        for label, count in zip(labels, stats['latency_histogram'])
+                        if count
+                    }
+                }
+            }
+
+    return {
+        'total_calls': sum(op['calls'] for op in operations.values()),
+        'operations': operations
+    }
+
+
+def build_emf_record(summary, function_name):
+    """
+    Build one EMF document holding the metrics of every operation
+
+    Each operation gets its own metric names (e.g. 'ec2.DescribeInstances.Calls')
+    so that a single log line can carry all of them; histograms are kept as
+    properties for Logs Insights queries.
+
+    Args:
+        summary: Summary from get_summary
+        function_name: Lambda function name used as the metric dimension
+
+    Returns:
+        dict: EMF document
+    """
+    record = {'FunctionName': function_name}
+    metrics = []
+
+    for operation, stats in summary['operations'].items():
+        values = [
+            ('Calls', stats['calls'], 'Count'),
+            ('Errors', stats['errors'], 'Count'),
+            ('Retries', stats['retries'], 'Count'),
+            ('Throttles', stats['throttles'], 'Count'),
+            ('LatencyAvg', stats['latency_ms']['avg'], 'Milliseconds'),
+            ('LatencyMax', stats['latency_ms']['max'], 'Milliseconds')
+        ]
+
+        for name, value, unit in values:
+            metric_name = f"{operation}.{name}"
+            record[metric_name] = value
+            metrics.append({'Name': metric_name, 'Unit': unit})
+
+        record[f"{operation}.LatencyHistogram"] = stats['latency_ms']['histogram']
+
+    record['_aws'] = {
+        'Timestamp': int(time.time() * 1000),
+        'CloudWatchMetrics': [
+            {
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [['FunctionName']],
+                'Metrics': metrics[i:i + EMF_MAX_METRICS]
+            }
+            for i in range(0, len(metrics), EMF_MAX_METRICS)
+        ]
+    }
+
+    return record
+
+
+def flush(function_name=None):
+    """
+    Write the invocation's API metrics as one EMF log line and reset them
+
+    Args:
+        function_name: Lambda function name (defaults to the environment)
+
+    Returns:
+        dict: Summary of the flushed aggregates
+    """
+    summary = get_summary()
+    reset()
+
+    if summary['total_calls']:
+        function_name = function_name or os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'unknown')
+        write_raw(json.dumps(build_emf_record(summary, function_name)))
+
+    return summary
+
+
+def instrumented_handler(handler):
+    """
+    Decorate a lambda_handler to flush API metrics after every invocation
+
+    The summary is added to the response body under 'api_calls' when the
+    body is a JSON object.
+
+    Args:
+        handler: Lambda handler function
+
+    Returns:
+        function: Wrapped handler
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        reset()
+
+        try:
+            result = handler(event, context)
+        finally:
+            summary = flush(getattr(context, 'function_name', None))
+
+        if isinstance(result, dict) and isinstance(result.get('body'), str):
+            try:
+                body = json.loads(result['body'])
+            except ValueError:
+                return result
+
+            if isinstance(body, dict):
+                body['api_calls'] = summary
+                result['body'] = json.dumps(body, default=str)
+
+        return result
+
+    return wrapper
@@ -0,0 +1,514 @@
+"""
+Warm-container EC2 inventory cache for the Lambda functions
+
+Instances, volumes and network interfaces are described once and kept in
+memory for the lifetime of the container, so invocations that arrive
+seconds apart do not re-describe the same resources:
+- One cache per (account, region, resource type), e.g.
+  ('123456789012', 'us-east-1', 'instance')
+- Compact records: ID, state, tags and attachments, plus the few fields
+  the handlers read (type, launch time, placement, key name, size)
+- Entries expire after INVENTORY_CACHE_TTL seconds and each cache holds
+  at most INVENTORY_CACHE_MAX_SIZE records, evicting the least recently used
+- A full state-filtered listing is remembered, so tag lookups over the
+  whole fleet are answered from memory while it is fresh
+
+Records are patched from the handlers' own mutating calls (start/stop,
+create_tags) and from EC2 state-change events; anything else is bounded
+by the TTL. Records are shared, so callers must treat them as read-only.
+
+Author: AWS Lambda Automation Project
+Date: January 2026
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from aws_clients import default_region, get_client
+
+# Cache configuration (overridable through environment variables)
+INVENTORY_CACHE_TTL = int(os.environ.get('INVENTORY_CACHE_TTL', '300'))
+INVENTORY_CACHE_MAX_SIZE = int(os.environ.get('INVENTORY_CACHE_MAX_SIZE', '20000'))
+DESCRIBE_BATCH_SIZE = 200  # IDs per describe call
+LIST_PAGE_SIZE = 1000  # instances per describe_instances page when listing
+
+# Caches by (account, region, resource type), reused across warm invocations
+caches = {}
+lock = threading.Lock()
+account_id = os.environ.get('AWS_ACCOUNT_ID')
+
+
+class ResourceCache:
+    """
+    TTL and LRU bounded records of one resource type in one account and region
+    """
+
+    def __init__(self, ttl=INVENTORY_CACHE_TTL, max_size=INVENTORY_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.records = OrderedDict()  # resource ID -> (expiry, record)
+        self.listing = None  # (expiry, states) of the last complete listing
+        self.lock = threading.Lock()
+
+    def get_many(self, resource_ids):
+        """
+        Look up fresh records
+
+        Args:
+            resource_ids: Iterable of resource IDs
+
+        Returns:
+            tuple: (dict of records by ID, list of IDs not cached)
+        """
+        now = time.monotonic()
+        found = {}
+        missing = []
+
+        with self.lock:
+            for resource_id in resource_ids:
+                entry = self.records.get(resource_id)
+                if entry is None or entry[0] <= now:
+                    missing.append(resource_id)
+                    continue
+
+                self.records.move_to_end(resource_id)
+                found[resource_id] = entry[1]
+
+        return found, missing
+
+    def put_many(self, records, id_key):
+        """
+        Store records, evicting the least recently used beyond max_size
+
+        Args:
+            records: List of records
+            id_key: Record field holding the resource ID
+        """
+        expiry = time.monotonic() + self.ttl
+
+        with self.lock:
+            for record in records:
+                self.records[record[id_key]] = (expiry, record)
+                self.records.move_to_end(record[id_key])
+
+            while len(self.records) > self.max_size:
+                self.records.popitem(last=False)
+                # An evicted record makes the remembered listing incomplete
+                self.listing = None
+
+    def patch(self, resource_id, **fields):
+        """
+        Update fields of a cached record in place
+
+        Returns:
+            bool: True if the record was cached
+        """
+        with self.lock:
+            entry = self.records.get(resource_id)
+            if entry is None:
+                return False
+
+            entry[1].update(fields)
+            return True
+
+    def remove(self, resource_id):
+        with self.lock:
+            self.records.pop(resource_id, None)
+
+    def set_listing(self, states):
+        """
+        Remember that every resource in the given states is cached
+        """
+        with self.lock:
+            self.listing = (time.monotonic() + self.ttl, frozenset(states))
+
+    def invalidate_listing(self):
+        with self.lock:
+            self.listing = None
+
+    def get_listing(self, states):
+        """
+        Get every cached record in the given states if a complete, fresh
+        listing covering them is remembered
+
+        Returns:
+            list: Records, or None when the cache cannot answer
+        """
+        now = time.monotonic()
+
+        with self.lock:
+            if self.listing is None or self.listing[0] <= now or not self.listing[1] >= set(states):
+                return None
+
+            return [
+                record for expiry, record in self.records.values()
+                if expiry > now and record['State'] in states
+            ]
+
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+            self.listing = None
+
+
+def set_account(context):
+    """
+    Take the function's account from the invoked function ARN
+
+    Handlers call this at the start of each invocation, so every cache
+    lookup in it uses the same account without an STS call.
+
+    Args:
+        context: Lambda context object, or None outside Lambda
+    """
+    global account_id
+
+    arn = getattr(context, 'invoked_function_arn', None)
+    if arn:
+        account_id = arn.split(':')[4]
+
+
+def default_account():
+    """
+    Get the account the function runs in
+
+    Set by set_account() or AWS_ACCOUNT_ID; otherwise looked up with STS
+    once per container.
+
+    Returns:
+        str: AWS account ID
+    """
+    global account_id
+
+    if account_id is None:
+        account_id = get_client('sts').get_caller_identity()['Account']
+
+    return account_id
+
+
+def get_cache(resource_type, region=None, account=None):
+    """
+    Get the cache for a resource type, creating it on first use
+
+    Args:
+        resource_type: 'instance', 'volume' or 'network_interface'
+        region: AWS region name (defaults to the function's region)
+        account: AWS account ID (defaults to the function's account)
+
+    Returns:
+        ResourceCache: Cache for the account, region and resource type
+    """
+    key = (account or default_account(), region or default_region(), resource_type)
+
+    cache = caches.get(key)
+    if cache is None:
+        with lock:
+            cache = caches.setdefault(key, ResourceCache())
+
+    return cache
+
+
+def instance_record(instance):
+    """
+    Build a compact record from a described instance
+
+    Args:
+        instance: Instance in describe_instances format
+
+    Returns:
+        dict: Instance record
+    """
+    return {
+        'InstanceId': instance['InstanceId'],
+        'InstanceType': instance['InstanceType'],
+        'State': instance['State']['Name'],
+        'LaunchTime': instance['LaunchTime'],
+        'AvailabilityZone': instance['Placement']['AvailabilityZone'],
+        'SubnetId': instance.get('SubnetId'),
+        'VpcId': instance.get('VpcId'),
+        'KeyName': instance.get('KeyName'),
+        'Tags': {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])},
+        'VolumeIds': [
+            mapping['Ebs']['VolumeId']
+            for mapping in instance.get('BlockDeviceMappings', [])
+            if 'Ebs' in mapping
+        ],
+        'NetworkInterfaceIds': [
+            interface['NetworkInterfaceId']
+            for interface in instance.get('NetworkInterfaces', [])
+        ]
+    }
+
+
+def volume_record(volume):
+    """
+    Build a compact record from a described volume
+
+    Args:
+        volume: Volume in describe_volumes format
+
+    Returns:
+        dict: Volume record
+    """
+    return {
+        'VolumeId': volume['VolumeId'],
+        'State': volume['State'],
+        'Size': volume['Size'],
+        'AvailabilityZone': volume['AvailabilityZone'],
+        'Tags': {tag['Key']: tag['Value'] for tag in volume.get('Tags', [])},
+        'InstanceIds': [attachment['InstanceId'] for attachment in volume.get('Attachments', [])]
+    }
+
+
+def network_interface_record(interface):
+    """
+    Build a compact record from a described network interface
+
+    Args:
+        interface: Network interface in describe_network_interfaces format
+
+    Returns:
+        dict: Network interface record
+    """
+    return {
+        'NetworkInterfaceId': interface['NetworkInterfaceId'],
+        'State': interface.get('Status'),
+        'Tags': {tag['Key']: tag['Value'] for tag in interface.get('TagSet', [])},
+        'InstanceId': (interface.get('Attachment') or {}).get('InstanceId')
+    }
+
+
+def store_instances(instances, region=None):
+    """
+    Cache described instances
+
+    Args:
+        instances: Instances in describe_instances format
+        region: AWS region name (defaults to the function's region)
+
+    Returns:
+        list: Instance records
+    """
+    records = [instance_record(instance) for instance in instances]
+    get_cache('instance', region).put_many(records, 'InstanceId')
+    return records
+
+
+def load_instances(instance_ids, region=None):
+    """
+    Describe instances by ID and cache them
+
+    Args:
+        instance_ids: List of at most DESCRIBE_BATCH_SIZE instance IDs
+        region: AWS region name (defaults to the function's region)
+
+    Returns:
+        dict: Instance records by ID (unknown IDs are absent)
+    """
+    ec2 = get_client('ec2', region)
+    instances = []
+
+    for page in ec2.get_paginator('describe_instances').paginate(InstanceIds=instance_ids):
+        for reservation in page['Reservations']:
+            instances.extend(reservation['Instances'])
+
+    return {record['InstanceId']: record for record in store_instances(instances, region)}
+
+
+def get_instances(instance_ids, region=None):
+    """
+    Get instance records, describing the uncached ones in batches
+
+    Args:
+        instance_ids: List of instance IDs
+        region: AWS region name (defaults to the function's region)
+
+    Returns:
+        dict: Instance records by ID (unknown IDs are absent)
+    """
+    if not instance_ids:
+        return {}
+
+    records, missing = get_cache('instance', region).get_many(instance_ids)
+
+    for i in range(0, len(missing), DESCRIBE_BATCH_SIZE):
+        records.update(load_instances(missing[i:i + DESCRIBE_BATCH_SIZE], region))
+
+    return records
+
+
+def list_instances(states, region=None):
+    """
+    Get every instance in the given states, from memory while a complete
+    listing is fresh
+
+    Args:
+        states: List of instance state names
+        region: AWS region name (defaults to the function's region)
+
+    Returns:
+        list: Instance records
+    """
+    cache = get_cache('instance', region)
+    records = cache.get_listing(states)
+    if records is not None:
+        return records
+
+    ec2 = get_client('ec2', region)
+    pages = ec2.get_paginator('describe_instances').paginate(
+        Filters=[{'Name': 'instance-state-name', 'Values': list(states)}],
+        PaginationConfig={'PageSize': LIST_PAGE_SIZE}
+    )
+
+    records = []
+    for page in pages:
+        for reservation in page['Reservations']:
+            records.extend(store_instances(reservation['Instances'], region))
+
+    if len(records) <= cache.max_size:
+        cache.set_listing(states)
+
+    return records
+
+
+def get_volumes(volume_ids, region=None):
+    """
+    Get volume records, describing the uncached ones in batches
+
+    Args:
+        volume_ids: List of volume IDs
+        region: AWS region name (defaults to the function's region)
+
+    Returns:
+        dict: Volume records by ID
+    """
+    if not volume_ids:
+        return {}
+
+    cache = get_cache('volume', region)
+    records, missing = cache.get_many(volume_ids)
+    ec2 = get_client('ec2', region)
+
+    for i in range(0, len(missing), DESCRIBE_BATCH_SIZE):
+        response = ec2.describe_volumes(VolumeIds=missing[i:i + DESCRIBE_BATCH_SIZE])
+        loaded = [volume_record(volume) for volume in response['Volumes']]
+        cache.put_many(loaded, 'VolumeId')
+        records.update((record['VolumeId'], record) for record in loaded)
+
+    return records
+
+
+def get_network_interfaces(interface_ids, region=None):
+    """
+    Get network interface records, describing the uncached ones in batches
+
+    Args:
+        interface_ids: List of network interface IDs
+        region: AWS region name (defaults to the function's region)
+
+    Returns:
+        dict: Network interface records by ID
+    """
+    if not interface_ids:
+        return {}
+
+    cache = get_cache('network_interface', region)
+    records, missing = cache.get_many(interface_ids)
+    ec2 = get_client('ec2', region)
+
+    for i in range(0, len(missing), DESCRIBE_BATCH_SIZE):
+        response = ec2.describe_network_interfaces(NetworkInterfaceIds=missing[i:i + DESCRIBE_BATCH_SIZE])
+        loaded = [network_interface_record(interface) for interface in response['NetworkInterfaces']]
+        cache.put_many(loaded, 'NetworkInterfaceId')
+        records.update((record['NetworkInterfaceId'], record) for record in loaded)
+
+    return records
+
+
+def patch_instance_states(state_changes, region=None):
+    """
+    Apply a start_instances/stop_instances response to cached instances
+
+    Args:
+        state_changes: StartingInstances or StoppingInstances list
+        region: AWS region name (defaults to the function's region)
+    """
+    if not state_changes:
+        return
+
+    cache = get_cache('instance', region)
+
+    for change in state_changes:
+        cache.patch(change['InstanceId'], State=change['CurrentState']['Name'])
+
+
+def patch_tags(resource_ids, tags, region=None, removed=()):
+    """
+    Apply a successful create_tags or delete_tags call to cached instances,
+    volumes and network interfaces
+
+    Args:
+        resource_ids: Resource IDs passed to the call
+        tags: Dictionary of the tags written
+        region: AWS region name (defaults to the function's region)
+        removed: Keys of the tags deleted
+    """
+    if not resource_ids:
+        return
+
+    for resource_type, prefix in (('instance', 'i-'), ('volume', 'vol-'), ('network_interface', 'eni-')):
+        cache = get_cache(resource_type, region)
+
+        for resource_id in resource_ids:
+            if resource_id.startswith(prefix):
+                records, _ = cache.get_many([resource_id])
+                if resource_id in records:
+                    patched = {**records[resource_id]['Tags'], **tags}
+                    for key in removed:
+                        patched.pop(key, None)
+                    cache.patch(resource_id, Tags=patched)
+
+
+def apply_state_change(event):
+    """
+    Patch the cache from an EC2 Instance State-change Notification event
+
+    Terminated instances are dropped; an instance the cache does not know
+    makes the remembered listing incomplete. Events from other accounts
+    (e.g. forwarded from another event bus) are ignored.
+
+    Args:
+        event: EventBridge event
+
+    Returns:
+        bool: True if the event was a state-change notification for this account
+    """
+    detail = event.get('detail') or {}
+    instance_id = detail.get('instance-id')
+    state = detail.get('state')
+
+    if event.get('detail-type') != 'EC2 Instance State-change Notification' or not instance_id or not state:
+        return False
+
+    if event.get('account') and event['account'] != default_account():
+        return False
+
+    cache = get_cache('instance', event.get('region'))
+
+    if state == 'terminated':
+        cache.remove(instance_id)
+    elif not cache.patch(instance_id, State=state):
+        cache.invalidate_listing()
+
+    return True
+
+
+def clear():
+    """
+    Drop every cached record
+    """
+    with lock:
+        for cache in caches.values():
+            cache.clear()
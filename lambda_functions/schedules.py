@@ -0,0 +1,222 @@
+"""
+Office-hours schedule expressions for EC2 instances
+
+A schedule expression names the periods in which an instance should run,
+in an optional IANA time zone (UTC by default):
+
+    Mon-Fri 08:00-19:00 Europe/Berlin
+    Mon-Fri 07:00-12:00; Mon-Fri 13:00-18:00 America/New_York
+    Mon,Wed,Fri 22:00-02:00
+    Daily 00:00-24:00
+
+Each period is a day list (names, ranges such as Fri-Mon, or Daily,
+Weekdays, Weekends; every day if omitted) and a time range. A range that
+ends before it starts runs past midnight into the next day.
+
+Expressions are compiled once into a bitmap of the minutes of the week
+and memoized for the lifetime of the container, so checking whether an
+instance should run is one time-zone conversion and one lookup.
+
+Author: AWS Lambda Automation Project
+Date: January 2026
+"""
+
+import os
+import re
+import threading
+
+SCHEDULE_CACHE_MAX_SIZE = int(os.environ.get('SCHEDULE_CACHE_MAX_SIZE', '500'))
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+DAY_NAMES = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+DAY_ALIASES = {
+    'daily': list(range(7)),
+    'weekdays': list(range(5)),
+    'weekends': [5, 6]
+}
+
+TIME_RANGE = re.compile(r'^(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})$')
+
+# Compiled schedules (or parse errors) by expression, reused across warm invocations
+compiled = {}
+lock = threading.Lock()
+
+
+class Schedule:
+    """
+    A compiled schedule expression
+    """
+
+    def __init__(self, expression, timezone, minutes):
+        self.expression = expression
+        self.timezone = timezone
+        self.minutes = minutes  # one byte per minute of the week, Monday 00:00 first
+
+    def is_active(self, now):
+        """
+        Check whether the schedule is in a running period
+
+        Args:
+            now: Timezone-aware datetime
+
+        Returns:
+            bool: True if the instance should be running at that time
+        """
+        local = now.astimezone(self.timezone)
+        return bool(self.minutes[local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute])
+
+    def desired_state(self, now):
+        """
+        Get the instance state the schedule asks for
+
+        Args:
+            now: Timezone-aware datetime
+
+        Returns:
+            str: 'running' or 'stopped'
+        """
+        return 'running' if self.is_active(now) else 'stopped'
+
+
+def parse_days(spec):
+    """
+    Parse a day list such as 'Mon-Fri', 'Mon,Wed,Fri', 'Fri-Mon' or 'Weekdays'
+
+    Returns:
+        list: Weekday numbers (Monday is 0)
+
+    Raises:
+        ValueError: For unknown days or ranges missing their end
+    """
+    days = []
+
+    for item in spec.lower().split(','):
+        if item in DAY_ALIASES:
+            days.extend(DAY_ALIASES[item])
+            continue
+
+        first, dash, last = item.partition('-')
+        if dash and not last:
+            raise ValueError(f"Incomplete day range '{item}'")
+        if first[:3] not in DAY_NAMES or (last and last[:3] not in DAY_NAMES):
+            raise ValueError(f"Unknown day '{item}'")
+
+        start = DAY_NAMES.index(first[:3])
+        end = DAY_NAMES.index(last[:3]) if last else start
+        days.extend((start + offset) % 7 for offset in range((end - start) % 7 + 1))
+
+    return days
+
+
+def parse_time_range(spec):
+    """
+    Parse a time range such as '08:00-19:00' or '22:00-02:00'
+
+    Returns:
+        tuple: (start minute of the day, duration in minutes)
+    """
+    match = TIME_RANGE.match(spec)
+    if not match:
+        raise ValueError(f"Invalid time range '{spec}'")
+
+    start_hour, start_minute, end_hour, end_minute = (int(group) for group in match.groups())
+    if start_hour > 23 or end_hour > 24 or start_minute > 59 or end_minute > 59 \
+            or (end_hour == 24 and end_minute):
+        raise ValueError(f"Invalid time range '{spec}'")
+
+    start = start_hour * 60 + start_minute
+    end = end_hour * 60 + end_minute
+    if start == end:
+        raise ValueError(f"Empty time range '{spec}'")
+
+    return start, (end - start) % MINUTES_PER_DAY or MINUTES_PER_DAY
+
+
+def parse_schedule(expression):
+    """
+    Compile a schedule expression
+
+    Args:
+        expression: Schedule expression (see the module docstring)
+
+    Returns:
+        Schedule: Compiled schedule
+
+    Raises:
+        ValueError: If the expression or its time zone is invalid
+    """
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+    tokens = expression.split()
+    if not tokens:
+        raise ValueError("Empty schedule")
+
+    timezone_name = 'UTC'
+    if not TIME_RANGE.match(tokens[-1]):
+        timezone_name = tokens.pop()
+
+    try:
+        timezone = ZoneInfo(timezone_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone '{timezone_name}'")
+
+    minutes = bytearray(MINUTES_PER_WEEK)
+
+    for period in ' '.join(tokens).split(';'):
+        parts = period.split()
+        if len(parts) == 1:
+            days, time_range = list(range(7)), parts[0]
+        elif len(parts) == 2:
+            days, time_range = parse_days(parts[0]), parts[1]
+        else:
+            raise ValueError(f"Invalid period '{period.strip()}'")
+
+        start, duration = parse_time_range(time_range)
+
+        for day in days:
+            first = day * MINUTES_PER_DAY + start
+            last = first + duration
+
+            # Periods running past Sunday midnight wrap to Monday
+            minutes[first:min(last, MINUTES_PER_WEEK)] = b'\x01' * (min(last, MINUTES_PER_WEEK) - first)
+            if last > MINUTES_PER_WEEK:
+                minutes[:last - MINUTES_PER_WEEK] = b'\x01' * (last - MINUTES_PER_WEEK)
+
+    return Schedule(expression, timezone, bytes(minutes))
+
+
+def get_schedule(expression):
+    """
+    Get a compiled schedule, parsing the expression on first use only
+
+    Invalid expressions are remembered too, so they are not re-parsed on
+    every invocation.
+
+    Args:
+        expression: Schedule expression
+
+    Returns:
+        Schedule: Compiled schedule
+
+    Raises:
+        ValueError: If the expression is invalid
+    """
+    result = compiled.get(expression)
+
+    if result is None:
+        try:
+            result = parse_schedule(expression)
+        except ValueError as e:
+            result = e
+
+        with lock:
+            while len(compiled) >= SCHEDULE_CACHE_MAX_SIZE:
+                del compiled[next(iter(compiled))]
+            compiled[expression] = result
+
+    if isinstance(result, ValueError):
+        raise ValueError(str(result))
+
+    return result
@@ -0,0 +1,215 @@
+"""
+Mergeable streaming sketches for distributions over large listings
+
+Both sketches use memory bounded by their configuration, not by the
+number of values added, and two sketches with the same configuration can
+be merged, so partial results from shards or worker invocations combine
+into the same answer as one pass over everything:
+- QuantileSketch: quantiles within a relative error (DDSketch-style
+  logarithmic bins), plus exact count, sum, min and max
+- Histogram: counts and weight sums (e.g. bytes) between fixed edges
+
+Both serialize to JSON-friendly dictionaries with to_dict()/from_dict().
+Quantile sketch bins are written as one dense run of counts from the
+lowest bin, which keeps a full sketch to a few kilobytes of JSON.
+
+Author: AWS Lambda Automation Project
+Date: January 2026
+"""
+
+import math
+from bisect import bisect_right
+
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_MAX_BINS = 2048
+SKETCH_MIN_VALUE = 1e-9  # values at or below this are counted as zero
+
+
+class QuantileSketch:
+    """
+    Quantile sketch with relative accuracy guarantees
+    """
+
+    def __init__(self, relative_accuracy=SKETCH_RELATIVE_ACCURACY, max_bins=SKETCH_MAX_BINS):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.bins = {}  # bin index -> count
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value, count=1):
+        """
+        Add a non-negative value
+
+        Args:
+            value: Value to add
+            count: Number of times to add it
+        """
+        if value <= SKETCH_MIN_VALUE:
+            self.zero_count += count
+        else:
+            index = math.ceil(math.log(value) / self.log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + count
+            if len(self.bins) > self.max_bins:
+                self.collapse()
+
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def collapse(self):
+        """
+        Fold the lowest bins together so at most max_bins remain
+
+        Only the accuracy of the smallest values is lost.
+        """
+        indexes = sorted(self.bins)
+        excess = indexes[:len(indexes) - self.max_bins + 1]
+        self.bins[excess[-1]] += sum(self.bins.pop(index) for index in excess[:-1])
+
+    def merge(self, other):
+        """
+        Add the values of another sketch with the same accuracy
+
+        Args:
+            other: QuantileSketch
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracies")
+
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        while len(self.bins) > self.max_bins:
+            self.collapse()
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q):
+        """
+        Estimate a quantile
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            float: Estimated value, or None for an empty sketch
+        """
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        seen = self.zero_count
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+
+        return self.max
+
+    def to_dict(self):
+        first = min(self.bins, default=0)
+        last = max(self.bins, default=-1)
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'max_bins': self.max_bins,
+            'bin_offset': first,
+            'bin_counts': [self.bins.get(index, 0) for index in range(first, last + 1)],
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['relative_accuracy'], data['max_bins'])
+        sketch.bins = {
+            data['bin_offset'] + position: count
+            for position, count in enumerate(data['bin_counts'])
+            if count
+        }
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        return sketch
+
+
+class Histogram:
+    """
+    Counts and weight sums of values between fixed, increasing edges
+
+    Bucket 0 holds values below edges[0], bucket i values in
+    [edges[i - 1], edges[i]) and the last bucket values from edges[-1] up.
+    """
+
+    def __init__(self, edges):
+        self.edges = list(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.weights = [0] * (len(self.edges) + 1)
+
+    def add(self, value, weight=0):
+        """
+        Add a value
+
+        Args:
+            value: Value that selects the bucket
+            weight: Amount added to the bucket's weight sum (e.g. bytes)
+        """
+        bucket = bisect_right(self.edges, value)
+        self.counts[bucket] += 1
+        self.weights[bucket] += weight
+
+    def merge(self, other):
+        """
+        Add the buckets of another histogram with the same edges
+
+        Args:
+            other: Histogram
+        """
+        if other.edges != self.edges:
+            raise ValueError("Cannot merge histograms with different edges")
+
+        for bucket in range(len(self.counts)):
+            self.counts[bucket] += other.counts[bucket]
+            self.weights[bucket] += other.weights[bucket]
+
+    def at_or_above(self, edge):
+        """
+        Total count and weight of the values at or above one of the edges
+
+        Args:
+            edge: A value from edges
+
+        Returns:
+            tuple: (count, weight)
+        """
+        bucket = self.edges.index(edge) + 1
+        return sum(self.counts[bucket:]), sum(self.weights[bucket:])
+
+    def to_dict(self):
+        return {'edges': self.edges, 'counts': self.counts, 'weights': self.weights}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data['edges'])
+        histogram.counts = list(data['counts'])
+        histogram.weights = list(data['weights'])
+        return histogram
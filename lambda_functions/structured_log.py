@@ -0,0 +1,309 @@
+"""
+Structured, buffered, level-gated logging for the Lambda functions
+
+Replaces per-item print calls in the handlers' hot loops:
+- One JSON object per line (timestamp, level, logger, message, fields)
+- Level gating: disabled levels return before any formatting, and the
+  debug_enabled/info_enabled flags let hot loops skip building arguments
+- Per-item sampling: sampled(key) is true for every LOG_SAMPLE_EVERY-th item
+- Buffered output: lines are written to stdout in batches and flushed at
+  the end of each invocation, immediately for errors, and once the oldest
+  buffered line is LOG_FLUSH_SECONDS old, so a timed-out invocation only
+  loses its last few seconds of lines
+- Progress reporters that log a summary every N items or T seconds and
+  flush the buffer with it
+
+Configuration comes from the environment: LOG_LEVEL (default INFO; an
+unknown level falls back to INFO with a warning), LOG_SAMPLE_EVERY
+(default 1, i.e. no sampling), LOG_BUFFER_BYTES and LOG_FLUSH_SECONDS.
+
+Author: AWS Lambda Automation Project
+Date: January 2026
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVELS = {'DEBUG': DEBUG, 'INFO': INFO, 'WARNING': WARNING, 'ERROR': ERROR}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+LEVEL_ALIASES = {'WARN': WARNING, 'CRITICAL': ERROR, 'FATAL': ERROR}
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_SAMPLE_EVERY = max(1, int(os.environ.get('LOG_SAMPLE_EVERY', '1')))
+LOG_BUFFER_BYTES = int(os.environ.get('LOG_BUFFER_BYTES', '65536'))
+LOG_FLUSH_SECONDS = float(os.environ.get('LOG_FLUSH_SECONDS', '5'))
+
+PROGRESS_EVERY_ITEMS = 10000
+PROGRESS_EVERY_SECONDS = 10
+
+
+class BufferedWriter:
+    """
+    Collects log lines and writes them to stdout in batches
+    """
+
+    def __init__(self, buffer_bytes=LOG_BUFFER_BYTES, flush_seconds=LOG_FLUSH_SECONDS):
+        self.buffer_bytes = buffer_bytes
+        self.flush_seconds = flush_seconds
+        self.lines = []
+        self.size = 0
+        self.first_time = None  # time.monotonic() of the oldest buffered line
+        self.lock = threading.Lock()
+
+    def write(self, line):
+        now = time.monotonic()
+
+        with self.lock:
+            if not self.lines:
+                self.first_time = now
+            self.lines.append(line)
+            self.size += len(line) + 1
+            if self.size < self.buffer_bytes and now - self.first_time < self.flush_seconds:
+                return
+            self.flush_locked()
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def flush_locked(self):
+        if not self.lines:
+            return
+
+        # Look up stdout on every flush so redirections are honored
+        sys.stdout.write('\n'.join(self.lines) + '\n')
+        sys.stdout.flush()
+        self.lines = []
+        self.size = 0
+
+
+writer = BufferedWriter()
+atexit.register(writer.flush)
+
+# Fields added to every record of the current invocation (e.g. request ID)
+invocation_fields = {}
+
+# Unknown LOG_LEVEL values already warned about, so each is reported once
+unknown_levels = set()
+
+
+class Logger:
+    """
+    JSON logger writing through the shared buffered writer
+    """
+
+    def __init__(self, name, level=LOG_LEVEL, sample_every=LOG_SAMPLE_EVERY):
+        self.name = name
+        self.sample_every = sample_every
+        self.sample_counts = {}
+        self.set_level(level)
+
+    def set_level(self, level):
+        """
+        Change the minimum level that is written
+
+        An unknown level name falls back to INFO and logs a warning, rather
+        than failing every handler at import.
+
+        Args:
+            level: Level name ('DEBUG', 'INFO', ...) or number
+        """
+        unknown = None
+        if isinstance(level, str):
+            name = level.upper()
+            if name not in LEVELS and name not in LEVEL_ALIASES:
+                unknown, name = level, 'INFO'
+            level = LEVELS.get(name, LEVEL_ALIASES.get(name))
+
+        self.level = level
+        self.debug_enabled = self.level <= DEBUG
+        self.info_enabled = self.level <= INFO
+
+        if unknown is not None and unknown not in unknown_levels:
+            unknown_levels.add(unknown)
+            self.warning("Unknown log level, using INFO", log_level=unknown,
+                         levels=sorted(set(LEVELS) | set(LEVEL_ALIASES)))
+
+    def log(self, level, message, **fields):
+        """
+        Write a record if the level is enabled
+
+        Args:
+            level: Numeric level
+            message: Log message
+            **fields: Additional structured fields
+        """
+        if level < self.level:
+            return
+
+        record = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'level': LEVEL_NAMES[level],
+            'logger': self.name,
+            'message': message
+        }
+        record.update(invocation_fields)
+        record.update(fields)
+        writer.write(json.dumps(record, default=str))
+
+        if level >= ERROR:
+            writer.flush()
+
+    def debug(self, message, **fields):
+        if self.debug_enabled:
+            self.log(DEBUG, message, **fields)
+
+    def info(self, message, **fields):
+        if self.info_enabled:
+            self.log(INFO, message, **fields)
+
+    def warning(self, message, **fields):
+        self.log(WARNING, message, **fields)
+
+    def error(self, message, **fields):
+        self.log(ERROR, message, **fields)
+
+    def sampled(self, key):
+        """
+        Decide whether the current item of a stream should be logged
+
+        Args:
+            key: Name of the item stream (e.g. 's3.object')
+
+        Returns:
+            bool: True for the first item and every sample_every-th after it
+        """
+        if self.sample_every == 1:
+            return True
+
+        count = self.sample_counts.get(key, 0)
+        self.sample_counts[key] = count + 1
+        return count % self.sample_every == 0
+
+    def progress(self, message, every_items=PROGRESS_EVERY_ITEMS,
+                 every_seconds=PROGRESS_EVERY_SECONDS):
+        """
+        Create a progress reporter that logs at info level
+
+        Args:
+            message: Message of the progress records
+            every_items: Log after this many items
+            every_seconds: Log after this many seconds
+
+        Returns:
+            Progress: Progress reporter
+        """
+        return Progress(self, message, every_items, every_seconds)
+
+
+class Progress:
+    """
+    Logs a running count every N items or T seconds, whichever comes first
+    """
+
+    def __init__(self, logger, message, every_items, every_seconds):
+        self.logger = logger
+        self.message = message
+        self.every_items = every_items
+        self.every_seconds = every_seconds
+        self.count = 0
+        self.start = time.monotonic()
+        self.next_count = every_items
+        self.next_time = self.start + every_seconds
+
+    def update(self, count=1, **fields):
+        """
+        Add processed items and log if an interval has passed
+
+        Args:
+            count: Number of items processed since the last update
+            **fields: Running totals to include in the progress record
+        """
+        self.count += count
+        if self.count >= self.next_count or time.monotonic() >= self.next_time:
+            self.report(**fields)
+
+    def report(self, **fields):
+        """
+        Log the current progress and start a new interval
+
+        The buffer is flushed too, so a long run that later times out has
+        written everything up to its last progress record.
+        """
+        now = time.monotonic()
+        self.logger.info(
+            self.message,
+            processed=self.count,
+            elapsed_seconds=round(now - self.start, 3),
+            **fields
+        )
+        writer.flush()
+        self.next_count = self.count + self.every_items
+        self.next_time = now + self.every_seconds
+
+
+def get_logger(name):
+    """
+    Create a logger for a module
+
+    Args:
+        name: Logger name, usually the module name
+
+    Returns:
+        Logger: Logger using the environment configuration
+    """
+    return Logger(name)
+
+
+def write_raw(line):
+    """
+    Write a preformatted line (e.g. an EMF record) through the buffer
+
+    Args:
+        line: Line to write, without a trailing newline
+    """
+    writer.write(line)
+
+
+def flush():
+    """
+    Write out all buffered log lines
+    """
+    writer.flush()
+
+
+def logged_handler(handler):
+    """
+    Decorate a lambda_handler to tag records with the request ID and flush
+    the log buffer before the invocation returns
+
+    Args:
+        handler: Lambda handler function
+
+    Returns:
+        function: Wrapped handler
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        invocation_fields.clear()
+        request_id = getattr(context, 'aws_request_id', None)
+        if request_id:
+            invocation_fields['request_id'] = request_id
+
+        try:
+            return handler(event, context)
+        finally:
+            writer.flush()
+
+    return wrapper
@@ -0,0 +1,355 @@
+"""
+Externalized tag rule sets for the EC2 auto-tagger
+
+A rule set is a JSON list of rules (or {"rules": [...]}). Each rule
+matches instance attributes and gives the tags to apply:
+
+    [
+        {
+            "match": {
+                "instance_type": ["t3.*", "t4g.*"],
+                "subnet_id": "subnet-0a1b2c3d",
+                "principal": "arn:aws:sts::*:assumed-role/TeamA-*"
+            },
+            "tags": {"Team": "A", "Owner": "{principal_name}"},
+            "final": true
+        },
+        {"tags": {"ManagedBy": "Lambda", "Environment": "Development"}}
+    ]
+
+- Match fields: instance_type, subnet_id, vpc_id, key_name,
+  availability_zone and principal (the IAM ARN that launched the
+  instance, known from CloudTrail RunInstances events). Values are
+  fnmatch patterns or lists of them; a rule without "match" always
+  applies, and a pattern never matches a missing attribute
+- Every matching rule applies in order, later rules overriding earlier
+  tag values; "final": true stops at that rule
+- Tag values are templates over the match fields plus instance_id,
+  principal_name (last segment of the principal ARN) and launch_date;
+  unknown values render as 'Unknown'. Rendered values longer than the
+  EC2 limit of MAX_TAG_VALUE_LENGTH characters are truncated, with one
+  warning per tag key; keys longer than MAX_TAG_KEY_LENGTH are rejected
+  when the rules are compiled
+- Events that arrive before the principal is known evaluate the rules
+  without it. The auto-tagger records the principal on the instance
+  once CloudTrail reports it, then replaces or deletes rule tags that
+  still hold the values written without it
+
+The rule set is read from the first configured source: the TAG_RULES
+environment variable (inline JSON), the TAG_RULES_FILE file (relative to
+this directory) or the TAG_RULES_PARAMETER SSM parameter. It is compiled
+once into matchers and templates and cached for TAG_RULES_CACHE_TTL
+seconds, so warm invocations evaluate rules without touching the source.
+When no source is configured the caller's default tags apply to every
+instance.
+
+Author: AWS Lambda Automation Project
+Date: January 2026
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import timezone
+
+from aws_clients import get_client
+from structured_log import get_logger
+
+TAG_RULES_CACHE_TTL = int(os.environ.get('TAG_RULES_CACHE_TTL', '300'))
+
+MATCH_FIELDS = ['instance_type', 'subnet_id', 'vpc_id', 'key_name', 'availability_zone', 'principal']
+TEMPLATE_FIELDS = MATCH_FIELDS + ['instance_id', 'principal_name', 'launch_date']
+UNKNOWN_VALUE = 'Unknown'
+MAX_TAG_KEY_LENGTH = 128
+MAX_TAG_VALUE_LENGTH = 256
+
+# Compiled rule sets: 'rule_set' -> (expiry, source, RuleSet) for the
+# configured source and 'default' -> (default tags, RuleSet)
+cache = {}
+lock = threading.Lock()
+
+logger = get_logger(__name__)
+
+
+class Rule:
+    """
+    A compiled rule: attribute matchers and tag value templates
+    """
+
+    def __init__(self, matchers, templates, final):
+        self.matchers = matchers  # [(field, predicate)]
+        self.templates = templates  # [(tag key, [(literal, field or None)])]
+        self.final = final
+
+    def matches(self, attributes):
+        for field, predicate in self.matchers:
+            value = attributes.get(field)
+            if value is None or not predicate(value):
+                return False
+        return True
+
+
+class RuleSet:
+    """
+    Compiled tag rules from one source
+    """
+
+    def __init__(self, rules, source):
+        self.rules = rules
+        self.source = source
+        self.truncated = set()  # tag keys already warned about
+
+    def evaluate(self, attributes):
+        """
+        Build the tags of every matching rule
+
+        Args:
+            attributes: Instance attributes (see instance_attributes)
+
+        Returns:
+            dict: Tags by key
+        """
+        tags = {}
+
+        for rule in self.rules:
+            if not rule.matches(attributes):
+                continue
+
+            for key, segments in rule.templates:
+                value = ''.join(
+                    literal if field is None else (attributes.get(field) or UNKNOWN_VALUE)
+                    for literal, field in segments
+                )
+                if len(value) > MAX_TAG_VALUE_LENGTH:
+                    if key not in self.truncated:
+                        self.truncated.add(key)
+                        logger.warning("Tag value too long, truncating", source=self.source, key=key,
+                                       length=len(value), limit=MAX_TAG_VALUE_LENGTH,
+                                       instance_id=attributes.get('instance_id'))
+                    value = value[:MAX_TAG_VALUE_LENGTH]
+                tags[key] = value
+
+            if rule.final:
+                break
+
+        return tags
+
+
+def compile_pattern(patterns):
+    """
+    Compile fnmatch patterns into one predicate
+
+    Exact values are checked with a set lookup; patterns with wildcards are
+    combined into a single regular expression.
+
+    Args:
+        patterns: Pattern string or list of pattern strings
+
+    Returns:
+        function: Predicate taking an attribute value
+    """
+    import re
+    from fnmatch import translate
+
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    exact = frozenset(p for p in patterns if not any(c in p for c in '*?['))
+    wildcards = [p for p in patterns if p not in exact]
+
+    if not wildcards:
+        return exact.__contains__
+
+    regex = re.compile('|'.join(translate(p) for p in wildcards))
+    return lambda value: value in exact or regex.match(value) is not None
+
+
+def compile_template(template):
+    """
+    Split a tag value template into literal and field segments
+
+    Args:
+        template: Value such as 'team-a-{principal_name}'
+
+    Returns:
+        list: (literal, field or None) segments
+
+    Raises:
+        ValueError: For unknown fields or format specifications
+    """
+    from string import Formatter
+
+    segments = []
+
+    for literal, field, format_spec, conversion in Formatter().parse(template):
+        if literal:
+            segments.append((literal, None))
+        if field is None:
+            continue
+        if field not in TEMPLATE_FIELDS or format_spec or conversion:
+            raise ValueError(f"Unknown template field '{{{field}}}' in '{template}'")
+        segments.append(('', field))
+
+    return segments
+
+
+def compile_rules(document, source):
+    """
+    Compile a rule set document
+
+    Args:
+        document: Parsed JSON (list of rules or {"rules": [...]})
+        source: Description of where the document came from
+
+    Returns:
+        RuleSet: Compiled rules
+
+    Raises:
+        ValueError: If the document is not a valid rule set
+    """
+    rules = document.get('rules') if isinstance(document, dict) else document
+    if not isinstance(rules, list):
+        raise ValueError(f"Tag rules from {source} must be a list of rules")
+
+    compiled = []
+    for number, rule in enumerate(rules, 1):
+        match = rule.get('match', {})
+        unknown = set(match) - set(MATCH_FIELDS)
+        if unknown:
+            raise ValueError(f"Rule {number} from {source} matches unknown fields: {sorted(unknown)}")
+        if not isinstance(rule.get('tags'), dict):
+            raise ValueError(f"Rule {number} from {source} has no tags")
+        long_keys = [key for key in rule['tags'] if len(key) > MAX_TAG_KEY_LENGTH]
+        if long_keys:
+            raise ValueError(f"Rule {number} from {source} has tag keys longer than "
+                             f"{MAX_TAG_KEY_LENGTH} characters: {long_keys}")
+
+        compiled.append(Rule(
+            [(field, compile_pattern(patterns)) for field, patterns in match.items()],
+            [(key, compile_template(str(value))) for key, value in rule['tags'].items()],
+            bool(rule.get('final', False))
+        ))
+
+    return RuleSet(compiled, source)
+
+
+def default_rule_set(default_tags):
+    """
+    Build a rule set applying fixed tags to every instance
+    """
+    return RuleSet([Rule([], [(key, [(value, None)]) for key, value in default_tags.items()], False)],
+                   'default')
+
+
+def configured_source():
+    """
+    Get the configured rule source
+
+    Returns:
+        tuple: (kind, location) with kind 'env', 'file' or 'ssm', or None
+    """
+    if os.environ.get('TAG_RULES'):
+        return ('env', 'TAG_RULES')
+    if os.environ.get('TAG_RULES_FILE'):
+        return ('file', os.environ['TAG_RULES_FILE'])
+    if os.environ.get('TAG_RULES_PARAMETER'):
+        return ('ssm', os.environ['TAG_RULES_PARAMETER'])
+    return None
+
+
+def load_document(source):
+    """
+    Read and parse a rule set document from its source
+
+    Args:
+        source: (kind, location) from configured_source
+
+    Returns:
+        Parsed JSON document
+    """
+    kind, location = source
+
+    if kind == 'env':
+        return json.loads(os.environ[location])
+
+    if kind == 'file':
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), location)
+        with open(path) as rules_file:
+            return json.load(rules_file)
+
+    response = get_client('ssm').get_parameter(Name=location, WithDecryption=True)
+    return json.loads(response['Parameter']['Value'])
+
+
+def get_rule_set(default_tags):
+    """
+    Get the compiled rule set, loading it on first use and after the TTL
+
+    If a reload fails, the previous rule set is kept for another TTL.
+
+    Args:
+        default_tags: Tags for every instance when no source is configured
+
+    Returns:
+        RuleSet: Compiled rules
+
+    Raises:
+        ValueError: If the first load of the rule set fails
+    """
+    source = configured_source()
+    if source is None:
+        entry = cache.get('default')
+        if entry is None or entry[0] != default_tags:
+            entry = cache['default'] = (dict(default_tags), default_rule_set(default_tags))
+        return entry[1]
+
+    entry = cache.get('rule_set')
+    now = time.monotonic()
+    if entry is not None and entry[0] > now and entry[1] == source:
+        return entry[2]
+
+    with lock:
+        entry = cache.get('rule_set')
+        if entry is not None and entry[0] > now and entry[1] == source:
+            return entry[2]
+
+        try:
+            rule_set = compile_rules(load_document(source), f"{source[0]}:{source[1]}")
+        except Exception as e:
+            if entry is None or entry[1] != source:
+                raise ValueError(f"Cannot load tag rules from {source[0]}:{source[1]}: {e}")
+            logger.warning("Cannot reload tag rules, keeping the previous ones",
+                           source=entry[2].source, error=str(e))
+            rule_set = entry[2]
+        else:
+            logger.info("Loaded tag rules", source=rule_set.source, rules=len(rule_set.rules))
+
+        cache['rule_set'] = (now + TAG_RULES_CACHE_TTL, source, rule_set)
+        return rule_set
+
+
+def instance_attributes(instance, principal=None):
+    """
+    Build the attributes rules match on from an inventory instance record
+
+    Args:
+        instance: Instance record (see inventory.instance_record)
+        principal: ARN of the IAM principal that launched the instance
+
+    Returns:
+        dict: Attributes by field name
+    """
+    launch_time = instance.get('LaunchTime')
+
+    return {
+        'instance_id': instance['InstanceId'],
+        'instance_type': instance.get('InstanceType'),
+        'subnet_id': instance.get('SubnetId'),
+        'vpc_id': instance.get('VpcId'),
+        'key_name': instance.get('KeyName'),
+        'availability_zone': instance.get('AvailabilityZone'),
+        'principal': principal,
+        'principal_name': principal.rsplit('/', 1)[-1].rsplit(':', 1)[-1] if principal else None,
+        'launch_date': launch_time.astimezone(timezone.utc).strftime('%Y-%m-%d') if launch_time else None
+    }
@@ -0,0 +1,166 @@
+"""
+Shared pytest setup: make the Lambda modules importable as top-level
+modules, the way they are deployed, and provide a stub EC2 client
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda_functions'))
+
+REGION = 'us-east-1'
+ACCOUNT_ID = '123456789012'
+
+
+class StubClientError(Exception):
+    """
+    Exception shaped like botocore's ClientError
+    """
+
+    def __init__(self, code, message='', status=400):
+        super().__init__(f"An error occurred ({code}): {message}")
+        self.response = {'Error': {'Code': code, 'Message': message},
+                         'ResponseMetadata': {'HTTPStatusCode': status}}
+
+
+class StubPaginator:
+    def __init__(self, method):
+        self.method = method
+
+    def paginate(self, PaginationConfig=None, **params):
+        yield self.method(**params)
+
+
+class StubEC2:
+    """
+    EC2 client over in-memory instances, volumes and network interfaces
+
+    Calls are recorded in `calls` as (operation, params). Tests make calls
+    fail by adding entries to `failures`: operation -> predicate on the
+    call's params returning an exception to raise, or None.
+    """
+
+    def __init__(self, region=REGION):
+        self.meta = SimpleNamespace(region_name=region)
+        self.instances = {}
+        self.volumes = {}
+        self.network_interfaces = {}
+        self.calls = []
+        self.failures = {}
+
+    def add_instance(self, instance_id, tags=None, volumes=(), interfaces=(), state='running',
+                     instance_type='t3.micro'):
+        self.instances[instance_id] = {
+            'InstanceId': instance_id,
+            'InstanceType': instance_type,
+            'State': {'Name': state},
+            'LaunchTime': datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc),
+            'Placement': {'AvailabilityZone': self.meta.region_name + 'a'},
+            'SubnetId': 'subnet-0a1b2c3d',
+            'VpcId': 'vpc-0a1b2c3d',
+            'Tags': [{'Key': key, 'Value': value} for key, value in (tags or {}).items()],
+            'BlockDeviceMappings': [{'DeviceName': '/dev/xvda', 'Ebs': {'VolumeId': volume_id}}
+                                    for volume_id in volumes],
+            'NetworkInterfaces': [{'NetworkInterfaceId': interface_id} for interface_id in interfaces]
+        }
+        for volume_id in volumes:
+            self.volumes[volume_id] = {
+                'VolumeId': volume_id, 'State': 'in-use', 'Size': 8,
+                'AvailabilityZone': self.meta.region_name + 'a', 'Tags': [],
+                'Attachments': [{'InstanceId': instance_id}]
+            }
+        for interface_id in interfaces:
+            self.network_interfaces[interface_id] = {
+                'NetworkInterfaceId': interface_id, 'Status': 'in-use', 'TagSet': [],
+                'Attachment': {'InstanceId': instance_id}
+            }
+
+    def tags_of(self, resource_id):
+        resource = (self.instances.get(resource_id) or self.volumes.get(resource_id)
+                    or self.network_interfaces[resource_id])
+        return {tag['Key']: tag['Value'] for tag in resource.get('Tags', resource.get('TagSet', []))}
+
+    def operations(self):
+        return [operation for operation, _ in self.calls]
+
+    def record(self, operation, params):
+        self.calls.append((operation, params))
+        failure = self.failures.get(operation)
+        error = failure(params) if failure else None
+        if error is not None:
+            raise error
+
+    def get_paginator(self, operation):
+        return StubPaginator(getattr(self, operation))
+
+    def describe_instances(self, InstanceIds=None, Filters=None):
+        self.record('describe_instances', {'InstanceIds': InstanceIds, 'Filters': Filters})
+
+        if InstanceIds is not None:
+            unknown = [instance_id for instance_id in InstanceIds if instance_id not in self.instances]
+            if unknown:
+                raise StubClientError('InvalidInstanceID.NotFound',
+                                      f"The instance IDs '{', '.join(unknown)}' do not exist")
+            instances = [self.instances[instance_id] for instance_id in InstanceIds]
+        else:
+            states = {value for f in Filters or [] if f['Name'] == 'instance-state-name'
+                      for value in f['Values']}
+            instances = [instance for instance in self.instances.values()
+                         if not states or instance['State']['Name'] in states]
+
+        return {'Reservations': [{'Instances': [instance]} for instance in instances]}
+
+    def describe_volumes(self, VolumeIds):
+        self.record('describe_volumes', {'VolumeIds': VolumeIds})
+        return {'Volumes': [self.volumes[volume_id] for volume_id in VolumeIds if volume_id in self.volumes]}
+
+    def describe_network_interfaces(self, NetworkInterfaceIds):
+        self.record('describe_network_interfaces', {'NetworkInterfaceIds': NetworkInterfaceIds})
+        return {'NetworkInterfaces': [self.network_interfaces[interface_id]
+                                      for interface_id in NetworkInterfaceIds
+                                      if interface_id in self.network_interfaces]}
+
+    def create_tags(self, Resources, Tags):
+        self.record('create_tags', {'Resources': Resources, 'Tags': Tags})
+        for resource_id in Resources:
+            tags = dict(self.tags_of(resource_id), **{tag['Key']: tag['Value'] for tag in Tags})
+            self.set_tags(resource_id, tags)
+        return {}
+
+    def delete_tags(self, Resources, Tags):
+        self.record('delete_tags', {'Resources': Resources, 'Tags': Tags})
+        for resource_id in Resources:
+            tags = self.tags_of(resource_id)
+            for tag in Tags:
+                if tags.get(tag['Key']) == tag.get('Value', tags.get(tag['Key'])):
+                    tags.pop(tag['Key'], None)
+            self.set_tags(resource_id, tags)
+        return {}
+
+    def set_tags(self, resource_id, tags):
+        tag_list = [{'Key': key, 'Value': value} for key, value in tags.items()]
+        if resource_id in self.network_interfaces:
+            self.network_interfaces[resource_id]['TagSet'] = tag_list
+        else:
+            (self.instances.get(resource_id) or self.volumes[resource_id])['Tags'] = tag_list
+
+
+@pytest.fixture
+def ec2(monkeypatch):
+    """
+    Stub EC2 client registered in aws_clients' client cache, with empty
+    inventory caches in a fixed account and region
+    """
+    import aws_clients
+    import inventory
+
+    client = StubEC2()
+    monkeypatch.setenv('AWS_REGION', REGION)
+    monkeypatch.setattr(aws_clients, 'clients', {('ec2', REGION, None): client})
+    monkeypatch.setattr(inventory, 'caches', {})
+    monkeypatch.setattr(inventory, 'account_id', ACCOUNT_ID)
+    return client
@@ -0,0 +1,315 @@
+"""
+Tests for the EC2 auto-tagger in assignment5_auto_tag_ec2.py
+"""
+
+import json
+
+import pytest
+
+import assignment5_auto_tag_ec2 as auto_tag
+import inventory
+import tag_rules
+from conftest import StubClientError
+
+
+@pytest.fixture(autouse=True)
+def default_rules(monkeypatch):
+    monkeypatch.setattr(tag_rules, 'cache', {})
+    monkeypatch.setattr(auto_tag, 'recently_tagged', {})
+    for name in ('TAG_RULES', 'TAG_RULES_FILE', 'TAG_RULES_PARAMETER'):
+        monkeypatch.delenv(name, raising=False)
+
+
+def invoke(event):
+    result = auto_tag.lambda_handler(event, None)
+    return result, json.loads(result['body'])
+
+
+def sqs_message(message_id, instance_id):
+    body = {
+        'detail-type': 'EC2 Instance State-change Notification',
+        'detail': {'instance-id': instance_id, 'state': 'running'}
+    }
+    return {'messageId': message_id, 'body': json.dumps(body)}
+
+
+def fail_when_tagging(*resource_ids):
+    error = StubClientError('UnauthorizedOperation', 'not allowed')
+    return lambda params: error if set(resource_ids) & set(params['Resources']) else None
+
+
+def test_sqs_batch_reports_failed_messages_by_id(ec2):
+    ec2.add_instance('i-0001')
+    ec2.add_instance('i-0002', instance_type='m5.large')
+    ec2.failures['create_tags'] = fail_when_tagging('i-0002')
+
+    result, body = invoke({'Records': [
+        sqs_message('msg-1', 'i-0001'),
+        sqs_message('msg-2', 'i-0002'),
+        sqs_message('msg-3', 'i-0002'),
+        {'messageId': 'msg-4', 'body': 'not json'}
+    ]})
+
+    # Both deliveries of the failed instance are retried; the unparseable
+    # message cannot succeed on retry and is dropped
+    assert result['statusCode'] == 200
+    assert result['batchItemFailures'] == [{'itemIdentifier': 'msg-2'}, {'itemIdentifier': 'msg-3'}]
+    assert [item['instance_id'] for item in body['tagged_instances']] == ['i-0001']
+    assert ec2.tags_of('i-0001')['ManagedBy'] == 'Lambda'
+
+
+def test_sqs_batch_with_no_instance_ids_retries_nothing(ec2):
+    result, body = invoke({'Records': [{'messageId': 'msg-1', 'body': '{}'}]})
+
+    assert result['statusCode'] == 400
+    assert result['batchItemFailures'] == []
+    assert body['errors'] == ["No instance ID found in message msg-1"]
+
+
+def test_instance_ids_are_deduplicated_and_described_together(ec2):
+    for instance_id in ('i-0001', 'i-0002', 'i-0003'):
+        ec2.add_instance(instance_id)
+
+    result, body = invoke({'instance_ids': ['i-0001', 'i-0002', 'i-0001', 'i-0003']})
+
+    assert result['statusCode'] == 200
+    assert ec2.operations().count('describe_instances') == 1
+    assert ec2.calls[0][1]['InstanceIds'] == ['i-0001', 'i-0002', 'i-0003']
+    # Identical tag sets share one create_tags call
+    assert ec2.operations().count('create_tags') == 1
+    assert len(body['tagged_instances']) == 3
+
+
+def test_failed_describe_chunk_falls_back_to_single_instances(ec2):
+    ec2.add_instance('i-0001')
+    ec2.add_instance('i-0002')
+
+    result, body = invoke({'instance_ids': ['i-0001', 'i-0bad', 'i-0002']})
+
+    describes = [params['InstanceIds'] for operation, params in ec2.calls if operation == 'describe_instances']
+    assert describes == [['i-0001', 'i-0bad', 'i-0002'], ['i-0001'], ['i-0bad'], ['i-0002']]
+    assert result['statusCode'] == 500
+    assert sorted(item['instance_id'] for item in body['tagged_instances']) == ['i-0001', 'i-0002']
+    assert len(body['errors']) == 1 and 'i-0bad' in body['errors'][0]
+
+
+def test_failed_shared_create_tags_fails_every_instance_it_covered(ec2):
+    ec2.add_instance('i-0001')
+    ec2.add_instance('i-0002')
+    ec2.add_instance('i-0003', instance_type='m5.large')
+    ec2.failures['create_tags'] = fail_when_tagging('i-0001')
+
+    tagged, failed = auto_tag.tag_instances(auto_tag.get_instances_details(['i-0001', 'i-0002', 'i-0003'])[0])
+
+    # i-0002 shared the failed call; i-0003's own tag set went through
+    assert sorted(failed) == ['i-0001', 'i-0002']
+    assert list(tagged) == ['i-0003']
+    assert 'ManagedBy' not in ec2.tags_of('i-0002')
+
+
+def test_chunks_never_split_an_instance_across_calls(monkeypatch):
+    monkeypatch.setattr(auto_tag, 'TAG_BATCH_SIZE', 4)
+
+    chunks = auto_tag.chunk_instance_resources({
+        'i-0001': ['i-0001', 'vol-1', 'eni-1'],
+        'i-0002': ['i-0002', 'vol-2', 'eni-2'],
+        'i-0003': ['i-0003']
+    })
+
+    assert chunks == [
+        {'i-0001': ['i-0001', 'vol-1', 'eni-1']},
+        {'i-0002': ['i-0002', 'vol-2', 'eni-2'], 'i-0003': ['i-0003']}
+    ]
+
+
+def test_launch_date_comes_from_the_launch_time(ec2):
+    ec2.add_instance('i-0001')
+
+    invoke({'instance_id': 'i-0001'})
+
+    tags = ec2.tags_of('i-0001')
+    assert tags['LaunchDate'] == '2026-01-05'
+    assert tags['LaunchDateTime'] == '2026-01-05 12:00:00 UTC'
+
+
+def test_only_missing_tags_are_written(ec2):
+    ec2.add_instance('i-0001', tags={'Environment': 'Production', 'LaunchDate': '2025-12-31'})
+
+    invoke({'instance_id': 'i-0001'})
+
+    (_, params), = [call for call in ec2.calls if call[0] == 'create_tags']
+    written = {tag['Key'] for tag in params['Tags']}
+    assert 'Environment' not in written and 'LaunchDate' not in written
+    assert ec2.tags_of('i-0001')['Environment'] == 'Production'
+    assert ec2.tags_of('i-0001')['LaunchDate'] == '2025-12-31'
+
+
+def test_fully_tagged_instance_is_not_written_to(ec2):
+    ec2.add_instance('i-0001')
+    invoke({'instance_id': 'i-0001'})
+    auto_tag.recently_tagged.clear()
+    ec2.calls.clear()
+
+    result, body = invoke({'instance_id': 'i-0001'})
+
+    # Served from the inventory cache, which create_tags patched
+    assert ec2.calls == []
+    assert body['skipped_instances'] == ['i-0001']
+    assert result['statusCode'] == 200
+
+
+def test_duplicate_delivery_is_skipped_without_api_calls(ec2):
+    ec2.add_instance('i-0001')
+    invoke({'instance_id': 'i-0001'})
+    inventory.clear()
+    ec2.calls.clear()
+
+    result, body = invoke({'instance_id': 'i-0001'})
+
+    assert ec2.calls == []
+    assert body['skipped_instances'] == ['i-0001']
+
+
+def test_recently_tagged_cache_expires_and_stays_bounded(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(auto_tag.time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(auto_tag, 'TAGGED_CACHE_MAX_SIZE', 3)
+
+    for number in range(5):
+        auto_tag.mark_recently_tagged(f'i-000{number}')
+
+    assert list(auto_tag.recently_tagged) == ['i-0002', 'i-0003', 'i-0004']
+    assert auto_tag.is_recently_tagged('i-0004')
+
+    clock[0] += auto_tag.TAGGED_CACHE_TTL
+    assert not auto_tag.is_recently_tagged('i-0004')
+
+
+def test_get_missing_tags_keeps_existing_values():
+    desired = {'Owner': 'alice', 'Environment': 'dev', 'Project': 'x'}
+    existing = {'Owner': 'bob', 'Project': 'x'}
+
+    assert auto_tag.get_missing_tags(desired, existing) == {'Environment': 'dev'}
+    assert auto_tag.get_missing_tags(desired, existing, {'Owner': 'bob'}) == {
+        'Owner': 'alice',
+        'Environment': 'dev'
+    }
+
+
+def test_tags_propagate_to_volumes_and_interfaces_in_one_call(ec2):
+    ec2.add_instance('i-0001', volumes=['vol-0001', 'vol-0002'], interfaces=['eni-0001'])
+
+    result, body = invoke({'instance_id': 'i-0001'})
+
+    (_, params), = [call for call in ec2.calls if call[0] == 'create_tags']
+    assert sorted(params['Resources']) == ['eni-0001', 'i-0001', 'vol-0001', 'vol-0002']
+    assert ec2.tags_of('vol-0002') == ec2.tags_of('i-0001')
+    assert sorted(body['tagged_instances'][0]['attached_resources']) == ['eni-0001', 'vol-0001', 'vol-0002']
+
+
+def test_each_resource_is_diffed_against_its_own_tags(ec2):
+    ec2.add_instance('i-0001', volumes=['vol-0001'], interfaces=['eni-0001'])
+    invoke({'instance_id': 'i-0001'})
+    auto_tag.recently_tagged.clear()
+    inventory.clear()
+
+    # A replaced root volume starts untagged while the instance is complete,
+    # and one tag was removed from the interface by hand
+    interface_tags = ec2.tags_of('eni-0001')
+    del interface_tags['Project']
+    ec2.add_instance('i-0001', tags=ec2.tags_of('i-0001'), volumes=['vol-0009'], interfaces=['eni-0001'])
+    ec2.set_tags('eni-0001', interface_tags)
+    ec2.calls.clear()
+
+    invoke({'instance_id': 'i-0001'})
+
+    writes = {tuple(params['Resources']): {tag['Key'] for tag in params['Tags']}
+              for operation, params in ec2.calls if operation == 'create_tags'}
+    assert writes[('eni-0001',)] == {'Project'}
+    assert 'ManagedBy' in writes[('vol-0009',)]
+    assert not any('i-0001' in resources for resources in writes)
+
+
+def test_get_resource_missing_tags_treats_unknown_resources_as_untagged():
+    details = {'InstanceId': 'i-0001', 'Tags': {'A': '1'}, 'VolumeIds': ['vol-0001', 'vol-0002'],
+               'NetworkInterfaceIds': ['eni-0001']}
+    attached = {'vol-0001': {'A': '1'}, 'eni-0001': {'A': 'other'}}
+
+    missing, stale = auto_tag.get_resource_missing_tags(details, {'A': '1', 'B': '2'}, attached)
+
+    assert missing == {
+        'i-0001': {'B': '2'},
+        'vol-0001': {'B': '2'},
+        'vol-0002': {'A': '1', 'B': '2'},
+        'eni-0001': {'B': '2'}
+    }
+    assert stale == {}
+
+
+def test_failed_attached_lookup_writes_every_tag(ec2):
+    ec2.add_instance('i-0001', volumes=['vol-0001'])
+    ec2.failures['describe_volumes'] = lambda params: StubClientError('RequestLimitExceeded', status=503)
+
+    result, body = invoke({'instance_id': 'i-0001'})
+
+    assert result['statusCode'] == 200
+    assert ec2.tags_of('vol-0001')['ManagedBy'] == 'Lambda'
+
+
+def test_sweep_groups_identical_missing_tag_sets(ec2):
+    for number in range(4):
+        ec2.add_instance(f'i-000{number}', volumes=[f'vol-000{number}'])
+    ec2.add_instance('i-0009', tags=dict(auto_tag.CUSTOM_TAGS))
+    ec2.add_instance('i-0010', state='terminated')
+
+    result, body = invoke({'mode': 'sweep'})
+
+    stats = body['regions']['us-east-1']
+    assert result['statusCode'] == 200
+    assert (stats['scanned'], stats['already_tagged'], stats['tagged']) == (5, 1, 4)
+    assert stats['tagged_resources'] == 8 and stats['failed'] == []
+    assert ec2.operations().count('create_tags') == 1
+    assert ec2.tags_of('vol-0003') == auto_tag.CUSTOM_TAGS
+
+
+def test_sweep_flushes_groups_at_the_resource_limit(ec2, monkeypatch):
+    monkeypatch.setattr(auto_tag, 'TAG_BATCH_SIZE', 3)
+    for number in range(7):
+        ec2.add_instance(f'i-000{number}')
+
+    stats = auto_tag.sweep_region(ec2)
+
+    sizes = [len(params['Resources']) for operation, params in ec2.calls if operation == 'create_tags']
+    assert sizes == [3, 3, 1]
+    assert stats['tagged'] == 7
+
+
+def test_sweep_counts_each_failed_instance_once(ec2):
+    ec2.add_instance('i-0001', volumes=['vol-0001'], tags={'Environment': 'Production'})
+    ec2.add_instance('i-0002')
+    ec2.add_instance('i-0003', instance_type='m5.large', tags=dict(auto_tag.CUSTOM_TAGS, Project='Other'))
+    ec2.failures['create_tags'] = fail_when_tagging('i-0001', 'vol-0001')
+
+    stats = auto_tag.sweep_region(ec2)
+
+    # i-0001's instance and volume miss different tag sets, so it is in two
+    # failed calls; the volume's call also covered i-0002
+    assert sorted(stats['failed']) == ['i-0001', 'i-0002']
+    assert (stats['scanned'], stats['already_tagged'], stats['tagged']) == (3, 1, 0)
+    assert stats['tagged_resources'] == 0
+
+
+def test_sweep_stops_before_the_timeout(ec2):
+    ec2.add_instance('i-0001')
+
+    class Context:
+        invoked_function_arn = 'arn:aws:lambda:us-east-1:123456789012:function:auto-tag'
+
+        def get_remaining_time_in_millis(self):
+            return 1000
+
+    result = auto_tag.lambda_handler({'mode': 'sweep'}, Context())
+    body = json.loads(result['body'])
+
+    assert body['complete'] is False
+    assert body['regions'] == {}
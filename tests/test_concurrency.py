@@ -0,0 +1,146 @@
+"""
+Tests for the AIMD limiter in concurrency.py
+"""
+
+import pytest
+
+from concurrency import AdaptiveLimiter, BACKOFF_FACTOR, imap_calls, map_calls
+
+
+class ThrottleError(Exception):
+    def __init__(self):
+        super().__init__("Rate exceeded")
+        self.response = {'Error': {'Code': 'Throttling'}, 'ResponseMetadata': {'HTTPStatusCode': 400}}
+
+
+def complete(limiter, count, latency_ms=10.0, **outcome):
+    for _ in range(count):
+        limiter.release(limiter.acquire(), latency_ms, **outcome)
+
+
+def test_limit_grows_by_about_one_per_window_of_healthy_calls():
+    limiter = AdaptiveLimiter('test', initial=4, maximum=64)
+
+    complete(limiter, 4)
+    assert 4.8 < limiter.limit < 5
+
+    complete(limiter, 16)
+    assert 7 < limiter.limit < 8
+
+
+def test_limit_stops_at_maximum():
+    limiter = AdaptiveLimiter('test', initial=4, maximum=6)
+
+    complete(limiter, 100)
+
+    assert limiter.limit == 6
+
+
+def test_limit_does_not_grow_while_latency_is_high():
+    limiter = AdaptiveLimiter('test', initial=4, maximum=64)
+    complete(limiter, 1, latency_ms=10.0)
+    limit = limiter.limit
+
+    complete(limiter, 50, latency_ms=1000.0)
+
+    # Only the first slow samples, before the average catches up, still grow it
+    assert limiter.limit < limit + 2
+
+
+def test_throttle_halves_the_limit():
+    limiter = AdaptiveLimiter('test', initial=16, maximum=64)
+
+    complete(limiter, 1, throttled=True)
+
+    assert limiter.limit == 16 * BACKOFF_FACTOR
+    assert limiter.get_summary()['backoffs'] == 1
+
+
+def test_throttles_from_one_window_back_off_once():
+    limiter = AdaptiveLimiter('test', initial=8, maximum=64)
+    sequences = [limiter.acquire() for _ in range(8)]
+
+    for sequence in sequences:
+        limiter.release(sequence, 10.0, throttled=True)
+
+    assert limiter.limit == 8 * BACKOFF_FACTOR
+    assert limiter.get_summary()['throttles'] == 8
+
+    # Calls started after the backoff may cut the limit again
+    complete(limiter, 1, throttled=True)
+    assert limiter.limit == 8 * BACKOFF_FACTOR ** 2
+
+
+def test_limit_never_drops_below_minimum():
+    limiter = AdaptiveLimiter('test', initial=2, minimum=1, maximum=64)
+
+    complete(limiter, 10, throttled=True)
+
+    assert limiter.limit == 1
+
+
+def test_failed_calls_neither_grow_nor_shrink_the_limit():
+    limiter = AdaptiveLimiter('test', initial=4, maximum=64)
+
+    complete(limiter, 10, failed=True)
+
+    assert limiter.limit == 4
+
+
+def test_call_backs_off_on_throttle_errors_and_retried_responses():
+    limiter = AdaptiveLimiter('test', initial=16, maximum=64)
+
+    def throttled():
+        raise ThrottleError()
+
+    with pytest.raises(ThrottleError):
+        limiter.call(throttled)
+    assert limiter.limit == 8
+
+    limiter.call(lambda: {'ResponseMetadata': {'RetryAttempts': 2}})
+    assert limiter.limit == 4
+
+
+def test_map_calls_keeps_order_and_reports_errors_per_item():
+    limiter = AdaptiveLimiter('test', initial=4, maximum=8)
+
+    def square(item):
+        if item == 3:
+            raise ValueError("bad item")
+        return item * item
+
+    results = map_calls(square, (item for item in range(20)), limiter)
+
+    assert [item for item, _, _ in results] == list(range(20))
+    assert [result for item, result, _ in results if item != 3] == [i * i for i in range(20) if i != 3]
+    assert isinstance(results[3][2], ValueError) and results[3][1] is None
+
+
+def test_imap_calls_runs_calls_while_items_are_produced():
+    limiter = AdaptiveLimiter('test', initial=4, maximum=4)
+    called = []
+
+    def items():
+        for item in range(20):
+            yield item
+        # Every call ahead of the submission window has started by now
+        assert len(called) >= 20 - 4 * 2
+
+    results = list(imap_calls(called.append, items(), limiter))
+
+    assert [item for item, _, _ in results] == list(range(20))
+
+
+def test_imap_calls_yields_submitted_calls_before_an_iteration_error():
+    limiter = AdaptiveLimiter('test', initial=4, maximum=4)
+
+    def items():
+        yield from range(5)
+        raise RuntimeError("listing failed")
+
+    results = []
+    with pytest.raises(RuntimeError, match='listing failed'):
+        for result in imap_calls(lambda item: item, items(), limiter):
+            results.append(result)
+
+    assert [item for item, _, _ in results] == list(range(5))
@@ -0,0 +1,131 @@
+"""
+Tests for the Lambda fan-out executor in fanout.py
+"""
+
+import io
+import json
+import threading
+import time
+
+import pytest
+
+import fanout
+from fanout import LambdaExecutor
+
+
+class InvokeError(Exception):
+    def __init__(self, code, status):
+        super().__init__(code)
+        self.response = {'Error': {'Code': code}, 'ResponseMetadata': {'HTTPStatusCode': status}}
+
+
+class StubLambda:
+    """
+    Lambda client echoing payloads, failing them as told per attempt
+    """
+
+    def __init__(self, failures=None, duration=0.01):
+        self.failures = failures or {}  # index -> errors raised on successive attempts
+        self.duration = duration
+        self.attempts = {}
+        self.in_flight = 0
+        self.peak = 0
+        self.started_in_flight = {}  # index -> invocations in flight when it started
+        self.lock = threading.Lock()
+
+    def invoke(self, FunctionName, InvocationType, Payload):
+        index = json.loads(Payload)['index']
+        with self.lock:
+            attempt = self.attempts[index] = self.attempts.get(index, 0) + 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.started_in_flight[index] = self.in_flight
+
+        try:
+            errors = self.failures.get(index, [])
+            if attempt <= len(errors):
+                raise errors[attempt - 1]
+            time.sleep(self.duration)
+            return {'Payload': io.BytesIO(json.dumps({'statusCode': 200, 'index': index}).encode())}
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    def install(**options):
+        client = StubLambda(**options)
+        monkeypatch.setattr(fanout, 'invoke_clients', {'us-east-1': client})
+        monkeypatch.setenv('AWS_REGION', 'us-east-1')
+        return client
+    return install
+
+
+def payloads(count):
+    return [{'index': index} for index in range(count)]
+
+
+def test_results_keep_payload_order_within_the_width(stub):
+    client = stub()
+
+    results = LambdaExecutor('worker', concurrency=4).map(payloads(20))
+
+    assert [response['index'] for _, response, _ in results] == list(range(20))
+    assert client.peak <= 4
+
+
+def test_errors_are_reported_per_payload_and_not_retried(stub):
+    client = stub(failures={3: [InvokeError('ServiceException', 500)]})
+
+    results = LambdaExecutor('worker', concurrency=4).map(payloads(6))
+
+    assert isinstance(results[3][2], InvokeError) and results[3][1] is None
+    assert client.attempts[3] == 1
+    assert all(error is None for _, _, error in results[:3] + results[4:])
+
+
+def test_throttled_payloads_are_resubmitted_without_blocking_others(stub, monkeypatch):
+    monkeypatch.setattr(fanout, 'FANOUT_THROTTLE_DELAY', 0.2)
+    throttle = InvokeError('TooManyRequestsException', 429)
+    client = stub(failures={index: [throttle] for index in range(8)})
+
+    start = time.monotonic()
+    results = LambdaExecutor('worker', concurrency=10).map(payloads(30))
+
+    assert [response['index'] for _, response, _ in results] == list(range(30))
+    assert all(client.attempts[index] == 2 for index in range(8))
+    # The delays run side by side rather than one after another
+    assert time.monotonic() - start < 8 * 0.2
+
+
+def test_throttles_halve_the_width_once_per_wave(stub, monkeypatch):
+    monkeypatch.setattr(fanout, 'FANOUT_THROTTLE_DELAY', 0.01)
+    throttle = InvokeError('TooManyRequestsException', 429)
+    client = stub(failures={index: [throttle] for index in range(8)})
+
+    LambdaExecutor('worker', concurrency=8).map(payloads(40))
+
+    # All eight first invocations were throttled, yet the width only halved
+    later = [client.started_in_flight[index] for index in range(16, 40)]
+    assert 2 < max(later) <= 4
+
+
+def test_throttle_retries_are_bounded(stub, monkeypatch):
+    monkeypatch.setattr(fanout, 'FANOUT_THROTTLE_DELAY', 0.001)
+    throttle = InvokeError('TooManyRequestsException', 429)
+    client = stub(failures={0: [throttle] * 10})
+
+    results = LambdaExecutor('worker', concurrency=2).map(payloads(2))
+
+    assert results[0][2] is throttle
+    assert client.attempts[0] == fanout.FANOUT_THROTTLE_RETRIES + 1
+
+
+def test_local_executor_is_rejected_inside_lambda(monkeypatch):
+    monkeypatch.setenv('AWS_LAMBDA_FUNCTION_NAME', 'coordinator')
+
+    with pytest.raises(ValueError, match='outside Lambda'):
+        fanout.get_executor('local', 'assignment2_s3_cleanup')
+
+    assert isinstance(fanout.get_executor('lambda', 'assignment2_s3_cleanup', 'worker'), LambdaExecutor)
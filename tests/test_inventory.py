@@ -0,0 +1,155 @@
+"""
+Tests for the warm-container inventory cache in inventory.py
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import inventory
+from inventory import ResourceCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(inventory.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def record(resource_id, state='running', **fields):
+    return {'InstanceId': resource_id, 'State': state, 'Tags': {}, **fields}
+
+
+def state_change(instance_id, state, account='123456789012'):
+    return {
+        'detail-type': 'EC2 Instance State-change Notification',
+        'account': account,
+        'region': 'us-east-1',
+        'detail': {'instance-id': instance_id, 'state': state}
+    }
+
+
+def test_records_expire_after_the_ttl(clock):
+    cache = ResourceCache(ttl=60)
+    cache.put_many([record('i-0001')], 'InstanceId')
+
+    clock[0] += 59
+    assert cache.get_many(['i-0001', 'i-0002']) == ({'i-0001': record('i-0001')}, ['i-0002'])
+
+    clock[0] += 1
+    assert cache.get_many(['i-0001']) == ({}, ['i-0001'])
+
+
+def test_least_recently_used_records_are_evicted(clock):
+    cache = ResourceCache(ttl=60, max_size=2)
+    cache.put_many([record('i-0001'), record('i-0002')], 'InstanceId')
+    cache.get_many(['i-0001'])
+
+    cache.put_many([record('i-0003')], 'InstanceId')
+
+    assert list(cache.records) == ['i-0001', 'i-0003']
+
+
+def test_eviction_drops_the_remembered_listing(clock):
+    cache = ResourceCache(ttl=60, max_size=2)
+    cache.put_many([record('i-0001'), record('i-0002')], 'InstanceId')
+    cache.set_listing(['running'])
+    assert len(cache.get_listing(['running'])) == 2
+
+    cache.put_many([record('i-0003')], 'InstanceId')
+
+    assert cache.get_listing(['running']) is None
+
+
+def test_listing_answers_only_for_covered_states_while_fresh(clock):
+    cache = ResourceCache(ttl=60)
+    cache.put_many([record('i-0001'), record('i-0002', state='stopped')], 'InstanceId')
+    cache.set_listing(['running', 'stopped'])
+
+    assert [r['InstanceId'] for r in cache.get_listing(['stopped'])] == ['i-0002']
+    assert len(cache.get_listing(['running', 'stopped'])) == 2
+    assert cache.get_listing(['running', 'pending']) is None
+
+    clock[0] += 60
+    assert cache.get_listing(['running']) is None
+
+
+def test_list_instances_is_served_from_memory_while_fresh(ec2):
+    ec2.add_instance('i-0001')
+    ec2.add_instance('i-0002', state='stopped')
+
+    first = inventory.list_instances(['running', 'stopped'])
+    second = inventory.list_instances(['running'])
+
+    assert len(first) == 2 and [r['InstanceId'] for r in second] == ['i-0001']
+    assert ec2.operations() == ['describe_instances']
+
+
+def test_patch_tags_updates_cached_instances_volumes_and_interfaces(ec2):
+    ec2.add_instance('i-0001', tags={'Old': '1', 'Keep': '2'}, volumes=['vol-0001'], interfaces=['eni-0001'])
+    inventory.get_instances(['i-0001'])
+    inventory.get_volumes(['vol-0001'])
+    inventory.get_network_interfaces(['eni-0001'])
+
+    inventory.patch_tags(['i-0001', 'vol-0001', 'eni-0001', 'i-uncached'], {'New': '3'})
+    inventory.patch_tags(['i-0001'], {}, removed=['Old'])
+    ec2.calls.clear()
+
+    assert inventory.get_instances(['i-0001'])['i-0001']['Tags'] == {'Keep': '2', 'New': '3'}
+    assert inventory.get_volumes(['vol-0001'])['vol-0001']['Tags'] == {'New': '3'}
+    assert inventory.get_network_interfaces(['eni-0001'])['eni-0001']['Tags'] == {'New': '3'}
+    assert ec2.calls == []
+
+
+def test_empty_lookups_make_no_calls(ec2, monkeypatch):
+    monkeypatch.setattr(inventory, 'account_id', None)
+
+    assert inventory.get_instances([]) == {}
+    assert inventory.get_volumes([]) == {}
+    inventory.patch_tags([], {'A': '1'})
+    inventory.patch_instance_states([])
+
+    assert ec2.calls == [] and inventory.caches == {}
+
+
+def test_state_change_patches_and_removes_cached_instances(ec2):
+    ec2.add_instance('i-0001')
+    ec2.add_instance('i-0002')
+    inventory.list_instances(['running', 'stopped'])
+
+    assert inventory.apply_state_change(state_change('i-0001', 'stopped'))
+    assert inventory.apply_state_change(state_change('i-0002', 'terminated'))
+
+    cache = inventory.get_cache('instance')
+    assert [r['InstanceId'] for r in cache.get_listing(['stopped'])] == ['i-0001']
+    assert cache.get_many(['i-0002']) == ({}, ['i-0002'])
+
+
+def test_state_change_for_an_unknown_instance_drops_the_listing(ec2):
+    inventory.list_instances(['running'])
+
+    inventory.apply_state_change(state_change('i-0009', 'running'))
+
+    assert inventory.get_cache('instance').get_listing(['running']) is None
+
+
+def test_state_changes_from_other_accounts_are_ignored(ec2):
+    ec2.add_instance('i-0001')
+    inventory.list_instances(['running'])
+
+    assert not inventory.apply_state_change(state_change('i-0001', 'stopped', account='210987654321'))
+    assert not inventory.apply_state_change({'detail-type': 'Other', 'detail': {}})
+
+    assert inventory.get_instances(['i-0001'])['i-0001']['State'] == 'running'
+
+
+def test_account_comes_from_the_invoked_function_arn(monkeypatch):
+    monkeypatch.setattr(inventory, 'account_id', None)
+
+    inventory.set_account(SimpleNamespace(
+        invoked_function_arn='arn:aws:lambda:us-east-1:210987654321:function:auto-tag'))
+    assert inventory.default_account() == '210987654321'
+
+    inventory.set_account(None)
+    assert inventory.default_account() == '210987654321'
@@ -0,0 +1,147 @@
+"""
+Tests for the schedule expressions in schedules.py
+"""
+
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import schedules
+from schedules import get_schedule, parse_days, parse_schedule
+
+UTC = timezone.utc
+
+
+def at(day, hour, minute=0, tz=UTC):
+    """Datetime in the week of Monday 2026-01-05"""
+    return datetime(2026, 1, 5 + day, hour, minute, tzinfo=tz)
+
+
+@pytest.mark.parametrize('spec, days', [
+    ('Mon-Fri', [0, 1, 2, 3, 4]),
+    ('Mon,Wed,Fri', [0, 2, 4]),
+    ('Fri-Mon', [4, 5, 6, 0]),
+    ('Weekdays', [0, 1, 2, 3, 4]),
+    ('Weekends', [5, 6]),
+    ('Daily', [0, 1, 2, 3, 4, 5, 6]),
+    ('monday-tuesday', [0, 1]),
+    ('Sun', [6])
+])
+def test_day_ranges(spec, days):
+    assert parse_days(spec) == days
+
+
+@pytest.mark.parametrize('spec', ['Mon-', 'Mon-Fri,Sat-', '-Fri'])
+def test_incomplete_day_ranges_raise_value_error(spec):
+    with pytest.raises(ValueError):
+        parse_days(spec)
+
+
+def test_office_hours():
+    schedule = parse_schedule('Mon-Fri 08:00-19:00')
+
+    assert schedule.desired_state(at(0, 8)) == 'running'
+    assert schedule.desired_state(at(4, 18, 59)) == 'running'
+    assert schedule.desired_state(at(0, 7, 59)) == 'stopped'
+    assert schedule.desired_state(at(0, 19)) == 'stopped'
+    assert schedule.desired_state(at(5, 12)) == 'stopped'
+
+
+def test_wrapping_day_range():
+    schedule = parse_schedule('Fri-Mon 10:00-11:00')
+
+    assert [schedule.is_active(at(day, 10, 30)) for day in range(7)] == \
+        [True, False, False, False, True, True, True]
+
+
+def test_overnight_window_runs_into_the_next_day():
+    schedule = parse_schedule('Mon,Wed,Fri 22:00-02:00')
+
+    assert schedule.is_active(at(0, 23))
+    assert schedule.is_active(at(1, 1, 59))
+    assert not schedule.is_active(at(1, 2))
+    assert not schedule.is_active(at(1, 23))
+    assert not schedule.is_active(at(0, 1))
+
+
+def test_overnight_window_wraps_past_sunday():
+    schedule = parse_schedule('Sun 23:00-01:00')
+
+    assert schedule.is_active(at(6, 23, 30))
+    assert schedule.is_active(at(0, 0, 30))
+    assert not schedule.is_active(at(0, 1))
+
+
+def test_multiple_periods_and_full_days():
+    split = parse_schedule('Mon-Fri 07:00-12:00; Mon-Fri 13:00-18:00')
+    assert split.is_active(at(2, 11))
+    assert not split.is_active(at(2, 12, 30))
+    assert split.is_active(at(2, 13))
+
+    always = parse_schedule('Daily 00:00-24:00')
+    assert all(always.minutes)
+
+    every_day = parse_schedule('09:00-10:00')
+    assert all(every_day.is_active(at(day, 9, 30)) for day in range(7))
+
+
+def test_time_zone_is_applied():
+    schedule = parse_schedule('Mon-Fri 08:00-19:00 Europe/Berlin')
+
+    # 07:30 UTC is 08:30 in Berlin in winter
+    assert schedule.is_active(at(0, 7, 30))
+    assert not schedule.is_active(at(0, 18, 30))
+    assert schedule.is_active(at(0, 8, 30, tz=ZoneInfo('Europe/Berlin')))
+
+
+def test_time_zone_follows_daylight_saving():
+    schedule = parse_schedule('Daily 09:00-17:00 America/New_York')
+
+    winter = datetime(2026, 1, 15, 14, 30, tzinfo=UTC)  # 09:30 EST
+    summer = datetime(2026, 7, 15, 13, 30, tzinfo=UTC)  # 09:30 EDT
+    assert schedule.is_active(winter)
+    assert schedule.is_active(summer)
+    assert not schedule.is_active(datetime(2026, 1, 15, 13, 30, tzinfo=UTC))
+
+
+@pytest.mark.parametrize('expression', [
+    '',
+    '   ',
+    'Mon-Fri',
+    'Mon-Fri 08:00',
+    'Mon-Fri 8-19',
+    'Mon-Fri 25:00-26:00',
+    'Mon-Fri 08:60-19:00',
+    'Mon-Fri 08:00-24:30',
+    'Mon-Fri 08:00-08:00',
+    'Funday 08:00-19:00',
+    'Mon-Xyz 08:00-19:00',
+    'Mon- 08:00-19:00',
+    'Mon Tue 08:00-19:00',
+    'Mon-Fri 08:00-19:00 Not/AZone',
+])
+def test_malformed_expressions_raise_value_error(expression):
+    with pytest.raises(ValueError):
+        parse_schedule(expression)
+
+
+def test_get_schedule_memoizes_results_and_errors(monkeypatch):
+    monkeypatch.setattr(schedules, 'compiled', {})
+
+    assert get_schedule('Mon-Fri 08:00-19:00') is get_schedule('Mon-Fri 08:00-19:00')
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match='Unknown day'):
+            get_schedule('Funday 08:00-19:00')
+    assert isinstance(schedules.compiled['Funday 08:00-19:00'], ValueError)
+
+
+def test_get_schedule_evicts_oldest_entries(monkeypatch):
+    monkeypatch.setattr(schedules, 'compiled', {})
+    monkeypatch.setattr(schedules, 'SCHEDULE_CACHE_MAX_SIZE', 2)
+
+    for hour in range(3):
+        get_schedule(f'{hour:02d}:00-23:00')
+
+    assert list(schedules.compiled) == ['01:00-23:00', '02:00-23:00']
@@ -0,0 +1,108 @@
+"""
+Tests for the mergeable sketches in sketches.py
+"""
+
+import json
+import random
+
+import pytest
+
+from sketches import Histogram, QuantileSketch, SKETCH_RELATIVE_ACCURACY
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+@pytest.fixture
+def values():
+    generator = random.Random(42)
+    return [generator.lognormvariate(10, 3) for _ in range(20000)]
+
+
+@pytest.mark.parametrize('q', [0.01, 0.25, 0.5, 0.9, 0.99, 1.0])
+def test_quantiles_are_within_relative_accuracy(values, q):
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+
+    expected = exact_quantile(values, q)
+    assert sketch.quantile(q) == pytest.approx(expected, rel=SKETCH_RELATIVE_ACCURACY)
+
+
+def test_merged_sketches_match_a_single_pass(values):
+    single = QuantileSketch()
+    shards = [QuantileSketch() for _ in range(4)]
+    for position, value in enumerate(values):
+        single.add(value)
+        shards[position % 4].add(value)
+
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged.merge(shard)
+
+    assert merged.count == single.count
+    assert merged.sum == pytest.approx(single.sum)
+    assert (merged.min, merged.max) == (single.min, single.max)
+    for q in (0.1, 0.5, 0.99):
+        assert merged.quantile(q) == single.quantile(q)
+        assert merged.quantile(q) == pytest.approx(exact_quantile(values, q), rel=SKETCH_RELATIVE_ACCURACY)
+
+
+def test_merge_rejects_different_accuracies():
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def test_zero_values_and_empty_sketch():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.5) is None
+
+    for value in [0, 0, 0, 100]:
+        sketch.add(value)
+
+    assert sketch.quantile(0.5) == 0.0
+    assert sketch.quantile(1.0) == pytest.approx(100, rel=SKETCH_RELATIVE_ACCURACY)
+
+
+def test_collapse_bounds_bins_and_keeps_high_quantiles():
+    sketch = QuantileSketch(max_bins=64)
+    values = [1.05 ** exponent for exponent in range(2000)]
+    for value in values:
+        sketch.add(value)
+
+    assert len(sketch.bins) <= 64
+    assert sketch.quantile(0.99) == pytest.approx(exact_quantile(values, 0.99), rel=SKETCH_RELATIVE_ACCURACY)
+
+
+def test_quantile_sketch_round_trips_through_json(values):
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+
+    restored = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+
+    assert restored.bins == sketch.bins
+    assert restored.count == sketch.count
+    assert restored.quantile(0.5) == sketch.quantile(0.5)
+    assert QuantileSketch.from_dict(QuantileSketch().to_dict()).quantile(0.5) is None
+
+
+def test_histogram_buckets_merge_and_round_trip():
+    first = Histogram([10, 100])
+    second = Histogram([10, 100])
+    for value in (5, 10, 50):
+        first.add(value, weight=value)
+    for value in (100, 1000):
+        second.add(value, weight=value)
+
+    first.merge(second)
+
+    assert first.counts == [1, 2, 2]
+    assert first.weights == [5, 60, 1100]
+    assert first.at_or_above(10) == (4, 1160)
+    assert Histogram.from_dict(first.to_dict()).counts == first.counts
+
+    with pytest.raises(ValueError):
+        first.merge(Histogram([10]))
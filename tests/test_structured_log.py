@@ -0,0 +1,102 @@
+"""
+Tests for the buffered JSON logger in structured_log.py
+"""
+
+import json
+
+import pytest
+
+import structured_log
+from structured_log import BufferedWriter, Logger
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(structured_log.time, 'monotonic', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def writer(monkeypatch, clock):
+    writer = BufferedWriter(buffer_bytes=1024, flush_seconds=5)
+    monkeypatch.setattr(structured_log, 'writer', writer)
+    return writer
+
+
+def written(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+@pytest.mark.parametrize('name, level', [
+    ('debug', structured_log.DEBUG),
+    ('WARNING', structured_log.WARNING),
+    ('warn', structured_log.WARNING),
+    ('CRITICAL', structured_log.ERROR)
+])
+def test_level_names_and_aliases(name, level):
+    assert Logger('test', level=name).level == level
+
+
+def test_unknown_level_falls_back_to_info_and_warns_once(writer, capsys, monkeypatch):
+    monkeypatch.setattr(structured_log, 'unknown_levels', set())
+
+    first = Logger('first', level='TRACE')
+    second = Logger('second', level='TRACE')
+    writer.flush()
+
+    assert first.level == second.level == structured_log.INFO
+    records = written(capsys)
+    assert [(r['level'], r['log_level']) for r in records] == [('WARNING', 'TRACE')]
+
+
+def test_lines_are_buffered_until_the_size_limit(writer, capsys):
+    logger = Logger('test')
+
+    logger.info("small")
+    assert capsys.readouterr().out == ''
+
+    logger.info("large", padding='x' * 1024)
+    assert [r['message'] for r in written(capsys)] == ['small', 'large']
+
+
+def test_errors_are_written_immediately(writer, capsys):
+    Logger('test').info("before")
+    Logger('test').error("failed")
+
+    assert [r['message'] for r in written(capsys)] == ['before', 'failed']
+
+
+def test_buffer_is_flushed_once_the_oldest_line_is_old(writer, capsys, clock):
+    logger = Logger('test')
+    logger.info("first")
+    clock[0] += 4.9
+    logger.info("second")
+    assert capsys.readouterr().out == ''
+
+    clock[0] += 0.1
+    logger.info("third")
+
+    assert [r['message'] for r in written(capsys)] == ['first', 'second', 'third']
+
+
+def test_progress_reports_flush_the_buffer(writer, capsys):
+    logger = Logger('test')
+    logger.info("started")
+    progress = logger.progress("Progress", every_items=10, every_seconds=60)
+
+    progress.update(5)
+    assert capsys.readouterr().out == ''
+
+    progress.update(5, deleted=3)
+
+    records = written(capsys)
+    assert [r['message'] for r in records] == ['started', 'Progress']
+    assert (records[1]['processed'], records[1]['deleted']) == (10, 3)
+
+
+def test_sampling_logs_every_nth_item():
+    logger = Logger('test', sample_every=3)
+
+    assert [logger.sampled('key') for _ in range(7)] == [True, False, False, True, False, False, True]
+    assert logger.sampled('other')
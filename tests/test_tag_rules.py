@@ -0,0 +1,166 @@
+"""
+Tests for the tag rule sets in tag_rules.py
+"""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+import tag_rules
+from tag_rules import compile_rules, get_rule_set, instance_attributes
+
+RULES = [
+    {
+        'match': {'instance_type': ['t3.*', 't4g.*'], 'principal': 'arn:aws:sts::*:assumed-role/TeamA-*'},
+        'tags': {'Team': 'A', 'Owner': '{principal_name}'},
+        'final': True
+    },
+    {'match': {'subnet_id': 'subnet-0a1b2c3d'}, 'tags': {'Network': 'private-{availability_zone}'}},
+    {'tags': {'Team': 'Default', 'Environment': 'dev', 'Launched': '{launch_date}'}}
+]
+
+PRINCIPAL = 'arn:aws:sts::123456789012:assumed-role/TeamA-dev/alice'
+
+
+def instance(**fields):
+    record = {
+        'InstanceId': 'i-0123456789abcdef0',
+        'InstanceType': 't3.micro',
+        'SubnetId': 'subnet-0a1b2c3d',
+        'AvailabilityZone': 'us-east-1a',
+        'LaunchTime': datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+    }
+    record.update(fields)
+    return record
+
+
+@pytest.fixture(autouse=True)
+def rule_source(monkeypatch):
+    monkeypatch.setattr(tag_rules, 'cache', {})
+    for name in ('TAG_RULES', 'TAG_RULES_FILE', 'TAG_RULES_PARAMETER'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv('TAG_RULES', json.dumps(RULES))
+
+
+def evaluate(record, principal=None):
+    return compile_rules(RULES, 'test').evaluate(instance_attributes(record, principal))
+
+
+def test_matching_rules_apply_in_order():
+    assert evaluate(instance()) == {
+        'Network': 'private-us-east-1a',
+        'Team': 'Default',
+        'Environment': 'dev',
+        'Launched': '2026-01-05'
+    }
+
+
+def test_final_rule_stops_evaluation():
+    assert evaluate(instance(), PRINCIPAL) == {'Team': 'A', 'Owner': 'alice'}
+
+
+def test_final_rule_needs_every_field_to_match():
+    tags = evaluate(instance(InstanceType='m5.large'), PRINCIPAL)
+    assert tags['Team'] == 'Default'
+
+    tags = evaluate(instance(), 'arn:aws:sts::123456789012:assumed-role/TeamB-dev/bob')
+    assert tags['Team'] == 'Default'
+
+
+def test_missing_attributes_never_match_and_render_unknown():
+    rules = compile_rules([{'match': {'key_name': '*'}, 'tags': {'Key': 'yes'}},
+                           {'tags': {'Owner': '{principal_name}'}}], 'test')
+
+    assert rules.evaluate(instance_attributes(instance())) == {'Owner': 'Unknown'}
+
+
+def test_long_rendered_values_are_truncated_with_one_warning(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(tag_rules.logger, 'warning', lambda message, **fields: warnings.append(fields))
+    rules = compile_rules([{'tags': {'Owner': 'team-' + 'x' * 250 + '-{principal_name}'}}], 'test')
+
+    first = rules.evaluate(instance_attributes(instance(), PRINCIPAL))
+    second = rules.evaluate(instance_attributes(instance(InstanceId='i-1'), PRINCIPAL))
+
+    assert first == second
+    assert len(first['Owner']) == tag_rules.MAX_TAG_VALUE_LENGTH
+    assert first['Owner'].startswith('team-x')
+    assert [(w['key'], w['length']) for w in warnings] == [('Owner', 261)]
+
+
+def test_rules_document_may_be_wrapped():
+    assert len(compile_rules({'rules': RULES}, 'test').rules) == 3
+
+
+@pytest.mark.parametrize('document', [
+    {'rules': 'not a list'},
+    [{'match': {'colour': 'red'}, 'tags': {'A': 'b'}}],
+    [{'match': {'instance_type': 't3.*'}}],
+    [{'tags': {'Owner': '{owner}'}}],
+    [{'tags': {'Owner': '{principal_name!r}'}}],
+    [{'tags': {'K' * 129: 'value'}}]
+])
+def test_invalid_rule_sets_are_rejected(document):
+    with pytest.raises(ValueError):
+        compile_rules(document, 'test')
+
+
+def test_rule_set_is_cached_until_the_ttl(monkeypatch):
+    loads = []
+    load_document = tag_rules.load_document
+    monkeypatch.setattr(tag_rules, 'load_document', lambda source: loads.append(source) or load_document(source))
+
+    first = get_rule_set({})
+    assert get_rule_set({}) is first
+    assert loads == [('env', 'TAG_RULES')]
+
+
+def test_failed_reload_keeps_the_previous_rules(monkeypatch):
+    rule_set = get_rule_set({})
+
+    def broken(source):
+        raise ValueError("parameter not found")
+
+    monkeypatch.setattr(tag_rules, 'load_document', broken)
+    monkeypatch.setattr(tag_rules, 'TAG_RULES_CACHE_TTL', 0)
+    expiry, source, cached = tag_rules.cache['rule_set']
+    tag_rules.cache['rule_set'] = (expiry - 1000, source, cached)
+
+    assert get_rule_set({}) is rule_set
+    assert get_rule_set({}) is rule_set
+
+
+def test_failed_first_load_raises(monkeypatch):
+    monkeypatch.setenv('TAG_RULES', '{not json')
+
+    with pytest.raises(ValueError, match='Cannot load tag rules'):
+        get_rule_set({})
+
+
+def test_default_tags_apply_without_a_source(monkeypatch):
+    monkeypatch.delenv('TAG_RULES')
+
+    rule_set = get_rule_set({'ManagedBy': 'Lambda'})
+
+    assert rule_set.evaluate(instance_attributes(instance())) == {'ManagedBy': 'Lambda'}
+    assert get_rule_set({'ManagedBy': 'Lambda'}) is rule_set
+
+
+def test_principal_replaces_rule_tags_written_without_it():
+    from assignment5_auto_tag_ec2 import get_missing_tags, get_replaceable_tags, get_stale_tags
+
+    record = instance()
+    record['Tags'] = dict(evaluate(record), Environment='prod')
+    desired = evaluate(record, PRINCIPAL)
+    replaceable = get_replaceable_tags(record, PRINCIPAL)
+
+    assert get_missing_tags(desired, record['Tags'], replaceable) == {'Team': 'A', 'Owner': 'alice'}
+    # Environment was changed by hand, so only the untouched rule tags go
+    assert get_stale_tags(desired, record['Tags'], replaceable) == {
+        'Network': 'private-us-east-1a',
+        'Launched': '2026-01-05'
+    }
+
+    record['Tags']['LaunchedBy'] = PRINCIPAL
+    assert get_replaceable_tags(record, PRINCIPAL) == {}